@@ -0,0 +1,9 @@
+# __main__.py
+# -*- coding: utf-8 -*-
+"""Klasörü doğrudan çalıştırmak için: python IntegratorToHednova sync --all"""
+
+import sys
+
+from cli import main
+
+sys.exit(main())
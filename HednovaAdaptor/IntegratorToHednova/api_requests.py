@@ -1,8 +1,51 @@
 import json
 import base64
-import requests
-from typing import Dict, Any
-from sql_crud import get_active_session
+import time
+from typing import Any, Dict, Iterator, Tuple
+from app_log import get_logger
+from config import CONFIG
+from dia_session import DiaSessionManager, is_invalid_session
+from http_client import get_client
+from report_stream import open_report
+import row_codec
+from sql_crud import get_session_info, update_session_row
+import tenants
+
+log = get_logger("dia")
+
+DEFAULT_BASE_URL = "https://kirpi.ws.dia.com.tr"
+LOGIN_PATH = "/api/v3/sis/json"
+REPORT_PATH = "/api/v3/rpr/json"
+PREFLIGHT_READ_TIMEOUT = 5.0   # sn
+
+
+def dia_url(path: str) -> str:
+    """
+    DİA WS adresi. Kök adres data.json'daki isteğe bağlı "integrator": {"base_url": ...}
+    alanından okunur (ör. yerel test sunucusu için "http://127.0.0.1:8765", bkz. mock_dia).
+    """
+    try:
+        base = str(CONFIG.integrator.get("base_url") or DEFAULT_BASE_URL)
+    except (FileNotFoundError, KeyError):
+        base = DEFAULT_BASE_URL
+    return base.rstrip("/") + path
+
+
+def dia_preflight() -> Tuple[bool, str, float]:
+    """
+    DİA WS ön kontrolü: login yapmadan (session tüketmeden) kök adrese kısa zaman aşımlı
+    bir GET gönderir; hangi HTTP durumu dönerse dönsün sunucuya ulaşılmış sayılır.
+    Dönüş: (ok, mesaj, süre_ms)
+    """
+    t0 = time.perf_counter()
+    try:
+        client = get_client()
+        resp = client.session.get(dia_url("/"), timeout=(client.timeout[0], PREFLIGHT_READ_TIMEOUT))
+        resp.close()
+        return (True, f"DİA erişilebilir (HTTP {resp.status_code}).", (time.perf_counter() - t0) * 1000.0)
+    except Exception as e:
+        return (False, f"DİA'ya ulaşılamadı: {e}", (time.perf_counter() - t0) * 1000.0)
+
 
 def login():
     """
@@ -11,8 +54,7 @@ def login():
     Her durumda {'code': <kod>, 'msg': <mesaj>} şeklinde döner.
     """
     try:
-        with open("data.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = CONFIG.data
     except FileNotFoundError:
         return {"code": "999", "msg": "data.json dosyası bulunamadı."}
 
@@ -21,7 +63,7 @@ def login():
     password = data["integrator"]["password"]
     apikey = data["integrator"]["apikey"]
 
-    ws_url = "https://kirpi.ws.dia.com.tr/api/v3/sis/json"
+    ws_url = dia_url(LOGIN_PATH)
 
     payload = {
         "login": {
@@ -35,12 +77,9 @@ def login():
         }
     }
 
-    headers = {
-        "Content-Type": "application/json;charset=UTF-8"
-    }
-
     try:
-        response = requests.post(ws_url, json=payload, headers=headers)
+        # Tekrarlanan login (disconnect_same_user) sunucunun az önce verdiği session'ı düşürebilir
+        response = get_client().post_json(ws_url, payload, idempotent=False)
 
         # Yanıt beklenen biçimde mi?
         try:
@@ -52,50 +91,92 @@ def login():
         code = str(result.get("code", "0"))
         msg = str(result.get("msg", ""))
 
-        # Log için ekrana basabiliriz
-        print(f"🔹 API Yanıtı -> code: {code}, msg: {msg}")
+        # Başarılı yanıtta msg session id'dir; günlüğe yalnızca hata mesajı yazılır
+        log.info("DİA login -> code: %s%s (%.0f ms)", code, "" if code == "200" else f", msg: {msg}",
+                 response.latency_ms, extra={"fields": {"code": code, "latency_ms": round(response.latency_ms, 1)}})
 
-        return {"code": code, "msg": msg}
+        return {"code": code, "msg": msg, "latency_ms": response.latency_ms}
 
     except Exception as e:
         return {"code": "997", "msg": f"İstek hatası: {e}"}
 
 
 def _load_integrator_fp() -> Dict[str, Any]:
-    """data.json içinden firma/dönem ve apikey vb. okur (gerekirse genişletilir)."""
-    with open("data.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
+    """data.json içinden (ya da etkin kiracıdan, bkz. tenants) firma/dönem okur."""
+    tenant = tenants.current()
+    if tenant is not None:
+        return {"company": tenant.company, "period": tenant.period}
+    data = CONFIG.data
     company = str(data["integrator"]["company"]).strip()
     period  = str(data["integrator"]["period"]).strip()
     return {"company": company, "period": period}
 
-def report_result_get(report_code: str, session_id: str = None) -> Dict[str, Any]:
+def _session_settings() -> Dict[str, float]:
+    try:
+        opts = CONFIG.data.get("session") or {}
+    except FileNotFoundError:
+        opts = {}
+    return {
+        "ttl": float(opts.get("ttl_minutes", 30)) * 60,
+        "refresh_margin": float(opts.get("refresh_margin_minutes", 5)) * 60,
+    }
+
+
+# Süreç genelinde tek DİA session yöneticisi (bkz. dia_session.py); kiracılar da bunu paylaşır
+# ve session her zaman varsayılan veritabanında saklanır (bkz. tenants)
+SESSION = DiaSessionManager(login, tenants.on_default_db(get_session_info),
+                            tenants.on_default_db(update_session_row), **_session_settings())
+
+
+def report_result_get(report_code: str, session_id: str = None, stream: bool = False,
+                      raw: bool = False, params: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     DİA 'rpr_raporsonuc_getir' çağrısını yapar.
     Parametreler:
       - report_code: ör. "OZL-01"
-      - session_id  : verilmezse DB'den get_active_session() ile alınır.
+      - session_id  : verilmezse SESSION yöneticisinden alınır; DİA session'ı
+                      reddederse bir kez yeniden login olunup rapor tekrar istenir.
+      - stream      : True ise yanıt belleğe alınmadan çözülür; rows bir üreteçtir ve
+                      satırlar tüketildikçe HTTP gövdesinden okunur (bkz. report_stream).
+                      Çözümleme hatası bu durumda üreteç tüketilirken istisna olarak gelir.
+      - raw         : True ise satırlar çözülmez; "payload" base64'ü çözülmüş rapor JSON
+                      baytlarıdır (row_codec.decode_records ile görev kayıtlarına çevrilir).
+      - params      : raporun "param" bloğuna firma/dönem'e ek olarak yazılacak parametreler
+                      (ör. delta senkron için {"degisim_tarihi": "2025-01-31 10:00:00"}).
     Dönüş:
-      { "code": <str>, "msg": <str>, "rows": <list> }
+      { "code": <str>, "msg": <str>, "rows": <list ya da üreteç> }
       code=="200" ise rows = çözümlenmiş JSON içindeki "__rows" listesi,
       aksi halde rows = [].
     """
+    call = _report_call_stream if stream else _report_call_raw if raw else _report_call
+
     # 1) session id hazırlığı
     sid = (session_id or "").strip()
-    if not sid:
-        ok, sid_or_err = get_active_session()
+    if sid:
+        return call(report_code, sid, params)
+
+    ok, sid_or_err = SESSION.get()
+    if not ok:
+        return {"code": "995", "msg": sid_or_err, "rows": []}
+
+    result = call(report_code, sid_or_err, params)
+    if is_invalid_session(result["code"], result["msg"]):
+        SESSION.invalidate(sid_or_err)
+        ok, sid_or_err = SESSION.get()
         if not ok:
             return {"code": "995", "msg": sid_or_err, "rows": []}
-        sid = sid_or_err
+        result = call(report_code, sid_or_err, params)
+    return result
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
-    # 2) firma/dönem
+def _report_payload(report_code: str, sid: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
     fp = _load_integrator_fp()
     firma_kodu = fp["company"]
     donem_kodu = fp["period"]
-
-    # 3) istek payload
-    ws_url = "https://kirpi.ws.dia.com.tr/api/v3/rpr/json"
-    payload = {
+    return {
         "rpr_raporsonuc_getir": {
             "session_id": sid,
             "firma_kodu": int(firma_kodu) if firma_kodu.isdigit() else firma_kodu,
@@ -103,20 +184,26 @@ def report_result_get(report_code: str, session_id: str = None) -> Dict[str, Any
             "report_code": report_code,
             "param": {
                 "firma": firma_kodu,
-                "donem": donem_kodu
+                "donem": donem_kodu,
+                **(params or {})
             },
             "format_type": "json"
         }
     }
-    headers = {"Content-Type": "application/json;charset=UTF-8"}
 
-    # 4) çağrı
+
+def _report_call(report_code: str, sid: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Verilen session ile tek bir rpr_raporsonuc_getir çağrısı."""
+    # 2) firma/dönem + istek payload
+    payload = _report_payload(report_code, sid, params)
+
+    # 3) çağrı (keep-alive, zaman aşımı ve yeniden deneme http_client'ta)
     try:
-        resp = requests.post(ws_url, json=payload, headers=headers, timeout=30)
+        resp = get_client().post_json(dia_url(REPORT_PATH), payload)
     except Exception as e:
         return {"code": "997", "msg": f"HTTP isteği hatası: {e}", "rows": []}
 
-    # 5) JSON çöz
+    # 4) JSON çöz
     try:
         data = resp.json()
     except Exception:
@@ -125,16 +212,78 @@ def report_result_get(report_code: str, session_id: str = None) -> Dict[str, Any
     code = str(data.get("code", "0"))
     msg  = str(data.get("result") or data.get("msg") or "")
 
-    # 6) code==200 ise base64 decode + json parse + __rows
+    # 5) code==200 ise base64 decode + json parse + __rows
     if code == "200":
         try:
             decoded = base64.b64decode(msg)
             text = decoded.decode("utf-8", errors="ignore")
             j = json.loads(text)
             rows = j.get("__rows", [])
-            return {"code": code, "msg": "OK", "rows": rows}
+            return {"code": code, "msg": "OK", "rows": rows, "latency_ms": resp.latency_ms}
         except Exception as e:
             return {"code": "996", "msg": f"Base64/JSON çözümleme hatası: {e}", "rows": []}
     else:
         # Başarısız: msg alanında hata mesajı olabilir
-        return {"code": code, "msg": msg, "rows": []}
\ No newline at end of file
+        return {"code": code, "msg": msg, "rows": []}
+
+
+def _report_call_raw(report_code: str, sid: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """_report_call'ın ham hali: __rows ayrıştırılmaz, JSON baytları olduğu gibi döner."""
+    payload = _report_payload(report_code, sid, params)
+    try:
+        resp = get_client().post_json(dia_url(REPORT_PATH), payload)
+    except Exception as e:
+        return {"code": "997", "msg": f"HTTP isteği hatası: {e}", "rows": []}
+
+    try:
+        data = row_codec.loads(resp.content)
+    except Exception:
+        return {"code": "996", "msg": "Geçersiz JSON yanıtı.", "rows": []}
+
+    code = str(data.get("code", "0"))
+    msg  = str(data.get("result") or data.get("msg") or "")
+    if code != "200":
+        return {"code": code, "msg": msg, "rows": []}
+    try:
+        return {"code": code, "msg": "OK", "rows": [], "payload": base64.b64decode(msg),
+                "latency_ms": resp.latency_ms}
+    except Exception as e:
+        return {"code": "996", "msg": f"Base64 çözümleme hatası: {e}", "rows": []}
+
+
+def _report_call_stream(report_code: str, sid: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """_report_call'ın akış hali: zarf okunur, satırlar tüketildikçe çözülür."""
+    payload = _report_payload(report_code, sid, params)
+    try:
+        resp = get_client().post_json(dia_url(REPORT_PATH), payload, stream=True)
+    except Exception as e:
+        return {"code": "997", "msg": f"HTTP isteği hatası: {e}", "rows": []}
+
+    try:
+        data, rows = open_report(resp.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+    except Exception:
+        resp.close()
+        return {"code": "996", "msg": "Geçersiz JSON yanıtı.", "rows": []}
+
+    code = str(data.get("code", "0"))
+    if code == "200" and rows is not None:
+        return {"code": code, "msg": "OK", "rows": _closing(rows, resp), "latency_ms": resp.latency_ms}
+
+    resp.close()
+    msg = str(data.get("result") or data.get("msg") or "")
+    if code == "200":
+        # result alanı code'dan önce geldiyse zarf tamamen okunmuştur; tek seferde çöz
+        try:
+            j = json.loads(base64.b64decode(msg).decode("utf-8", errors="ignore"))
+            return {"code": code, "msg": "OK", "rows": iter(j.get("__rows", [])), "latency_ms": resp.latency_ms}
+        except Exception as e:
+            return {"code": "996", "msg": f"Base64/JSON çözümleme hatası: {e}", "rows": []}
+    return {"code": code, "msg": msg, "rows": []}
+
+
+def _closing(rows: Iterator[Any], resp) -> Iterator[Any]:
+    # Üreteç bitince ya da yarıda bırakılınca bağlantı havuza döner
+    try:
+        yield from rows
+    finally:
+        resp.close()
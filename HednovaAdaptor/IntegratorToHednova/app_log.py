@@ -0,0 +1,199 @@
+# app_log.py
+# -*- coding: utf-8 -*-
+"""
+Uygulama günlüğü: kayıtlar sınırlı bir kuyruğa bırakılır, konsola ve dönen (rotating) dosyaya
+arka plandaki tek bir QueueListener iş parçacığı yazar. Böylece senkron ve arayüz iş parçacıkları
+stdout/disk beklemez; kuyruk dolarsa kayıt düşürülür (sayılır), çağıran asla bloklanmaz.
+
+data.json'daki isteğe bağlı "logging" bloğu:
+  "logging": {"level": "INFO", "path": "logs/integrator.log", "max_bytes": 5242880,
+              "backup_count": 5, "console": true, "row_sample": 1000, "row_rate": 20}
+path data.json'ın klasörüne göredir. Dosyaya JSON satırları (ts, level, logger, thread, msg ve
+extra={"fields": {...}} ile verilen alanlar), konsola yalnızca zaman damgalı mesaj yazılır.
+Rapor satırlarının dökümü yalnızca DEBUG seviyesinde, row_sample satırda bir ve saniyede en
+fazla row_rate satır olacak şekilde yapılır (bkz. RowSampler).
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from config import CONFIG
+
+ROOT = "hednova"
+QUEUE_SIZE = 10000
+
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional["_DroppingQueueHandler"] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Uygulama günlükçüsü: get_logger("sync") -> "hednova.sync"."""
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+def logging_settings() -> Dict[str, Any]:
+    """data.json'daki isteğe bağlı "logging" bloğu (varsayılanlar modül açıklamasında)."""
+    try:
+        opts = CONFIG.data.get("logging") or {}
+    except FileNotFoundError:
+        opts = {}
+    path = str(opts.get("path", os.path.join("logs", "integrator.log")))
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(CONFIG.path)), path)
+    level = logging.getLevelName(str(opts.get("level", "INFO")).upper())
+    return {
+        "level": level if isinstance(level, int) else logging.INFO,
+        "path": path,
+        "max_bytes": int(opts.get("max_bytes", 5 * 2 ** 20)),
+        "backup_count": int(opts.get("backup_count", 5)),
+        "console": bool(opts.get("console", True)),
+        "row_sample": max(1, int(opts.get("row_sample", 1000))),
+        "row_rate": max(1, int(opts.get("row_rate", 20))),
+    }
+
+
+# ---------------------------
+# Biçimlendiriciler
+# ---------------------------
+class JsonFormatter(logging.Formatter):
+    """Dosya için tek satırlık JSON kayıtları."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """'[YYYY-MM-DD HH:MM:SS] UYARI: mesaj' biçimi (alanlar yalnızca dosyaya yazılır)."""
+
+    LABELS = {logging.WARNING: "UYARI: ", logging.ERROR: "HATA: ", logging.CRITICAL: "HATA: "}
+
+    def format(self, record: logging.LogRecord) -> str:
+        ts = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S")
+        return f"[{ts}] {self.LABELS.get(record.levelno, '')}{record.getMessage()}"
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Kuyruk doluysa kaydı düşürür; çağıran iş parçacığı hiçbir zaman beklemez."""
+
+    def __init__(self, q: "queue.Queue"):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# ---------------------------
+# Kurulum
+# ---------------------------
+def setup_logging(console: Optional[bool] = None) -> None:
+    """
+    "hednova" günlükçüsünü kuyruk + arka plan dinleyicisiyle kurar (süreçte bir kez).
+    console verilirse data.json'daki "console" ayarının yerine geçer.
+    """
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+        opts = logging_settings()
+        handlers = []
+        try:
+            os.makedirs(os.path.dirname(opts["path"]), exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                opts["path"], maxBytes=opts["max_bytes"], backupCount=opts["backup_count"], encoding="utf-8")
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        except OSError:
+            pass  # günlük klasörü yazılamıyorsa yalnızca konsol
+        if opts["console"] if console is None else console:
+            stream = logging.StreamHandler(sys.stdout)
+            stream.setFormatter(ConsoleFormatter())
+            handlers.append(stream)
+
+        _handler = _DroppingQueueHandler(queue.Queue(QUEUE_SIZE))
+        root = logging.getLogger(ROOT)
+        root.setLevel(opts["level"])
+        root.addHandler(_handler)
+        root.propagate = False
+        _listener = logging.handlers.QueueListener(_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Kuyruktaki kayıtları yazıp dinleyiciyi durdurur (çıkışta; birden çok kez çağrılabilir)."""
+    global _listener, _handler
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for h in _listener.handlers:
+            h.close()
+        logging.getLogger(ROOT).removeHandler(_handler)
+        if _handler.dropped:
+            # Dinleyici durduğu için günlüğe yazılamaz; stdout'u kirletmeden stderr'e
+            sys.stderr.write(f"UYARI: kuyruk dolduğu için {_handler.dropped} günlük kaydı düşürüldü\n")
+        _listener = None
+        _handler = None
+
+
+# ---------------------------
+# Satır dökümü
+# ---------------------------
+class RowSampler:
+    """
+    Rapor satırı dökümü için örnekleme + hız sınırı: every satırda bir satır seçilir,
+    seçilenlerden saniyede en fazla per_second tanesi geçer. Geçmeyenler skipped'da sayılır.
+    """
+
+    def __init__(self, every: int, per_second: int):
+        self.every = every
+        self.per_second = per_second
+        self.skipped = 0
+        self._seen = 0
+        self._window = 0.0
+        self._in_window = 0
+
+    def allow(self) -> bool:
+        self._seen += 1
+        if (self._seen - 1) % self.every:
+            self.skipped += 1
+            return False
+        now = time.monotonic()
+        if now - self._window >= 1.0:
+            self._window = now
+            self._in_window = 0
+        if self._in_window >= self.per_second:
+            self.skipped += 1
+            return False
+        self._in_window += 1
+        return True
+
+
+def row_sampler(logger: logging.Logger) -> Optional[RowSampler]:
+    """logger DEBUG seviyesinde açıksa ayarlara göre bir RowSampler, değilse None."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return None
+    opts = logging_settings()
+    return RowSampler(opts["row_sample"], opts["row_rate"])
@@ -0,0 +1,276 @@
+# bench_sync.py
+# -*- coding: utf-8 -*-
+"""
+Senkron motoru için çevrimdışı benchmark (üretim DB'sine ve DİA'ya dokunmaz).
+Her ENT görevi için sentetik DİA yanıtı ({"code": "200", "result": base64({"__rows": [...]})})
+üretilir ve senkron, sqlite_dialect üzerinden geçici bir SQLite dosyasına çalıştırılır.
+
+  python bench_sync.py                                  tüm görevler, 1k/100k/1M satır
+  python bench_sync.py --tasks ENT-10 ENT-09 --sizes 1k,100k
+  python bench_sync.py --decode fast --diff server --json sonuc.json
+
+Her görev ve boyut için boş tabloda üç senaryo sırayla çalışır:
+  full      : tablo boş, tüm satırlar eklenir
+  no-change : aynı rapor tekrar gelir, hiçbir satır yazılmaz
+  churn     : satırların --churn oranı (varsayılan %10) değişir; bunların 3/5'i güncellenir,
+              1/5'i silinir, 1/5'i yeni anahtarla gelir
+Her senaryo için satır/sn, tepe RSS, DB gidiş-dönüş sayısı ve aşama süreleri (run_history) basılır.
+"""
+
+import argparse
+import base64
+import gc
+import io
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import CONFIG
+
+DEFAULT_SIZES = "1k,100k,1M"
+READ_CHUNK = 64 * 1024
+SCENARIOS = ("full", "no-change", "churn")
+
+
+def parse_size(text: str) -> int:
+    """'1k' -> 1000, '1M' -> 1000000."""
+    text = text.strip().lower()
+    mult = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * mult)
+
+
+# ---------------------------
+# Bellek ölçümü
+# ---------------------------
+def _reset_peak_rss() -> None:
+    # Linux: tepe RSS (VmHWM) sıfırlanır; diğer sistemlerde süreç ömrü boyunca tepe değer ölçülür
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    try:
+        import psutil  # isteğe bağlı (Windows)
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 2 ** 20
+    except ImportError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024.0
+    except ImportError:
+        return None
+
+
+# ---------------------------
+# Sentetik veri
+# ---------------------------
+def _column_type(field) -> str:
+    from sync_specs import as_float
+
+    if field.source is None:
+        return "INTEGER" if isinstance(field.const, int) else "NVARCHAR(200)"
+    return "FLOAT" if field.coerce is as_float else "NVARCHAR(200)"
+
+
+def create_table(db_path: str, spec) -> None:
+    """spec tablosunu boş olarak (yeniden) oluşturur; [ENTHASH]/[ENTKEY] ve indeksler senkronla gelir."""
+    cols = {f.column: _column_type(f) for f in spec.fields}
+    for c in spec.scope:
+        cols.setdefault(c, "NVARCHAR(200)")
+    db = sqlite3.connect(db_path)
+    try:
+        db.execute(f"DROP TABLE IF EXISTS [{spec.table}]")
+        db.execute(f"CREATE TABLE [{spec.table}] ({', '.join(f'[{c}] {t}' for c, t in cols.items())})")
+        db.commit()
+    finally:
+        db.close()
+
+
+def make_rows(spec, n: int, churn: float = 0.0) -> Iterator[Dict[str, Any]]:
+    """
+    n adet API satırı (dict). churn > 0 ise satırların yaklaşık churn oranı değiştirilir:
+    (3/5 güncellenir, 1/5 silinir, 1/5 yeni anahtarla gelir). Aynı n için anahtarlar sabittir.
+    """
+    from sync_specs import as_float
+
+    key_sources = {f.source for f in spec.fields if f.column in spec.keys and f.source}
+    sources = [(f.source, f.coerce is as_float) for f in spec.fields if f.source]
+    sources = list({s: num for s, num in sources}.items())
+    step = int(round(1 / churn)) if churn > 0 else 0
+    for i in range(n):
+        kind = ""
+        if step and i % step == 0:
+            kind = ("delete", "insert", "update", "update", "update")[(i // step) % 5]
+        if kind == "delete":
+            continue
+        row = {}
+        for src, numeric in sources:
+            if numeric:
+                row[src] = (i % 1000) * 1.5 + (1 if kind == "update" else 0)
+            elif src in key_sources:
+                row[src] = f"{src}-{i:07d}" + ("N" if kind == "insert" else "")
+            else:
+                row[src] = f"{src} {i:07d}" + (" v2" if kind == "update" else "")
+        yield row
+
+
+def make_body(rows: Iterator[Dict[str, Any]]) -> bytes:
+    """Satırlardan rpr_raporsonuc_getir yanıt gövdesi (base64'lü JSON zarf) üretir."""
+    buf = io.BytesIO()
+    buf.write(b'{"__rows": [')
+    for i, row in enumerate(rows):
+        if i:
+            buf.write(b", ")
+        buf.write(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+    buf.write(b"]}")
+    encoded = base64.b64encode(buf.getbuffer())
+    buf.close()
+    return b'{"code": "200", "msg": "", "result": "' + encoded + b'"}'
+
+
+def _chunks(body: bytes) -> Iterator[bytes]:
+    view = memoryview(body)
+    for i in range(0, len(view), READ_CHUNK):
+        yield bytes(view[i:i + READ_CHUNK])
+
+
+# ---------------------------
+# Çalıştırma
+# ---------------------------
+def _sync(spec, body: bytes, decode: str):
+    """sync_tasks.run_va_task'taki çözümleme + senkron yolunu bellekteki gövdeyle çalıştırır."""
+    import row_codec
+    from report_stream import open_report
+    from run_history import stage, timed_iter
+    from sql_crud import sync_records, sync_rows
+
+    if decode == "fast":
+        with stage("decode"):
+            payload = base64.b64decode(row_codec.loads(body)["result"])
+            records = row_codec.decode_records(spec, payload)
+            del payload
+        return sync_records(spec, records)
+    _fields, rows = open_report(_chunks(body))
+    return sync_rows(spec, timed_iter(rows or ()))
+
+
+def run_scenario(spec, scenario: str, n: int, body: bytes, decode: str) -> Dict[str, Any]:
+    import run_history
+    import sqlite_dialect
+
+    gc.collect()
+    _reset_peak_rss()
+    sqlite_dialect.round_trips(reset=True)
+    with run_history.track(spec.code) as run:
+        t0 = time.perf_counter()
+        ok, msg, _new = _sync(spec, body, decode)
+        elapsed = time.perf_counter() - t0
+    return {
+        "task": spec.code, "rows": n, "scenario": scenario, "ok": ok, "msg": msg,
+        "seconds": round(elapsed, 3), "rows_per_sec": round(n / elapsed) if elapsed else 0,
+        "peak_rss_mb": _peak_rss_mb(), "round_trips": sqlite_dialect.round_trips(),
+        "counts": dict(run.counts), "stages": run.stages_ms(),
+    }
+
+
+def _print_result(r: Dict[str, Any]) -> None:
+    from run_history import format_stages
+
+    rss = f"{r['peak_rss_mb']:.0f} MB" if r["peak_rss_mb"] is not None else "-"
+    c = r["counts"]
+    print(f"{r['task']:<7} {r['rows']:>9,} {r['scenario']:<10} {r['seconds']:>8.2f} sn "
+          f"{r['rows_per_sec']:>10,} satır/sn  RSS {rss:>8}  gidiş-dönüş {r['round_trips']:>5}  "
+          f"+{c.get('inserted', 0)} ~{c.get('updated', 0)} -{c.get('deleted', 0)}", flush=True)
+    print(f"        {format_stages(r['stages'])}" if r["ok"] else f"        HATA: {r['msg']}", flush=True)
+
+
+def run_bench(tasks: List[str], sizes: List[int], decode: str = "stream", diff: str = "client",
+              churn: float = 0.1, workdir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Geçici bir data.json / SQLite dosyasıyla tüm görev x boyut x senaryo kombinasyonlarını çalıştırır."""
+    own_dir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="hednova_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, "bench.db")
+    cfg_path = os.path.join(workdir, "data.json")
+    with open(cfg_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "hednova": {"connectionstring": f"sqlite:///{db_path}"},
+            "sync": {"diff": diff},
+            "schema": {"create_indexes": True},
+            "history": {"path": os.path.join(workdir, "run_history.db")},
+        }, f)
+    CONFIG.path = cfg_path
+
+    from sql_crud import close_pools, ensure_schema
+    from sync_specs import SPECS
+
+    results: List[Dict[str, Any]] = []
+    try:
+        for code in tasks:
+            spec = SPECS[code]
+            for n in sizes:
+                create_table(db_path, spec)
+                ensure_schema(spec, create=True)
+                bodies = {"full": make_body(make_rows(spec, n))}
+                bodies["no-change"] = bodies["full"]
+                for scenario in SCENARIOS:
+                    if scenario == "churn":
+                        bodies = {"churn": make_body(make_rows(spec, n, churn))}
+                    r = run_scenario(spec, scenario, n, bodies[scenario], decode)
+                    _print_result(r)
+                    results.append(r)
+                del bodies
+    finally:
+        close_pools()
+        if own_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from sync_specs import SPECS
+
+    parser = argparse.ArgumentParser(prog="bench_sync", description="Senkron motoru çevrimdışı benchmark (SQLite)")
+    parser.add_argument("--tasks", nargs="*", metavar="ENT-XX", help="varsayılan: tüm kayıtlı görevler")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"satır sayıları (varsayılan {DEFAULT_SIZES})")
+    parser.add_argument("--decode", choices=("stream", "fast"), default="stream")
+    parser.add_argument("--diff", choices=("client", "server"), default="client")
+    parser.add_argument("--churn", type=float, default=0.1, help="churn senaryosunda değişen satır oranı")
+    parser.add_argument("--workdir", help="SQLite dosyasının tutulacağı klasör (verilirse silinmez)")
+    parser.add_argument("--json", dest="json_path", help="sonuçları JSON olarak bu dosyaya yaz")
+    args = parser.parse_args(argv)
+
+    tasks = args.tasks or sorted(SPECS)
+    unknown = [c for c in tasks if c not in SPECS]
+    if unknown:
+        print(f"Tanımsız görev: {', '.join(unknown)}")
+        return 2
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+
+    print(f"decode={args.decode} diff={args.diff} churn={args.churn:.0%}")
+    results = run_bench(tasks, sizes, args.decode, args.diff, args.churn, args.workdir)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+# cli.py
+# -*- coding: utf-8 -*-
+"""
+Arayüzsüz (headless) giriş noktası; Linux sunucuda servis olarak çalıştırmak için.
+PyQt içe aktarılmaz; pyodbc ve requests ancak ilk DB/HTTP çağrısında yüklenir.
+
+  python cli.py sync ENT-11 [ENT-12 ...]   seçilen görevleri çalıştırır
+  python cli.py sync --all                 tüm VA görevlerini bağımlılık sırasıyla çalıştırır
+  python cli.py sync --all --full          delta ayarından bağımsız tam senkron (silinenler dahil)
+  python cli.py daemon [--interval 15]     tüm görevleri periyodik olarak çalıştırır
+  python cli.py tenants [AD ...]           data.json "tenants" listesindeki firmaları paralel senkronlar
+  python cli.py schema [--check]           senkron tablolarının indekslerini kontrol eder / oluşturur
+  python cli.py schema --trim              ayrıca eski kayıtlarda anahtar değerlerini kırpar (görevin scope'unda)
+
+Klasör doğrudan da çalıştırılabilir: python IntegratorToHednova sync --all
+Çıkış kodu: 0 başarılı, 1 en az bir görev başarısız, 2 kullanım/yapılandırma hatası.
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_INTERVAL_MINUTES = 15
+
+
+def _log(text: str) -> None:
+    from app_log import get_logger
+
+    get_logger("cli").info(text)
+
+
+def _load_va_rows() -> Optional[List[Dict]]:
+    from sql_crud import fetch_va_rows
+
+    ok, rows, msg = fetch_va_rows()
+    if not ok:
+        _log(f"VA satırları okunamadı: {msg}")
+        return None
+    return rows
+
+
+def _print_result(code: str, res) -> bool:
+    if res is None:
+        return False
+    if isinstance(res, Exception):
+        _log(f"{code}: HATA {type(res).__name__}: {res}")
+        return False
+    _log(f"{code}: {res.get('text', '')}")
+    return bool(res.get("ok"))
+
+
+def _sync_all(va_rows: List[Dict], max_workers: Optional[int], mode: str = "auto",
+              pipeline: Optional[bool] = None) -> bool:
+    from sync_tasks import run_all_va_tasks
+
+    results = run_all_va_tasks(
+        va_rows, max_workers=max_workers,
+        on_start=lambda c: _log(f"{c}: başladı"),
+        on_skip=lambda c, dep: _log(f"{c}: atlandı (bağımlı olduğu {dep} başarısız oldu)"),
+        mode=mode, pipeline=pipeline,
+    )
+    ok = True
+    for code in sorted(results):
+        ok = _print_result(code, results[code]) and ok
+    return ok
+
+
+def cmd_sync(args) -> int:
+    if not args.all and not args.codes:
+        _log("Görev kodu ya da --all verilmeli.")
+        return 2
+
+    va_rows = _load_va_rows()
+    if va_rows is None:
+        return 2
+
+    started = time.perf_counter()
+    if args.all:
+        ok = _sync_all(va_rows, args.workers, args.mode, args.pipeline)
+    else:
+        from sync_tasks import run_va_task
+
+        by_code = {r["CODE"]: r for r in va_rows}
+        ok = True
+        for code in args.codes:
+            row = by_code.get(code)
+            if row is None:
+                _log(f"{code}: KR_ENTEGRASYONE'de VA görevi olarak bulunamadı.")
+                ok = False
+                continue
+            ok = _print_result(code, run_va_task(code, row["RESULT2"], row["RESULT3"], args.mode)) and ok
+    _log(f"Bitti ({time.perf_counter() - started:.1f} sn).")
+    return 0 if ok else 1
+
+
+def _daemon_interval(arg_minutes: Optional[float]) -> float:
+    """--interval verilmezse data.json'daki isteğe bağlı "daemon": {"interval_minutes": N}."""
+    if arg_minutes is not None:
+        return float(arg_minutes)
+    from config import CONFIG
+
+    try:
+        return float((CONFIG.data.get("daemon") or {}).get("interval_minutes", DEFAULT_INTERVAL_MINUTES))
+    except (FileNotFoundError, TypeError, ValueError):
+        return float(DEFAULT_INTERVAL_MINUTES)
+
+
+def cmd_daemon(args) -> int:
+    interval = max(0.1, _daemon_interval(args.interval)) * 60
+    stop = threading.Event()
+
+    def _on_signal(signum, _frame):
+        _log(f"Sinyal {signum} alındı, mevcut tur bitince çıkılıyor.")
+        stop.set()
+
+    signal.signal(signal.SIGINT, _on_signal)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, _on_signal)
+
+    _log(f"Daemon başladı; tur aralığı {interval / 60:g} dk.")
+    while not stop.is_set():
+        started = time.monotonic()
+        va_rows = _load_va_rows()
+        if va_rows is not None:
+            try:
+                _sync_all(va_rows, args.workers)
+            except Exception as e:
+                _log(f"Tur hatası: {type(e).__name__}: {e}")
+        # Bir turun süresi aralıktan düşülür; tur uzun sürdüyse hemen yenisine geçilir
+        stop.wait(max(0.0, interval - (time.monotonic() - started)))
+    _log("Daemon durdu.")
+    return 0
+
+
+def cmd_tenants(args) -> int:
+    from tenants import load_tenants, run_tenants
+
+    try:
+        tenants = load_tenants(args.names or None)
+    except (ValueError, FileNotFoundError) as e:
+        _log(str(e))
+        return 2
+    if not tenants:
+        _log("data.json'da \"tenants\": {\"list\": [...]} tanımlı değil.")
+        return 2
+
+    started = time.perf_counter()
+    results = run_tenants(
+        tenants, mode=args.mode, max_parallel=args.max_parallel, workers_per_tenant=args.workers,
+        pipeline=args.pipeline,
+        on_task_done=lambda name, code, res: _print_result(f"{name}/{code}", res),
+        on_tenant_done=lambda name, summary: _log(f"{name}: {summary['text']}"),
+    )
+    _log(f"Bitti ({time.perf_counter() - started:.1f} sn).")
+    return 0 if all(r["ok"] for r in results.values()) else 1
+
+
+def cmd_schema(args) -> int:
+    from sql_crud import ensure_schema, trim_key_values
+    from sync_specs import resolve_spec
+
+    va_rows = _load_va_rows()
+    if va_rows is None:
+        return 2
+    ok = True
+    seen = set()
+    for row in va_rows:
+        spec = resolve_spec(row["CODE"], row["RESULT3"])
+        if spec is None or (spec.table, spec.keys, tuple(spec.scope)) in seen:
+            continue
+        seen.add((spec.table, spec.keys, tuple(spec.scope)))
+        res_ok, msg, warnings = ensure_schema(spec, create=not args.check)
+        _log(f"{spec.code}: {msg}")
+        for w in warnings:
+            _log(f"{spec.code}: UYARI {w}")
+        ok = ok and res_ok and not warnings
+        if args.trim:
+            res_ok, msg = trim_key_values(spec)
+            _log(f"{spec.code}: {msg}")
+            ok = ok and res_ok
+    return 0 if ok else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="integrator", description="DİA -> Hednova entegrasyonu (arayüzsüz)")
+    parser.add_argument("--config", help="data.json yolu (varsayılan: çalışma klasöründeki data.json)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_sync = sub.add_parser("sync", help="görev(ler)i bir kez çalıştır")
+    p_sync.add_argument("codes", nargs="*", metavar="ENT-XX")
+    p_sync.add_argument("--all", action="store_true", help="tüm VA görevleri")
+    p_sync.add_argument("--workers", type=int, help="--all için eşzamanlı görev sayısı")
+    p_sync.add_argument("--pipeline", action="store_true", default=None,
+                        help="--all için fetch/decode/write aşamalarını görevler arasında örtüştür")
+    p_mode = p_sync.add_mutually_exclusive_group()
+    p_mode.add_argument("--full", dest="mode", action="store_const", const="full",
+                        help="tam senkron (silinenler dahil)")
+    p_mode.add_argument("--delta", dest="mode", action="store_const", const="delta",
+                        help="RESULT5'ten beri değişenler (delta_param tanımlı görevlerde)")
+    p_sync.set_defaults(mode="auto", func=cmd_sync)
+
+    p_daemon = sub.add_parser("daemon", help="tüm görevleri periyodik çalıştır")
+    p_daemon.add_argument("--interval", type=float, help="tur aralığı (dk)")
+    p_daemon.add_argument("--workers", type=int, help="eşzamanlı görev sayısı")
+    p_daemon.set_defaults(func=cmd_daemon)
+
+    p_tenants = sub.add_parser("tenants", help="birden çok firma/dönemi kendi veritabanlarına senkronla")
+    p_tenants.add_argument("names", nargs="*", metavar="AD", help="yalnızca bu kiracılar (varsayılan: tümü)")
+    p_tenants.add_argument("--max-parallel", type=int, help="tüm kiracılarda eşzamanlı görev sınırı")
+    p_tenants.add_argument("--workers", type=int, help="kiracı başına eşzamanlı görev sayısı")
+    p_tenants.add_argument("--pipeline", action="store_true", default=None,
+                           help="fetch/decode/write aşamalarını görevler arasında örtüştür")
+    p_tmode = p_tenants.add_mutually_exclusive_group()
+    p_tmode.add_argument("--full", dest="mode", action="store_const", const="full",
+                         help="tam senkron (silinenler dahil)")
+    p_tmode.add_argument("--delta", dest="mode", action="store_const", const="delta",
+                         help="RESULT5'ten beri değişenler (delta_param tanımlı görevlerde)")
+    p_tenants.set_defaults(mode="auto", func=cmd_tenants)
+
+    p_schema = sub.add_parser("schema", help="tablo indekslerini kontrol et / oluştur")
+    p_schema.add_argument("--check", action="store_true", help="oluşturma, yalnızca eksikleri bildir")
+    p_schema.add_argument("--trim", action="store_true",
+                          help="anahtar değerlerindeki baş/son boşlukları temizle (yalnızca görevin scope'u)")
+    p_schema.set_defaults(func=cmd_schema)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.config:
+        from config import CONFIG
+
+        CONFIG.path = os.path.abspath(args.config)
+    from app_log import setup_logging, shutdown_logging
+
+    setup_logging(console=True)
+    try:
+        return args.func(args)
+    finally:
+        if "sql_crud" in sys.modules:
+            sys.modules["sql_crud"].close_pools()
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
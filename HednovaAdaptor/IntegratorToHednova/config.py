@@ -0,0 +1,120 @@
+# config.py
+# -*- coding: utf-8 -*-
+"""
+data.json için tek, paylaşılan yapılandırma nesnesi.
+Dosya bir kez okunur; sonraki erişimlerde yalnızca mtime/boyut değişmişse yeniden
+yüklenir. Çözümlenmiş bağlantı cümlesi ve seçilen ODBC sürücüsü de burada saklanır.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+PREFERRED_ODBC_DRIVERS = [
+    "ODBC Driver 18 for SQL Server",
+    "ODBC Driver 17 for SQL Server",
+    "SQL Server Native Client 11.0",
+    "SQL Server"
+]
+
+
+def _pick_odbc_driver() -> str:
+    """Makinede yüklü SQL Server ODBC sürücülerinden en uygun olanı seç."""
+    try:
+        import pyodbc
+        drivers = pyodbc.drivers()
+    except Exception:
+        drivers = []
+    for p in PREFERRED_ODBC_DRIVERS:
+        if p in drivers:
+            return p
+    # Hiçbiri bulunamazsa boş dön (kullanıcıya anlamlı hata vereceğiz)
+    return ""
+
+
+def build_conn_string(base: str, driver_name: str) -> str:
+    """connectionstring'e gerekirse DRIVER ve Encrypt/Trust seçeneklerini ekler."""
+    base = base.strip()
+
+    # Driver yoksa otomatik ekle
+    if "driver=" not in base.lower():
+        if not driver_name:
+            raise RuntimeError(
+                "Uygun SQL Server ODBC sürücüsü bulunamadı. Lütfen 'ODBC Driver 18 for SQL Server' "
+                "veya 'ODBC Driver 17 for SQL Server' kurun."
+            )
+        base = f"Driver={{{driver_name}}};" + base
+
+    # ODBC 18'de varsayılan Encrypt=yes. TrustServerCertificate varsa sorun yok.
+    # Emin olmak için eksikse ekleyelim:
+    low = base.lower()
+    if "encrypt=" not in low and "trustservercertificate=" not in low:
+        # Sunucuda sertifika yönetmiyorsak şöyle güvenli bir ikili iyi çalışır:
+        base += "Encrypt=yes;TrustServerCertificate=yes;"
+
+    return base
+
+
+class AppConfig:
+    """data.json önbelleği. Dosya bulunamazsa FileNotFoundError fırlatır."""
+
+    def __init__(self, path: str = "data.json"):
+        self.path = path
+        self._lock = threading.RLock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._data: Dict[str, Any] = {}
+        self._conn_str: Optional[str] = None
+        self._driver: Optional[str] = None
+
+    def _current_stamp(self) -> Tuple[int, int]:
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Güncel data.json içeriği (değişmemişse önbellekten)."""
+        stamp = self._current_stamp()
+        with self._lock:
+            if stamp != self._stamp:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+                self._stamp = stamp
+                self._conn_str = None
+            return self._data
+
+    def reload(self) -> Dict[str, Any]:
+        with self._lock:
+            self._stamp = None
+        return self.data
+
+    @property
+    def integrator(self) -> Dict[str, Any]:
+        return self.data["integrator"]
+
+    @property
+    def odbc_driver(self) -> str:
+        """Seçilen ODBC sürücüsü (süreç boyunca bir kez hesaplanır)."""
+        with self._lock:
+            if self._driver is None:
+                self._driver = _pick_odbc_driver()
+            return self._driver
+
+    def conn_string(self) -> str:
+        """Hednova bağlantı cümlesi (DRIVER/Encrypt eklenmiş hali), data.json değişene kadar önbellekte."""
+        data = self.data
+        with self._lock:
+            if self._conn_str is None:
+                self._conn_str = self.resolve_conn_string(data["hednova"]["connectionstring"])
+            return self._conn_str
+
+    def resolve_conn_string(self, base: str) -> str:
+        """data.json biçimindeki bir connectionstring'e DRIVER/Encrypt ekler (kiracılar da kullanır, bkz. tenants)."""
+        if base.strip().lower().startswith("sqlite:///"):
+            # ODBC dışı SQLite bağlantısı (bkz. sqlite_dialect); sürücü eklenmez
+            return base.strip()
+        driver = "" if "driver=" in base.lower() else self.odbc_driver
+        return build_conn_string(base, driver)
+
+
+CONFIG = AppConfig()
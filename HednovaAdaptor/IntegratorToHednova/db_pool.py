@@ -0,0 +1,248 @@
+# db_pool.py
+# -*- coding: utf-8 -*-
+"""
+Thread-safe veritabanı bağlantı havuzu.
+Her çağrıda yeniden pyodbc.connect (uzak sunucuya TLS el sıkışması) yapmak yerine
+bağlantılar havuzda tutulur ve ödünç verilir. Ödünç alınan bağlantının close()
+çağrısı bağlantıyı kapatmaz, havuza geri bırakır.
+"""
+
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Tuple
+
+# Kopmuş bağlantıyı işaret eden ODBC SQLSTATE kodları / mesaj parçaları
+_DISCONNECT_STATES = ("08S01", "08001", "08003", "08004", "08007", "01002")
+_DISCONNECT_TEXTS = ("communication link failure", "tcp provider", "connection is busy",
+                     "connection was forcibly closed", "broken pipe")
+
+_local = threading.local()
+
+
+class PoolTimeout(RuntimeError):
+    """Havuzdaki tüm bağlantılar meşgulken bekleme süresi doldu."""
+
+
+def is_disconnect(exc: BaseException) -> bool:
+    """Hata, sunucu bağlantısının koptuğunu gösteriyor mu?"""
+    args = getattr(exc, "args", ()) or ()
+    if args and str(args[0]) in _DISCONNECT_STATES:
+        return True
+    text = str(exc).lower()
+    return any(t in text for t in _DISCONNECT_TEXTS)
+
+
+def reconnecting(fn: Callable) -> Callable:
+    """
+    (ok, ...) tuple'ı döndüren sql_crud fonksiyonları için: çağrı kopmuş bir bağlantı
+    yüzünden başarısız olduysa (havuz o bağlantıyı atmıştır) bir kez daha dener.
+    İç içe çağrılarda dıştaki çağrının gördüğü kopma silinmez; içteki kopma dışarıya da taşınır.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        outer = getattr(_local, "broken", False)
+        _local.broken = False
+        try:
+            result = fn(*args, **kwargs)
+            if isinstance(result, tuple) and result and result[0] is False and _local.broken:
+                _local.broken = False
+                result = fn(*args, **kwargs)
+            return result
+        finally:
+            _local.broken = outer or _local.broken
+    return wrapper
+
+
+class _PooledCursor:
+    """Cursor vekili: hatalarda bağlantı kopmuş mu diye bakar, gerisini asıl cursor'a bırakır."""
+    __slots__ = ("_cur", "_owner")
+
+    def __init__(self, cur, owner: "PooledConnection"):
+        object.__setattr__(self, "_cur", cur)
+        object.__setattr__(self, "_owner", owner)
+
+    def __getattr__(self, name):
+        attr = getattr(self._cur, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as e:
+                self._owner._note_error(e)
+                raise
+            return self if result is self._cur else result
+        return call
+
+    def __setattr__(self, name, value):
+        setattr(self._cur, name, value)
+
+    def __iter__(self):
+        return iter(self._cur)
+
+
+class PooledConnection:
+    """Havuzdan ödünç alınmış bağlantı; close() bağlantıyı havuza geri bırakır."""
+
+    def __init__(self, pool: "ConnectionPool", raw):
+        self._pool = pool
+        self._raw = raw
+        self._broken = False
+
+    def _note_error(self, exc: BaseException) -> None:
+        if is_disconnect(exc):
+            self._broken = True
+            _local.broken = True
+
+    def cursor(self):
+        try:
+            return _PooledCursor(self._raw.cursor(), self)
+        except Exception as e:
+            self._note_error(e)
+            raise
+
+    def commit(self):
+        try:
+            self._raw.commit()
+        except Exception as e:
+            self._note_error(e)
+            raise
+
+    def rollback(self):
+        try:
+            self._raw.rollback()
+        except Exception as e:
+            self._note_error(e)
+            raise
+
+    def close(self):
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool._release(raw, self._broken)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    factory : yeni ham bağlantı üreten fonksiyon (ör. lambda: pyodbc.connect(...))
+    max_size: aynı anda açık olabilecek en fazla bağlantı
+    idle_timeout: bu süreden uzun boşta kalan bağlantılar kapatılır (sn)
+    ping_after  : bu süreden uzun boşta kalmış bağlantı verilmeden önce SELECT 1 ile sınanır (sn)
+    """
+
+    def __init__(self, factory: Callable[[], object], max_size: int = 4,
+                 idle_timeout: float = 300.0, ping_after: float = 30.0, acquire_timeout: float = 30.0):
+        self._factory = factory
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self.acquire_timeout = acquire_timeout
+        self._idle: List[Tuple[object, float]] = []
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # ---------- ödünç alma / bırakma ----------
+    def acquire(self, autocommit: bool = True) -> PooledConnection:
+        deadline = time.monotonic() + self.acquire_timeout
+        expired: List[object] = []
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Bağlantı havuzu kapatıldı.")
+            expired = self._evict_idle_locked()
+            while True:
+                if self._idle:
+                    raw, last_used = self._idle.pop()      # en son kullanılan (sıcak) bağlantı
+                    break
+                if self._in_use < self.max_size:
+                    raw, last_used = None, 0.0
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"Bağlantı havuzu dolu ({self.max_size}); boş bağlantı beklenirken süre doldu.")
+                self._cond.wait(remaining)
+            self._in_use += 1
+
+        for old in expired:
+            self._close_quietly(old)
+
+        try:
+            if raw is not None and time.monotonic() - last_used > self.ping_after and not self._ping(raw):
+                self._close_quietly(raw)
+                raw = None
+            if raw is None:
+                raw = self._factory()
+            raw.autocommit = autocommit
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, raw)
+
+    def _release(self, raw, broken: bool) -> None:
+        if not broken:
+            try:
+                # Açık kalmış bir transaction havuza taşınmasın
+                if not raw.autocommit:
+                    raw.rollback()
+            except Exception:
+                broken = True
+        with self._cond:
+            self._in_use -= 1
+            keep = not broken and not self._closed
+            if keep:
+                self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+        if not keep:
+            self._close_quietly(raw)
+
+    # ---------- bakım ----------
+    def _evict_idle_locked(self) -> List[object]:
+        now = time.monotonic()
+        alive = [(c, t) for c, t in self._idle if now - t <= self.idle_timeout]
+        expired = [c for c, t in self._idle if now - t > self.idle_timeout]
+        self._idle = alive
+        return expired
+
+    @staticmethod
+    def _ping(raw) -> bool:
+        try:
+            cur = raw.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(raw) -> None:
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def close_all(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for raw, _ in idle:
+            self._close_quietly(raw)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"idle": len(self._idle), "in_use": self._in_use, "max_size": self.max_size}
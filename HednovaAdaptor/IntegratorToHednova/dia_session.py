@@ -0,0 +1,113 @@
+# dia_session.py
+# -*- coding: utf-8 -*-
+"""
+DİA session id'sini süreç içinde önbelleğe alan yönetici.
+Her rapor çağrısında KR_ENTEGRASYONE'ye gitmek yerine session id alındığı zamanla
+birlikte bellekte tutulur; süresi dolmadan önce yenilenir, DİA geçersiz session
+bildirirse bir kez yeniden login olunur. DB'ye yalnızca id gerçekten değiştiğinde yazılır.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+# DİA'nın geçersiz/süresi dolmuş session için döndürdüğü kod ve mesaj parçaları
+INVALID_SESSION_CODES = {"401", "419"}
+INVALID_SESSION_TEXTS = ("invalid_session", "invalid session", "session_id", "oturum")
+
+
+def is_invalid_session(code: str, msg: str) -> bool:
+    if str(code) in INVALID_SESSION_CODES:
+        return True
+    low = (msg or "").lower()
+    return str(code) != "200" and any(t in low for t in INVALID_SESSION_TEXTS)
+
+
+class DiaSessionManager:
+    """
+    login_fn : () -> {'code': '200', 'msg': '<session_id>'} (api_requests.login)
+    load_fn  : () -> (ok, session_id, 'YYYY-MM-DD HH:MM:SS')  DB'deki son session (soğuk başlangıç)
+    store_fn : (session_id, 'YYYY-MM-DD HH:MM:SS') -> (ok, msg)  DB'ye yazma
+    ttl      : session ömrü (sn)
+    refresh_margin: süre dolmadan bu kadar önce proaktif yenile (sn)
+    """
+
+    def __init__(self, login_fn: Callable[[], Dict], load_fn: Callable[[], Tuple[bool, str, str]],
+                 store_fn: Callable[[str, str], Tuple[bool, str]],
+                 ttl: float = 30 * 60, refresh_margin: float = 5 * 60):
+        self._login_fn = login_fn
+        self._load_fn = load_fn
+        self._store_fn = store_fn
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self._lock = threading.RLock()
+        self._sid: Optional[str] = None
+        self._acquired: float = 0.0          # time.time()
+        self._loaded_from_db = False
+        self.last_result: Dict = {}          # son login yanıtı (UI için)
+        self.last_db_msg: str = ""
+
+    # ---------- durum ----------
+    @property
+    def session_id(self) -> Optional[str]:
+        return self._sid
+
+    @property
+    def acquired_at(self) -> Optional[datetime]:
+        return datetime.fromtimestamp(self._acquired) if self._sid else None
+
+    def _is_fresh(self) -> bool:
+        return bool(self._sid) and (time.time() - self._acquired) < (self.ttl - self.refresh_margin)
+
+    # ---------- kullanım ----------
+    def get(self) -> Tuple[bool, str]:
+        """
+        Geçerli session id'yi döndürür; yoksa/yaşlandıysa yeniler.
+        Dönüş: (ok, session_id_or_error_message)
+        """
+        with self._lock:
+            if not self._sid and not self._loaded_from_db:
+                self._loaded_from_db = True
+                self._load_from_db()
+            if self._is_fresh():
+                return (True, self._sid)
+            return self.refresh()
+
+    def refresh(self) -> Tuple[bool, str]:
+        """Login olup yeni session id alır; id değiştiyse DB'ye yazar."""
+        with self._lock:
+            result = self._login_fn()
+            self.last_result = result
+            code = str(result.get("code", "0"))
+            msg = str(result.get("msg", ""))
+            if code != "200" or not msg:
+                return (False, f"Login başarısız (code: {code}): {msg}")
+
+            now = time.time()
+            changed = msg != self._sid
+            self._sid, self._acquired = msg, now
+            if changed:
+                text_dt = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+                ok, self.last_db_msg = self._store_fn(msg, text_dt)
+                if not ok:
+                    self.last_db_msg = f"HATA - {self.last_db_msg}"
+            else:
+                self.last_db_msg = "değişmedi"
+            return (True, msg)
+
+    def invalidate(self, session_id: Optional[str] = None) -> None:
+        """DİA session'ı reddettiğinde çağrılır; bir sonraki get() yeniden login olur."""
+        with self._lock:
+            if session_id is None or session_id == self._sid:
+                self._acquired = 0.0
+
+    def _load_from_db(self) -> None:
+        ok, sid, text_dt = self._load_fn()
+        if not ok or not sid:
+            return
+        try:
+            acquired = datetime.strptime(text_dt.strip(), "%Y-%m-%d %H:%M:%S").timestamp()
+        except (ValueError, AttributeError):
+            acquired = 0.0
+        self._sid, self._acquired = sid, acquired
@@ -0,0 +1,136 @@
+# http_client.py
+# -*- coding: utf-8 -*-
+"""
+DİA WS API için paylaşılan HTTP istemcisi.
+Tek bir requests.Session üzerinden keep-alive bağlantı havuzu, bağlantı/okuma
+zaman aşımı, gzip ve geçici hatalarda (bağlantı hatası, 5xx) üstel bekleme +
+jitter ile yeniden deneme sağlar. Her çağrının süresi ölçülür.
+Tekrarı güvenli olmayan çağrılar (login: disconnect_same_user ile önceki session'ı düşürür)
+idempotent=False ile yapılır; bunlar yalnızca istek sunucuya ulaşmadan başarısız olduysa
+(bağlantı kurulamadı) ya da sunucu 503 ile reddettiyse yeniden denenir.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, Optional, Tuple
+
+from config import CONFIG
+
+if TYPE_CHECKING:
+    import requests
+
+RETRY_STATUSES = {500, 502, 503, 504}
+SAFE_RETRY_STATUSES = {503}   # idempotent olmayan çağrılarda: istek işlenmeden reddedildi
+
+
+def _not_sent(exc: Exception) -> bool:
+    """İstek sunucuya hiç gönderilemedi mi (bağlantı kurulamadı / bağlantı zaman aşımı)?"""
+    import requests
+    from urllib3.exceptions import NewConnectionError
+
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    # requests.ConnectionError(MaxRetryError(reason=NewConnectionError)): soket hiç açılamadı
+    cause = exc.args[0] if exc.args else None
+    return isinstance(cause, NewConnectionError) or isinstance(getattr(cause, "reason", None), NewConnectionError)
+
+
+class DiaHttpClient:
+    """
+    connect_timeout / read_timeout: sn
+    retries     : ilk denemeye ek olarak en fazla kaç kez yeniden denenecek
+    backoff     : ilk bekleme (sn); her denemede 2 katına çıkar, backoff_max ile sınırlı
+    pool_size   : host başına açık tutulacak keep-alive bağlantı sayısı
+    """
+
+    def __init__(self, connect_timeout: float = 10.0, read_timeout: float = 60.0, retries: int = 3,
+                 backoff: float = 0.5, backoff_max: float = 8.0, pool_size: int = 8):
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+        # requests ilk istemci oluşturulurken yüklenir (CLI açılış süresi için)
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Content-Type": "application/json;charset=UTF-8",
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+
+        # Son çağrıların ölçümleri: {"url", "status", "latency_ms", "attempts"}
+        self.calls: Deque[Dict[str, Any]] = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def _sleep_before_retry(self, attempt: int) -> None:
+        # Full jitter: [0, min(max, base * 2^attempt)]
+        cap = min(self.backoff_max, self.backoff * (2 ** attempt))
+        time.sleep(random.uniform(0, cap))
+
+    def post_json(self, url: str, payload: Dict[str, Any],
+                  timeout: Optional[Tuple[float, float]] = None, idempotent: bool = True,
+                  **kwargs) -> "requests.Response":
+        """
+        JSON POST. Geçici hatalarda yeniden dener; son denemede de başarısızsa istisnayı
+        (ya da son 5xx yanıtını) olduğu gibi döndürür. Yanıta latency_ms ve attempts eklenir.
+        idempotent=False: okuma zaman aşımı / kopan bağlantı / 500-502-504 yeniden denenmez
+        (istek sunucuda işlenmiş olabilir); yalnızca gönderilemeyen istek ve 503 denenir.
+        """
+        import requests
+
+        statuses = RETRY_STATUSES if idempotent else SAFE_RETRY_STATUSES
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                resp = self.session.post(url, json=payload, timeout=timeout or self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retries or not (idempotent or _not_sent(e)):
+                    self._record(url, None, started, attempt + 1)
+                    raise
+            else:
+                if resp.status_code not in statuses or attempt >= self.retries:
+                    resp.latency_ms = self._record(url, resp.status_code, started, attempt + 1)
+                    resp.attempts = attempt + 1
+                    return resp
+                resp.close()
+            self._sleep_before_retry(attempt)
+            attempt += 1
+
+    def _record(self, url: str, status: Optional[int], started: float, attempts: int) -> float:
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            self.calls.append({"url": url, "status": status, "latency_ms": latency_ms, "attempts": attempts})
+        return latency_ms
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: Optional[DiaHttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> DiaHttpClient:
+    """
+    Süreç genelinde paylaşılan istemci. Ayarlar data.json'daki isteğe bağlı "http" bloğundan okunur:
+      "http": {"connect_timeout": 10, "read_timeout": 60, "retries": 3, "backoff": 0.5}
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            try:
+                opts = dict(CONFIG.data.get("http") or {})
+            except FileNotFoundError:
+                opts = {}
+            allowed = {"connect_timeout", "read_timeout", "retries", "backoff", "backoff_max", "pool_size"}
+            _client = DiaHttpClient(**{k: v for k, v in opts.items() if k in allowed})
+        return _client
@@ -2,10 +2,14 @@
 # -*- coding: utf-8 -*-
 
 from PyQt5 import QtCore, QtWidgets
-from datetime import datetime
 
 from sql_crud import *
 from api_requests import *
+import run_history
+from progress import CancelToken
+from sync_tasks import run_all_va_tasks, run_va_task
+from va_cache import load_cached_va_rows, refresh_va_rows
+from workers import DagSignals, ProgressSignals, Worker
 
 # ---------------------------
 # Üst Kart: Session ID Alımı
@@ -96,6 +100,8 @@ class VaTaskCard(QtWidgets.QFrame):
                  title_result4: str, last_update_result5: str, parent=None):
         super().__init__(parent)
         self.setObjectName("card")
+        self._busy = False
+        self.cancel_token = None   # elle başlatılan iş sürerken CancelToken
         self._build(code, result2, result3, title_result4, last_update_result5)
 
     def _build(self, code, result2, result3, title_result4, last_update_result5):
@@ -140,8 +146,8 @@ class VaTaskCard(QtWidgets.QFrame):
         head.addWidget(self.btnStart, 0, QtCore.Qt.AlignRight)
         root.addLayout(head)
 
-        # 2x2 tablo – üst satır başlıklar
-        self.table = QtWidgets.QTableWidget(2, 2)
+        # 2x3 tablo – üst satır başlıklar
+        self.table = QtWidgets.QTableWidget(2, 3)
         self.table.horizontalHeader().setVisible(False)
         self.table.verticalHeader().setVisible(False)
         self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
@@ -153,12 +159,21 @@ class VaTaskCard(QtWidgets.QFrame):
 
         self._set_cell(0, 0, "Son Güncelleme Bilgisi", True)
         self._set_cell(0, 1, "API Yanıtı", True)
+        self._set_cell(0, 2, "Son Çalışma Süresi", True)
 
         self.cellLastUpdate = self._set_cell(1, 0, last_update_result5 or "-")
         self.cellApi        = self._set_cell(1, 1, "-")
+        self.cellDuration   = self._set_cell(1, 2, "-")
 
         root.addWidget(self.table)
 
+        # Senkron ilerlemesi (yalnızca iş sürerken görünür)
+        self.progressBar = QtWidgets.QProgressBar()
+        self.progressBar.setFixedHeight(18)
+        self.progressBar.setTextVisible(True)
+        self.progressBar.hide()
+        root.addWidget(self.progressBar)
+
     def _set_cell(self, r, c, text, bold=False):
         it = QtWidgets.QTableWidgetItem(text)
         f = it.font(); f.setBold(bold); it.setFont(f)
@@ -166,6 +181,44 @@ class VaTaskCard(QtWidgets.QFrame):
         self.table.setItem(r, c, it)
         return it
 
+    # İş sürerken butonu kilitle (yeniden giriş koruması)
+    @property
+    def busy(self) -> bool:
+        return self._busy
+
+    # cancellable: iş sürerken buton 'İptal Et' olarak açık kalır
+    def set_busy(self, busy: bool, cancellable: bool = False):
+        self._busy = busy
+        self.btnStart.setEnabled(not busy or cancellable)
+        self.btnStart.setText(("İptal Et" if cancellable else "Çalışıyor...") if busy else "İşlemi Başlat")
+        if not busy:
+            self.progressBar.hide()
+
+    def set_cancelling(self):
+        self.btnStart.setEnabled(False)
+        self.btnStart.setText("İptal ediliyor...")
+
+    # ev: progress olayı; okuma sırasında toplam bilinmez (belirsiz çubuk)
+    def set_progress(self, ev):
+        bar = self.progressBar
+        if ev["phase"] == "read":
+            bar.setRange(0, 0)
+            bar.setFormat(f"{ev['rows']:,} satır okundu")
+        else:
+            total = ev["to_insert"] + ev["to_update"] + ev["to_delete"]
+            done = ev["inserted"] + ev["updated"] + ev["deleted"]
+            bar.setRange(0, max(total, 1))
+            bar.setValue(min(done, total) if total else 1)
+            bar.setFormat(f"yazılıyor %p%   +{ev['inserted']:,}/{ev['to_insert']:,}   "
+                          f"~{ev['updated']:,}/{ev['to_update']:,}   -{ev['deleted']:,}/{ev['to_delete']:,}")
+        bar.show()
+
+    # Son çalışma süresi + önceki çalışmalara göre eğilim; ipucunda aşama dökümü
+    def set_duration(self, summary):
+        self.cellDuration.setText(run_history.format_summary(summary))
+        if summary:
+            self.cellDuration.setToolTip(f"{summary['finished_at']}\n{run_history.format_stages(summary['stages'])}")
+
 
 # ---------------------------
 # Ana Pencere
@@ -176,15 +229,33 @@ class IntegrationWindow(QtWidgets.QWidget):
         self.setWindowTitle("Hednova ERP Entegrasyon Paneli")
         self.setFixedSize(1400, 850)  # sabit büyük pencere
 
-        # Session döngüsü için timer (30 dakika)
+        # Session kontrolü için timer (dakikada bir; SESSION yalnızca süresi dolmak üzereyse login olur)
         self._timer = QtCore.QTimer(self)
-        self._timer.setInterval(30 * 60 * 1000)
-        self._timer.timeout.connect(self._run_session_cycle)
+        self._timer.setInterval(60 * 1000)
+        self._timer.timeout.connect(lambda: self._run_session_cycle(force=False))
         self._running = False
-
+        self._session_busy = False
+
+        # Rapor/senkron/login işleri GUI iş parçacığı dışında çalışır
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(4)
+        self._jobs = set()
+
+        # Kartlar ve 'tümünü çalıştır' durumu
+        self._va_rows = []
+        self._cards = {}
+        self._run_all_busy = False
+        self._run_all_token = None
+        self._pending_va_rows = None   # iş sürerken DB'den gelen liste; iş bitince uygulanır
+        self._preflight = {}
+
+        # Pencere DB'yi beklemeden önbellekteki listeyle çizilir; güncel liste ve
+        # DİA/DB ön kontrolü arka planda, birbirini beklemeden çalışır
         self._build_ui()
         self._wire_session_button()
-        self._load_va_from_db()
+        self._load_va_cached()
+        self._refresh_va_rows()
+        self._run_preflight()
 
     # ---------- UI kur ----------
     def _build_ui(self):
@@ -198,9 +269,27 @@ class IntegrationWindow(QtWidgets.QWidget):
         main.addWidget(self.sessionCard)
 
         # 2) VA başlık
+        head = QtWidgets.QHBoxLayout()
         lbl = QtWidgets.QLabel("Tablolar")
         lbl.setStyleSheet("font-size: 14px; font-weight: 600; margin-top: 6px;")
-        main.addWidget(lbl)
+        head.addWidget(lbl, 0, QtCore.Qt.AlignLeft)
+
+        # Liste durumu (önbellek/DB) ve bağlantı ön kontrolü
+        self.lblStatus = QtWidgets.QLabel("")
+        self.lblStatus.setStyleSheet("color: #64748b; margin-top: 6px;")
+        head.addWidget(self.lblStatus, 0, QtCore.Qt.AlignLeft)
+        head.addStretch(1)
+        self.lblPreflight = QtWidgets.QLabel("")
+        self.lblPreflight.setStyleSheet("color: #64748b; margin-top: 6px;")
+        head.addWidget(self.lblPreflight, 0, QtCore.Qt.AlignRight)
+
+        # Tüm VA görevlerini bağımlılık sırasına göre (bağımsızları paralel) çalıştır
+        self.btnRunAll = QtWidgets.QPushButton("Tümünü Çalıştır")
+        self.btnRunAll.setCursor(QtCore.Qt.PointingHandCursor)
+        self.btnRunAll.setStyleSheet("QPushButton { background-color: #2563eb; color: #fff; font-weight: 600; padding: 8px 12px; border-radius: 8px; border: none; } QPushButton:hover { background-color: #1e40af; } QPushButton:disabled { background-color: #94a3b8; }")
+        self.btnRunAll.clicked.connect(self.on_run_all_clicked)
+        head.addWidget(self.btnRunAll, 0, QtCore.Qt.AlignRight)
+        main.addLayout(head)
 
         # 3) VA kart listesi (scroll alanı)
         self.scroll = QtWidgets.QScrollArea()
@@ -239,44 +328,121 @@ class IntegrationWindow(QtWidgets.QWidget):
             self._timer.stop()
             self._running = False
             self._set_btn_state(start=True)
+            self._cancel_running()      # süren senkronlar da partiler arasında durur
         else:
             self._running = True
             self._set_btn_state(start=False)
-            self._run_session_cycle()       # ilk tıklamada hemen
-            self._timer.start()             # sonra 30 dakikada bir
+            self._run_session_cycle(force=True)     # ilk tıklamada hemen login
+            self._timer.start()                     # sonra süresi dolmadan önce yenile
 
     # ---------- Her turda yapılacaklar (Session) ----------
-    def _run_session_cycle(self):
-        self.sessionCard.cellApi.setText("⏳ İstek gönderiliyor...")
-        result = login()  # {'code': '200', 'msg': '<session_id>'} veya hata
-        code = str(result.get("code", "0"))
-        msg  = str(result.get("msg", ""))
-
-        now_text_db = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        now_text_ui = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
-
-        self.sessionCard.cellApi.setText(f"code: {code}, msg: {msg}")
-
-        if code == "200":
-            self.sessionCard.cellSession.setText(msg)
-            self.sessionCard.cellDate.setText(now_text_ui)
-            ok, db_msg = update_session_row(session_id=msg, text_datetime=now_text_db)
-            suffix = f" | DB: {'OK' if ok else 'HATA'} - {db_msg}"
-            self.sessionCard.cellApi.setText(f"code: {code}, msg: {msg}{suffix}")
-        else:
+    def _run_session_cycle(self, force: bool = False):
+        if self._session_busy:
+            return
+        self._session_busy = True
+        before = SESSION.acquired_at
+        if force:
+            self.sessionCard.cellApi.setText("⏳ İstek gönderiliyor...")
+        # Login (HTTP + DB yazımı) arka planda
+        self._start_job(SESSION.refresh if force else SESSION.get,
+                        on_done=lambda res: self._on_session_done(res, before, force),
+                        on_error=lambda err: self._on_session_done((False, err), before, force))
+
+    def _on_session_done(self, res, before, force: bool):
+        self._session_busy = False
+        ok, sid_or_err = res
+        if not ok:
+            self.sessionCard.cellApi.setText(sid_or_err)
             self.sessionCard.cellSession.setText("- Hata oluştu -")
             self.sessionCard.cellDate.setText("-")
+            return
+
+        acquired = SESSION.acquired_at
+        if not force and acquired == before:
+            return  # önbellekteki session hâlâ geçerli; login yapılmadı
+
+        self.sessionCard.cellSession.setText(sid_or_err)
+        self.sessionCard.cellDate.setText(acquired.strftime("%d.%m.%Y %H:%M:%S") if acquired else "-")
+        self.sessionCard.cellApi.setText(f"code: 200, msg: {sid_or_err} | DB: {SESSION.last_db_msg}")
 
     # ---------- VA verilerini yükle ----------
-    def _load_va_from_db(self):
-        ok, rows, msg = fetch_va_rows()
+    def _load_va_cached(self):
+        rows = load_cached_va_rows()
+        if rows:
+            self.load_va_rows(rows)
+            self.lblStatus.setText("Önbellekteki liste gösteriliyor, DB'den güncelleniyor...")
+        else:
+            self.lblStatus.setText("Görev listesi DB'den yükleniyor...")
+
+    def _refresh_va_rows(self):
+        self._start_job(refresh_va_rows, on_done=self._on_va_rows_refreshed,
+                        on_error=lambda err: self._on_va_rows_refreshed((False, [], err)))
+
+    def _on_va_rows_refreshed(self, res):
+        ok, rows, msg = res
         if not ok:
-            QtWidgets.QMessageBox.warning(self, "Veri Yükleme Hatası", msg)
-            rows = []
+            if self._cards:
+                self.lblStatus.setText("DB'den güncellenemedi, önbellekteki liste gösteriliyor.")
+                self.lblStatus.setToolTip(msg)
+            else:
+                self.lblStatus.setText("")
+                QtWidgets.QMessageBox.warning(self, "Veri Yükleme Hatası", msg)
+            return
+        self.lblStatus.setText("")
+        self.lblStatus.setToolTip("")
+        self._apply_va_rows(rows)
+
+    def _apply_va_rows(self, rows):
+        def shape(rs):
+            return [(r.get("CODE"), r.get("RESULT2"), r.get("RESULT3"), r.get("RESULT4")) for r in rs]
+
+        if self._cards and shape(rows) == shape(self._va_rows):
+            # Kartlar aynı: yalnızca son güncelleme zamanları DB'deki değerle yenilenir
+            self._va_rows = list(rows)
+            for row in rows:
+                card = self._cards.get(row.get("CODE"))
+                if card and not card.busy:
+                    card.cellLastUpdate.setText(row.get("RESULT5") or "-")
+            return
+        if self._run_all_busy or any(card.busy for card in self._cards.values()):
+            self._pending_va_rows = list(rows)
+            return
         self.load_va_rows(rows)
 
+    def _apply_pending_va_rows(self):
+        if self._pending_va_rows is None or self._run_all_busy:
+            return
+        if any(card.busy for card in self._cards.values()):
+            return
+        rows, self._pending_va_rows = self._pending_va_rows, None
+        self._apply_va_rows(rows)
+
+    # ---------- DİA / DB ön kontrolü ----------
+    def _run_preflight(self):
+        self._preflight = {}
+        self.lblPreflight.setText("DİA …   DB …")
+        for name, fn in (("DİA", dia_preflight), ("DB", ping_db)):
+            self._start_job(fn, on_done=lambda res, n=name: self._on_preflight(n, res),
+                            on_error=lambda err, n=name: self._on_preflight(n, (False, err, 0.0)))
+
+    def _on_preflight(self, name: str, res):
+        self._preflight[name] = res
+        parts = []
+        for n in ("DİA", "DB"):
+            if n not in self._preflight:
+                parts.append(f"{n} …")
+                continue
+            ok, _msg, ms = self._preflight[n]
+            parts.append(f"{n} ✓ {ms:.0f} ms" if ok else f"{n} ✗")
+        self.lblPreflight.setText("   ".join(parts))
+        self.lblPreflight.setToolTip("\n".join(f"{n}: {self._preflight[n][1]}" for n in ("DİA", "DB")
+                                               if n in self._preflight))
+
     # rows: [{CODE, RESULT2, RESULT3, RESULT4, RESULT5}, ...]
     def load_va_rows(self, rows):
+        self._va_rows = list(rows)
+        self._cards = {}
+
         # mevcut kartları temizle
         while self._vaList.count():
             it = self._vaList.takeAt(0)
@@ -293,219 +459,149 @@ class IntegrationWindow(QtWidgets.QWidget):
             r5      = str(row.get("RESULT5", ""))
 
             card = VaTaskCard(code, r2, r3, r4, r5)
+            card.set_duration(run_history.summary(code))
             # ORTAK CLICK: tek sefer çalışacak; şimdilik MessageBox ile CODE & RESULT2 göster
-            card.btnStart.clicked.connect(lambda _, c=code, rc=r2, card_ref=card: self.on_va_start_clicked(card_ref, c, rc))
+            card.btnStart.clicked.connect(
+                lambda _, c=code, rc=r2, r3=r3, card_ref=card: self.on_va_start_clicked(card_ref, c, rc, r3))
             self._vaList.addWidget(card)
+            self._cards[code] = card
 
     # ---- VA ORTAK CLICK HANDLER ----
-    def on_va_start_clicked(self, card: VaTaskCard, code: str, report_code: str):
-        # 1) API’den raporu çek
-        result = report_result_get(report_code)  # session_id verilmezse DB'den aktif session alınır
-        rcode = str(result.get("code", "0"))
-        msg   = str(result.get("msg", ""))
-        rows  = result.get("rows", []) or []
-
-        # 2) UI ve konsol çıktısı
-        if rcode == "200":
-            # Konsola satırları bas
-            try:
-                print("=== Rapor Sonucu Satırlar ===")
-                for row in rows:
-                    print(row)
-                print(f"Toplam satır: {len(rows)}")
-            except Exception:
-                pass
-
-            card.cellApi.setText(f"code 200 başarılı - toplam {len(rows)} satır döndü")
-        else:
-            card.cellApi.setText(f"code: {rcode}  msg: {msg}")
-            return  # başarısızsa aşağıdaki case’lere geçmeyelim
-        
-        now_text_db = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        now_text_ui = now_text_db 
-
-        # 3) API SONUCUNDAN SONRA KOD-BAZLI AYRIM (şimdilik yer tutucu)
-        if code == "ENT-02":
-            ok, db_msg, new_count = ent02_update(rows)
-            if ok:
-
-                ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
-                if ok2:
-                    card.cellLastUpdate.setText(now_text_ui)
-
-                # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
-                suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
-                card.cellApi.setText(f"{db_msg}{suffix}")
-            else:
-                card.cellApi.setText(f"HATA: {db_msg} | yeni kayıt: 0")
-            return
-        
-        if code == "ENT-03":
-            ok, db_msg, new_count = ent03_update(rows)
-            if ok:
-
-                ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
-                if ok2:
-                    card.cellLastUpdate.setText(now_text_ui)
-
-                # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
-                suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
-                card.cellApi.setText(f"{db_msg}{suffix}")
-            else:
-                card.cellApi.setText(f"HATA: {db_msg} | yeni kayıt: 0")
-            return
-
-        if code == "ENT-04":
-            ok, db_msg, new_count = ent04_update(rows)
-            if ok:
-
-                ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
-                if ok2:
-                    card.cellLastUpdate.setText(now_text_ui)
-
-                # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
-                suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
-                card.cellApi.setText(f"{db_msg}{suffix}")
-            else:
-                card.cellApi.setText(f"HATA: {db_msg} | yeni kayıt: 0")
-            return
-        
-        
-        if code == "ENT-05":
-            ok, db_msg, new_count = ent05_update(rows)
-            if ok:
-
-                ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
-                if ok2:
-                    card.cellLastUpdate.setText(now_text_ui)
-
-                # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
-                suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
-                card.cellApi.setText(f"{db_msg}{suffix}")
-            else:
-                card.cellApi.setText(f"HATA: {db_msg} | yeni kayıt: 0")
-            return
-        
-        
-        if code == "ENT-06":
-            ok, db_msg, new_count = ent06_update(rows)
-            if ok:
-
-                ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
-                if ok2:
-                    card.cellLastUpdate.setText(now_text_ui)
-
-                # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
-                suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
-                card.cellApi.setText(f"{db_msg}{suffix}")
-            else:
-                card.cellApi.setText(f"HATA: {db_msg} | yeni kayıt: 0")
+    def on_va_start_clicked(self, card: VaTaskCard, code: str, report_code: str, result3: str = ""):
+        # İş sürerken buton 'İptal Et'tir; DAG'ın başlattığı işlerde token yoktur
+        if card.busy:
+            if card.cancel_token is not None:
+                card.cancel_token.cancel()
+                card.set_cancelling()
             return
-        
-        
-        if code == "ENT-07":
-            ok, db_msg, new_count = ent07_update(rows)
-            if ok:
-
-                ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
-                if ok2:
-                    card.cellLastUpdate.setText(now_text_ui)
-
-                # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
-                suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
-                card.cellApi.setText(f"{db_msg}{suffix}")
-            else:
-                card.cellApi.setText(f"HATA: {db_msg} | yeni kayıt: 0")
+        card.cancel_token = CancelToken()
+        card.set_busy(True, cancellable=True)
+        card.cellApi.setText("⏳ Rapor alınıyor ve senkronize ediliyor...")
+
+        # Rapor + senkron arka planda; ilerleme ve sonuç sinyalle karta döner
+        sig = ProgressSignals(self)
+        sig.progress.connect(card.set_progress)
+        self._start_job(run_va_task, code, report_code, result3,
+                        on_progress=sig.progress.emit, cancel=card.cancel_token,
+                        on_done=lambda res, c=card, s=sig: self._on_va_done(c, res, s),
+                        on_error=lambda err, c=card, s=sig: self._on_va_failed(c, err, s))
+
+    def _on_va_done(self, card: VaTaskCard, res: dict, sig=None):
+        self._release_card(card, sig)
+        card.cellApi.setText(res.get("text", ""))
+        if res.get("last_update"):
+            card.cellLastUpdate.setText(res["last_update"])
+        if res.get("history"):
+            card.set_duration(res["history"])
+        self._apply_pending_va_rows()
+
+    def _on_va_failed(self, card: VaTaskCard, err: str, sig=None):
+        self._release_card(card, sig)
+        card.cellApi.setText(f"HATA: {err}")
+        self._apply_pending_va_rows()
+
+    def _release_card(self, card: VaTaskCard, sig=None):
+        card.set_busy(False)
+        card.cancel_token = None
+        if sig is not None:
+            sig.deleteLater()
+
+    def _cancel_running(self):
+        if self._run_all_token is not None:
+            self.on_run_all_clicked()
+        for card in self._cards.values():
+            if card.cancel_token is not None:
+                card.cancel_token.cancel()
+                card.set_cancelling()
+
+    # ---- TÜMÜNÜ ÇALIŞTIR ----
+    def on_run_all_clicked(self):
+        # Çalışırken buton 'Durdur'dur: süren görevler partiler arasında durur, kalanlar başlamaz
+        if self._run_all_busy:
+            if self._run_all_token is not None:
+                self._run_all_token.cancel()
+                self.btnRunAll.setEnabled(False)
+                self.btnRunAll.setText("Durduruluyor...")
             return
-        
-        
-        if code == "ENT-08":
-            ok, db_msg, new_count = ent08_update(rows)
-            if ok:
-
-                ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
-                if ok2:
-                    card.cellLastUpdate.setText(now_text_ui)
-
-                # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
-                suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
-                card.cellApi.setText(f"{db_msg}{suffix}")
-            else:
-                card.cellApi.setText(f"HATA: {db_msg} | yeni kayıt: 0")
+        if not self._va_rows:
             return
-
-
-        if code == "ENT-09":
-            ok, db_msg, new_count = ent09_update(rows)
-            if ok:
-
-                ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
-                if ok2:
-                    card.cellLastUpdate.setText(now_text_ui)
-
-                # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
-                suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
-                card.cellApi.setText(f"{db_msg}{suffix}")
-            else:
-                card.cellApi.setText(f"HATA: {db_msg} | yeni kayıt: 0")
+        # Elle başlatılmış ve hâlâ süren görevler varken DAG'ı başlatma
+        if any(card.busy for card in self._cards.values()):
+            QtWidgets.QMessageBox.information(self, "Bilgi", "Devam eden görevler bitince tekrar deneyin.")
             return
-        
-        
-        if code == "ENT-10":
-            ok, db_msg, new_count = ent10_update(rows)
-            if ok:
-
-                ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
-                if ok2:
-                    card.cellLastUpdate.setText(now_text_ui)
-
-                # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
-                suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
-                card.cellApi.setText(f"{db_msg}{suffix}")
-            else:
-                card.cellApi.setText(f"HATA: {db_msg} | yeni kayıt: 0")
+        self._run_all_busy = True
+        self._run_all_token = CancelToken()
+        self.btnRunAll.setText("Durdur")
+        for card in self._cards.values():
+            card.set_busy(True)
+            card.cellApi.setText("⏳ Sırada...")
+
+        sig = DagSignals(self)
+        sig.started.connect(self._on_dag_started)
+        sig.finished.connect(self._on_dag_finished)
+        sig.skipped.connect(self._on_dag_skipped)
+        sig.progress.connect(self._on_dag_progress)
+        self._start_job(run_all_va_tasks, self._va_rows,
+                        on_done=lambda _res, s=sig: self._on_run_all_done(s),
+                        on_error=lambda err, s=sig: self._on_run_all_done(s, err),
+                        on_start=sig.started.emit, on_task_done=sig.finished.emit,
+                        on_skip=sig.skipped.emit, on_progress=sig.progress.emit,
+                        cancel=self._run_all_token)
+
+    def _on_dag_started(self, code: str):
+        card = self._cards.get(code)
+        if card:
+            card.cellApi.setText("⏳ Rapor alınıyor ve senkronize ediliyor...")
+
+    def _on_dag_finished(self, code: str, res):
+        card = self._cards.get(code)
+        if not card:
             return
-        
-        
-        if code == "ENT-11":
-            ok, db_msg, new_count = ent11_update(rows)
-            if ok:
-
-                ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
-                if ok2:
-                    card.cellLastUpdate.setText(now_text_ui)
-
-                # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
-                suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
-                card.cellApi.setText(f"{db_msg}{suffix}")
-            else:
-                card.cellApi.setText(f"HATA: {db_msg} | yeni kayıt: 0")
-            return
-
-
-        
-        if code == "ENT-12":
-            ok, db_msg, new_count = ent12_update(rows)
-            if ok:
-
-                ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
-                if ok2:
-                    card.cellLastUpdate.setText(now_text_ui)
-
-                # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
-                suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
-                card.cellApi.setText(f"{db_msg}{suffix}")
-            else:
-                card.cellApi.setText(f"HATA: {db_msg} | yeni kayıt: 0")
-            return
-
-        # Diğer kodlar için (varsayılan) bir şey yapmayacaksak burada bitiririz
-        return
-    
-    
-    
-
-
-
-
-
+        if isinstance(res, dict):
+            self._on_va_done(card, res)
+        else:
+            self._on_va_failed(card, str(res))
+
+    def _on_dag_progress(self, ev):
+        card = self._cards.get(ev["code"])
+        if card and card.busy:
+            card.set_progress(ev)
+
+    def _on_dag_skipped(self, code: str, failed_dep: str):
+        card = self._cards.get(code)
+        if card:
+            card.set_busy(False)
+            card.cellApi.setText(f"Atlandı: bağımlı olduğu {failed_dep} başarısız oldu")
+
+    def _on_run_all_done(self, sig, err: str = ""):
+        self._run_all_busy = False
+        self._run_all_token = None
+        self.btnRunAll.setEnabled(True)
+        self.btnRunAll.setText("Tümünü Çalıştır")
+        for card in self._cards.values():
+            if card.busy:
+                card.set_busy(False)
+                if err:
+                    card.cellApi.setText(f"HATA: {err}")
+        sig.deleteLater()
+        self._apply_pending_va_rows()
+
+    # ---- arka plan işleri ----
+    def _start_job(self, fn, *args, on_done=None, on_error=None, **kwargs):
+        """fn(*args, **kwargs)'ı iş havuzunda çalıştırır; worker referansını iş bitene kadar tutar."""
+        holder = {}
+
+        def _release(*_):
+            self._jobs.discard(holder.get("w"))
+
+        worker = Worker(fn, *args, **kwargs)
+        holder["w"] = worker
+        if on_done is not None:
+            worker.signals.finished.connect(on_done)
+        if on_error is not None:
+            worker.signals.failed.connect(on_error)
+        worker.signals.finished.connect(_release)
+        worker.signals.failed.connect(_release)
+        self._jobs.add(worker)
+        self._pool.start(worker)
+        return worker
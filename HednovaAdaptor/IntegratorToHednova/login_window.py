@@ -1,5 +1,5 @@
-import json
 from PyQt5 import QtCore, QtGui, QtWidgets
+from config import CONFIG
 from integration_window import IntegrationWindow
 
 class LoginWindow(QtWidgets.QWidget):
@@ -91,8 +91,7 @@ class LoginWindow(QtWidgets.QWidget):
     def check_login(self):
         """data.json dosyasını okuyarak kullanıcı kontrolü yapar"""
         try:
-            with open("data.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = CONFIG.data
         except FileNotFoundError:
             QtWidgets.QMessageBox.critical(self, "Hata", "data.json dosyası bulunamadı!")
             return
@@ -1,9 +1,14 @@
 import sys
 from PyQt5.QtWidgets import QApplication
+from app_log import setup_logging, shutdown_logging
 from login_window import LoginWindow
+from sql_crud import close_pools
 
 if __name__ == "__main__":
+    setup_logging()
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(close_pools)
+    app.aboutToQuit.connect(shutdown_logging)
     window = LoginWindow()
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,273 @@
+# mock_dia.py
+# -*- coding: utf-8 -*-
+"""
+Yerel DİA WS taklidi (yük/yeniden deneme testleri için; yalnızca standart kütüphane).
+login ve rpr_raporsonuc_getir uçlarını gerçek API ile aynı zarfla ({"code": "200",
+"result": "<base64(JSON)>"}) yanıtlar. Uygulama data.json'da
+"integrator": {"base_url": "http://127.0.0.1:8765"} verilerek buraya yönlendirilir.
+
+  python mock_dia.py --synthetic OZL-10=ENT-10:100k --rows 1000
+  python mock_dia.py --replay kayitlar/ --latency 150 --jitter 100 --error-rate 0.05
+  python mock_dia.py --record https://kirpi.ws.dia.com.tr --replay kayitlar/
+
+Rapor gövdesi sırasıyla: --record (gerçek API'ye iletilir, yanıt --replay klasörüne yazılır),
+--replay klasöründeki kayıt, --synthetic eşlemesi (bench_sync ile üretilen görev satırları),
+hiçbiri yoksa --rows kadar key/kod/aciklama satırı.
+Hata enjeksiyonu: --error-rate (HTTP 503), --drop-rate (gövde yarıda kesilir),
+--invalid-session-rate (geçersiz session; istemci yeniden login olur).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from bench_sync import make_body, make_rows, parse_size
+from sync_specs import SPECS, Field, SyncSpec
+
+WRITE_CHUNK = 64 * 1024
+# Eşlemesi olmayan rapor kodları için basit tanım tablosu satırları
+GENERIC_SPEC = SyncSpec("MOCK", "MOCK", ("ENT01",), (Field("ENT01", "key"), Field("KOD", "kod"), Field("AD", "aciklama")))
+
+
+def recording_name(report_code: str, params: Dict[str, Any]) -> str:
+    """Kayıt dosyası adı: parametresiz raporlar <kod>.json, diğerleri <kod>__<param özeti>.json."""
+    safe = re.sub(r"[^\w.-]", "_", report_code)
+    extra = {k: v for k, v in (params or {}).items() if k not in ("firma", "donem")}
+    if not extra:
+        return f"{safe}.json"
+    digest = hashlib.md5(json.dumps(extra, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:10]
+    return f"{safe}__{digest}.json"
+
+
+class MockDiaServer(ThreadingHTTPServer):
+    """
+    synthetic : rapor kodu -> (ENT kodu, satır sayısı)
+    latency_ms / jitter_ms : her yanıttan önce latency + [0, jitter] ms beklenir
+    error_rate / drop_rate / invalid_session_rate : 0..1 olasılıklar
+    """
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], replay_dir: Optional[str] = None,
+                 record_url: Optional[str] = None, synthetic: Optional[Dict[str, Tuple[str, int]]] = None,
+                 default_rows: int = 1000, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, drop_rate: float = 0.0, invalid_session_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        super().__init__(address, _Handler)
+        self.replay_dir = replay_dir
+        self.record_url = record_url.rstrip("/") if record_url else None
+        self.synthetic = dict(synthetic or {})
+        self.default_rows = default_rows
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.invalid_session_rate = invalid_session_rate
+        self.stats: Counter = Counter()
+        self._random = random.Random(seed)
+        self._sessions: set = set()
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def chance(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def delay(self) -> None:
+        if self.latency_ms or self.jitter_ms:
+            with self._lock:
+                extra = self._random.uniform(0, self.jitter_ms)
+            time.sleep((self.latency_ms + extra) / 1000.0)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    # ---------- session ----------
+    def new_session(self) -> str:
+        sid = uuid.uuid4().hex
+        with self._lock:
+            self._sessions.add(sid)
+        return sid
+
+    def check_session(self, sid: str) -> bool:
+        with self._lock:
+            return sid in self._sessions
+
+    def drop_session(self, sid: str) -> None:
+        with self._lock:
+            self._sessions.discard(sid)
+
+    # ---------- rapor gövdesi ----------
+    def forward(self, path: str, raw: bytes) -> bytes:
+        req = urllib.request.Request(self.record_url + path, data=raw,
+                                     headers={"Content-Type": "application/json;charset=UTF-8"})
+        with urllib.request.urlopen(req, timeout=600) as resp:
+            return resp.read()
+
+    def report_body(self, path: str, raw: bytes, report_code: str, params: Dict[str, Any]) -> bytes:
+        name = recording_name(report_code, params)
+        if self.record_url:
+            body = self.forward(path, raw)
+            if self.replay_dir:
+                os.makedirs(self.replay_dir, exist_ok=True)
+                with open(os.path.join(self.replay_dir, name), "wb") as f:
+                    f.write(body)
+            return body
+
+        with self._lock:
+            body = self._bodies.get(name)
+        if body is not None:
+            return body
+        body = self._load_body(name, report_code)
+        with self._lock:
+            self._bodies[name] = body
+        return body
+
+    def _load_body(self, name: str, report_code: str) -> bytes:
+        if self.replay_dir:
+            for candidate in (name, recording_name(report_code, {})):
+                path = os.path.join(self.replay_dir, candidate)
+                if os.path.isfile(path):
+                    with open(path, "rb") as f:
+                        return f.read()
+        code, n = self.synthetic.get(report_code, (None, self.default_rows))
+        spec = SPECS.get(code) or GENERIC_SPEC
+        return make_body(make_rows(spec, n))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: MockDiaServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):  # istek başına konsol satırı basma
+        pass
+
+    def _send(self, status: int, body: bytes, drop: bool = False) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        view = memoryview(body)
+        stop = len(view) // 2 if drop else len(view)
+        for i in range(0, stop, WRITE_CHUNK):
+            self.wfile.write(view[i:min(i + WRITE_CHUNK, stop)])
+        if drop:
+            # Content-Length'ten önce bağlantıyı kes: istemci eksik gövde hatası alır
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(2)
+
+    def _json(self, obj: Dict[str, Any], status: int = 200) -> None:
+        self._send(status, json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+    def do_POST(self):
+        srv = self.server
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        try:
+            payload = json.loads(raw or b"{}")
+        except ValueError:
+            srv.count("bad_request")
+            return self._json({"code": "400", "msg": "Geçersiz JSON isteği"}, 400)
+
+        srv.delay()
+        if srv.chance(srv.error_rate):
+            srv.count("injected_503")
+            return self._json({"code": "503", "msg": "mock: enjekte edilen hata"}, 503)
+
+        if "login" in payload:
+            srv.count("login")
+            if srv.record_url:
+                return self._send(200, srv.forward(self.path, raw))
+            return self._json({"code": "200", "msg": srv.new_session()})
+
+        req = payload.get("rpr_raporsonuc_getir")
+        if req is None:
+            srv.count("unknown")
+            return self._json({"code": "404", "msg": "mock: desteklenmeyen çağrı"}, 404)
+
+        srv.count("report")
+        sid = str(req.get("session_id", ""))
+        if not srv.record_url:
+            if not srv.check_session(sid) or srv.chance(srv.invalid_session_rate):
+                srv.drop_session(sid)
+                srv.count("invalid_session")
+                return self._json({"code": "401", "msg": "invalid_session"})
+        try:
+            body = srv.report_body(self.path, raw, str(req.get("report_code", "")), req.get("param") or {})
+        except Exception as e:
+            srv.count("upstream_error")
+            return self._json({"code": "502", "msg": f"mock: {e}"}, 502)
+
+        drop = srv.chance(srv.drop_rate)
+        if drop:
+            srv.count("injected_drop")
+        self._send(200, body, drop=drop)
+
+
+def _parse_synthetic(items) -> Dict[str, Tuple[str, int]]:
+    """['OZL-10=ENT-10:100k', ...] -> {'OZL-10': ('ENT-10', 100000)}"""
+    out: Dict[str, Tuple[str, int]] = {}
+    for item in items or ():
+        report_code, _, target = item.partition("=")
+        code, _, size = target.partition(":")
+        if code not in SPECS:
+            raise ValueError(f"Tanımsız görev: {code}")
+        out[report_code] = (code, parse_size(size or "1k"))
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="mock_dia", description="Yerel DİA WS taklidi")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--replay", metavar="KLASOR", help="kayıtlı yanıtlar (record modunda yazılacak yer)")
+    parser.add_argument("--record", metavar="URL", help="istekleri bu DİA adresine iletip yanıtları kaydet")
+    parser.add_argument("--synthetic", nargs="*", metavar="RAPOR=ENT-XX:N", help="ör. OZL-10=ENT-10:100k")
+    parser.add_argument("--rows", default="1k", help="eşlemesi olmayan raporlar için satır sayısı")
+    parser.add_argument("--latency", type=float, default=0.0, help="yanıt gecikmesi (ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="gecikmeye eklenecek rastgele üst sınır (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 503 olasılığı")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="gövdenin yarıda kesilme olasılığı")
+    parser.add_argument("--invalid-session-rate", type=float, default=0.0, help="geçersiz session olasılığı")
+    parser.add_argument("--seed", type=int, help="rastgelelik tohumu (tekrarlanabilir testler için)")
+    args = parser.parse_args(argv)
+
+    try:
+        synthetic = _parse_synthetic(args.synthetic)
+    except ValueError as e:
+        print(e)
+        return 2
+    server = MockDiaServer((args.host, args.port), args.replay, args.record, synthetic,
+                           parse_size(args.rows), args.latency, args.jitter,
+                           args.error_rate, args.drop_rate, args.invalid_session_rate, args.seed)
+    print(f"Mock DİA dinliyor: {server.url}  (data.json -> \"integrator\": {{\"base_url\": \"{server.url}\"}})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("İstek sayıları: " + ", ".join(f"{k}={v}" for k, v in sorted(server.stats.items())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+# pipeline.py
+# -*- coding: utf-8 -*-
+"""
+"Tümünü çalıştır" için aşamalı (pipeline) çalıştırıcı.
+Görevler bağımlılık sırasıyla üç aşamadan geçer:
+  fetch  : rapor DİA'dan tamamen alınır (fetch_workers iş parçacığı, en fazla prefetch görev önde)
+  decode : base64/JSON gövde görev kayıtlarına çözülür (row_codec)
+  write  : kayıtlar senkronize edilir, RESULT5 güncellenir (tek yazıcı, bağımlılık sırasıyla)
+Aşamalar sınırlı kuyruklarla bağlıdır: yazıcı geride kalırsa çözücü, çözücü beklerse yeni
+rapor istekleri durur. Böylece DİA beklenirken DB, DB yazılırken DİA boşta kalmaz; toplam süre
+aşama sürelerinin toplamına değil en yavaş aşamaya yaklaşır.
+Raporlar belleğe tamamen alındığı için bellek kullanımı prefetch ile sınırlanır. Parçalı
+(chunk_params) çekilen görevler bu yoldan geçmez; yazıcı sırası gelince onları akış halinde
+normal run_va_task yoluyla çalıştırır.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
+
+import run_history
+from api_requests import report_result_get
+from config import CONFIG
+import progress
+from progress import Cancelled, CancelToken, TaskProgress
+from run_history import activate, stage
+from scheduler import build_deps, topo_order
+from sync_specs import resolve_spec
+from sync_tasks import _begin, _cancelled, _chunk_plan, _decode_fast, _record_run, _run_va_task, _write_records
+import tenants
+
+
+def pipeline_settings() -> Dict[str, Any]:
+    """
+    data.json'daki isteğe bağlı "run_all" bloğunun pipeline alanları:
+      "run_all": {"pipeline": false, "fetch_workers": 2, "prefetch": 2}
+    fetch_workers: aynı anda alınan rapor sayısı
+    prefetch     : yazıcının önünde bekleyebilecek (alınmış ya da çözülmüş) görev sayısı
+    """
+    try:
+        opts = CONFIG.data.get("run_all") or {}
+    except FileNotFoundError:
+        opts = {}
+    return {
+        "enabled": bool(opts.get("pipeline", False)),
+        "fetch_workers": max(1, int(opts.get("fetch_workers", 2))),
+        "prefetch": max(1, int(opts.get("prefetch", 2))),
+    }
+
+
+class _Job:
+    """Bir görevin aşamalar arasında taşınan durumu."""
+
+    def __init__(self, code: str, row: Dict, mode: str, progress: TaskProgress):
+        self.code = code
+        self.report_code = str(row.get("RESULT2", ""))
+        self.result3 = str(row.get("RESULT3", ""))
+        self.mode = mode
+        self.run = run_history.RunStats(tenants.qualify(code))
+        self.progress = progress
+        self.out: Optional[Dict[str, Any]] = None
+        self.spec = None
+        self.started = 0.0
+        self.now_text_db = ""
+        self.since: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.records: Optional[List] = None
+        self.direct = False          # parçalı görev: yazıcı run_va_task yoluyla çalıştırır
+        self.ready_at = 0.0          # fetch/decode bitip yazıcı kuyruğuna girdiği an
+        self.error: Optional[BaseException] = None
+
+
+def _fetch(job: _Job, on_start: Optional[Callable[[str], None]]) -> _Job:
+    # Süre görevin gerçekten başladığı andan ölçülür; sırada beklenen zaman sayılmaz
+    job.run.started = time.time()
+    if on_start:
+        on_start(job.code)
+    try:
+        with activate(job.run), progress.activate(job.progress):
+            progress.checkpoint()
+            job.out, job.spec, job.started, job.now_text_db, job.since = _begin(job.code, job.result3, job.mode)
+            if _chunk_plan(job.spec, job.since):
+                job.direct = True
+                return job
+            params = {job.spec.delta_param: job.since} if job.since else None
+            with stage("http"):
+                job.result = report_result_get(job.report_code, raw=True, params=params)
+    except Exception as e:
+        job.error = e
+    return job
+
+
+def _decode(job: _Job) -> _Job:
+    if job.direct or job.error is not None:
+        return job
+    try:
+        with activate(job.run), progress.activate(job.progress):
+            progress.checkpoint()
+            job.records = _decode_fast(job.out, job.spec, job.result)
+    except Exception as e:
+        job.error = e
+    job.result = None
+    return job
+
+
+def _write(job: _Job) -> Any:
+    if isinstance(job.error, Cancelled):
+        job.out = _cancelled(job.code, job.mode, job.error)
+    elif job.error is not None:
+        return job.error
+    # Yazıcıyı beklerken geçen süre de görevin süresine eklenmez
+    job.run.started += time.time() - job.ready_at
+    with activate(job.run), progress.activate(job.progress):
+        try:
+            job.progress.checkpoint()
+            if job.direct:
+                job.out = _run_va_task(job.code, job.report_code, job.result3, job.mode)
+            elif job.records is not None:
+                job.out = _write_records(job.out, job.code, job.spec, job.records, job.since,
+                                         job.now_text_db, job.started)
+        except Cancelled as e:
+            job.out = _cancelled(job.code, job.mode, e)
+        except Exception as e:
+            return e
+        finally:
+            job.records = None
+    job.run.finished = time.time()
+    return _record_run(job.run, job.out)
+
+
+def run_pipeline(va_rows: List[Dict], on_start: Optional[Callable[[str], None]] = None,
+                 on_task_done: Optional[Callable[[str, Any], None]] = None,
+                 on_skip: Optional[Callable[[str, str], None]] = None, mode: str = "auto",
+                 fetch_workers: Optional[int] = None, prefetch: Optional[int] = None,
+                 on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 cancel: Optional[CancelToken] = None,
+                 slots: Optional[threading.Semaphore] = None) -> Dict[str, Any]:
+    """
+    run_all_va_tasks'ın pipeline hali; geri çağrılar ve dönüş değeri aynıdır
+    (on_start fetch iş parçacığından, on_task_done/on_skip çağıran iş parçacığından çağrılır).
+    slots verilirse her fetch ve her write bir yer alır (aşama başına bir görev sayılır).
+    """
+    limit = slots or nullcontext()
+    opts = pipeline_settings()
+    fetch_workers = fetch_workers or opts["fetch_workers"]
+    prefetch = prefetch or opts["prefetch"]
+
+    by_code = {str(r.get("CODE", "")): r for r in va_rows if r.get("CODE")}
+
+    def _depends_on(code: str):
+        spec = resolve_spec(code, by_code[code].get("RESULT3", ""))
+        return spec.depends_on if spec else ()
+
+    deps = build_deps(by_code, _depends_on)
+    jobs = [_Job(code, by_code[code], mode, TaskProgress(code, on_progress, cancel))
+            for code in topo_order(deps)]
+
+    ready: "queue.Queue[_Job]" = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    feed_error: List[BaseException] = []
+
+    def _fetch_job(job: _Job) -> _Job:
+        with limit:
+            return _fetch(job, on_start)
+
+    fetch = tenants.bind(_fetch_job)   # etkin kiracı fetch iş parçacıklarına taşınır
+
+    def _feed():
+        try:
+            _feed_jobs()
+        except BaseException as e:   # yazıcı sonsuza dek beklemesin
+            feed_error.append(e)
+
+    def _feed_jobs():
+        # fetch sırayla gönderilir, en fazla prefetch görev önde; sonuçlar sırayla çözülür
+        with ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="fetch") as pool:
+            pending = [pool.submit(fetch, j) for j in jobs[:prefetch]]
+            next_idx = len(pending)
+            while pending and not stop.is_set():
+                job = pending.pop(0).result()
+                if next_idx < len(jobs):
+                    pending.append(pool.submit(fetch, jobs[next_idx]))
+                    next_idx += 1
+                job = _decode(job)
+                job.ready_at = time.time()
+                while not stop.is_set():
+                    try:
+                        ready.put(job, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+            for fut in pending:
+                fut.cancel()
+
+    feeder = threading.Thread(target=_feed, name="pipeline-decode", daemon=True)
+    feeder.start()
+
+    results: Dict[str, Any] = {}
+    failed: set = set()              # başarısız ya da atlanmış kodlar
+    try:
+        for _ in jobs:
+            while True:
+                try:
+                    job = ready.get(timeout=0.5)
+                    break
+                except queue.Empty:
+                    if not feeder.is_alive():
+                        raise RuntimeError(f"Pipeline çözümleme aşaması durdu: {feed_error[:1]}")
+            bad_dep = next((d for d in sorted(deps[job.code]) if d in failed), None)
+            if bad_dep is not None:
+                results[job.code] = None
+                failed.add(job.code)
+                if on_skip:
+                    on_skip(job.code, bad_dep)
+                continue
+            with limit:
+                res = _write(job)
+            results[job.code] = res
+            if on_task_done:
+                on_task_done(job.code, res)
+            if not (isinstance(res, dict) and res.get("ok")):
+                failed.add(job.code)
+    finally:
+        stop.set()
+        feeder.join()
+    return results
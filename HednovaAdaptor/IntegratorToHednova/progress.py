@@ -0,0 +1,133 @@
+# progress.py
+# -*- coding: utf-8 -*-
+"""
+Senkron ilerleme olayları ve iş birliğine dayalı iptal.
+Görev çalışırken iş parçacığında bir TaskProgress etkin olur (bkz. activate); senkron
+motoru satır okudukça ve her yazma partisinden önce checkpoint() çağırır:
+  - ilerleme olayı en fazla interval saniyede bir on_progress'e gönderilir,
+  - CancelToken iptal edilmişse Cancelled fırlatılır; açık transaction geri alınır
+    (bkz. sql_crud._apply_diff) ve hiçbir değişiklik kalıcı olmaz.
+Etkin TaskProgress yoksa tüm yardımcılar hiçbir şey yapmaz.
+
+Olay: {"code", "phase": "read" | "write", "rows", "inserted", "updated", "deleted",
+       "to_insert", "to_update", "to_delete"}
+read aşamasında toplam bilinmez (rapor akış halinde okunur); write aşamasında to_* fark
+hesabından gelen toplamlardır.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+PROGRESS_INTERVAL = 0.25   # sn; iki ilerleme olayı arasındaki en kısa süre
+CHECK_EVERY = 1000         # okunan her bu kadar satırda bir checkpoint
+
+_local = threading.local()
+
+
+class Cancelled(Exception):
+    """Görev kullanıcı tarafından iptal edildi."""
+
+    def __init__(self, msg: str = "İşlem iptal edildi"):
+        super().__init__(msg)
+
+
+class CancelToken:
+    """İş parçacıkları arasında paylaşılan iptal bayrağı."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise Cancelled()
+
+
+class TaskProgress:
+    """Tek bir görev çalışmasının ilerleme sayaçları + iptal bayrağı."""
+
+    def __init__(self, code: str, on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 cancel: Optional[CancelToken] = None, interval: float = PROGRESS_INTERVAL):
+        self.code = code
+        self.on_progress = on_progress
+        self.cancel = cancel
+        self.interval = interval
+        self.phase = "read"
+        self.rows = 0
+        self.done = {"inserted": 0, "updated": 0, "deleted": 0}
+        self.totals = {"to_insert": 0, "to_update": 0, "to_delete": 0}
+        self._last_emit = 0.0
+
+    def event(self) -> Dict[str, Any]:
+        return {"code": self.code, "phase": self.phase, "rows": self.rows, **self.done, **self.totals}
+
+    def emit(self, force: bool = False) -> None:
+        if self.on_progress is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_emit >= self.interval:
+            self._last_emit = now
+            self.on_progress(self.event())
+
+    def checkpoint(self) -> None:
+        if self.cancel is not None:
+            self.cancel.check()
+        self.emit()
+
+
+def current() -> Optional[TaskProgress]:
+    return getattr(_local, "progress", None)
+
+
+@contextmanager
+def activate(progress: Optional[TaskProgress]) -> Iterator[Optional[TaskProgress]]:
+    """progress'i bu iş parçacığında etkin yapar (None verilirse önceki etkin kalır)."""
+    if progress is None:
+        yield current()
+        return
+    prev = current()
+    _local.progress = progress
+    try:
+        yield progress
+    finally:
+        _local.progress = prev
+
+
+def checkpoint() -> None:
+    """İptal edildiyse Cancelled fırlatır; değilse (zamanı geldiyse) ilerleme olayı gönderir."""
+    p = current()
+    if p is not None:
+        p.checkpoint()
+
+
+def rows_read(n: int) -> None:
+    """Şu ana kadar okunan rapor satırı sayısı (okuma sırasında CHECK_EVERY satırda bir çağrılır)."""
+    p = current()
+    if p is not None:
+        p.rows = n
+        p.checkpoint()
+
+
+def set_totals(to_insert: int, to_update: int, to_delete: int) -> None:
+    """Fark hesabı bitti: yazılacak satır sayıları bilinir, write aşamasına geçilir."""
+    p = current()
+    if p is not None:
+        p.phase = "write"
+        p.totals.update(to_insert=to_insert, to_update=to_update, to_delete=to_delete)
+        p.emit(force=True)
+
+
+def advance(name: str, n: int) -> None:
+    """name ("inserted" | "updated" | "deleted") sayacını n artırır."""
+    p = current()
+    if p is not None:
+        p.done[name] += n
+        p.emit()
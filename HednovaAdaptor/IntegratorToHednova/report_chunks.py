@@ -0,0 +1,87 @@
+# report_chunks.py
+# -*- coding: utf-8 -*-
+"""
+Çok büyük DİA raporlarını tarih aralıklarına bölerek çekme.
+Her parça raporun "param" bloğuna başlangıç/bitiş tarihi olarak verilir; parçalar sırayla
+ya da paralel alınır, satırları geldikçe yazıcıya (sync_records) akar. Başarısız olan
+parça tek başına yeniden denenir; tekrar gelen satırlar senkronda anahtara göre tekilleşir.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+
+class ChunkError(RuntimeError):
+    """Bir rapor parçası tüm denemelere rağmen alınamadı."""
+
+
+def date_ranges(start: date, end: date, days: int) -> List[Tuple[str, str]]:
+    """[start, end) aralığını en fazla days günlük ('YYYY-MM-DD', 'YYYY-MM-DD') parçalara böler."""
+    days = max(1, int(days))
+    out: List[Tuple[str, str]] = []
+    cur = start
+    while cur < end:
+        nxt = min(cur + timedelta(days=days), end)
+        out.append((cur.isoformat(), nxt.isoformat()))
+        cur = nxt
+    return out
+
+
+def _describe(params: Dict[str, Any]) -> str:
+    return "..".join(str(v) for v in params.values())
+
+
+def _fetch_with_retry(fetch: Callable[[Dict[str, Any]], Iterable], params: Dict[str, Any],
+                      retries: int, backoff: float) -> List:
+    """Parçayı tamamen okur; hata olursa yalnızca bu parçayı yeniden dener."""
+    attempt = 0
+    while True:
+        try:
+            return list(fetch(params))
+        except Exception as e:
+            if attempt >= retries:
+                raise ChunkError(f"Rapor parçası {_describe(params)} alınamadı: {e}") from e
+            time.sleep(backoff * (2 ** attempt))
+            attempt += 1
+
+
+def iter_chunks(fetch: Callable[[Dict[str, Any]], Iterable], chunks: List[Dict[str, Any]],
+                parallel: int = 1, retries: int = 2, backoff: float = 1.0) -> Iterator:
+    """
+    fetch  : parça parametreleri -> satır iterable'ı (hata durumunda istisna fırlatır)
+    chunks : her parça için rapora eklenecek parametreler
+    parallel=1 ise parçalar sırayla ve akış halinde okunur; parça yarıda koparsa baştan
+    okunur (o ana kadar gelen satırlar yeniden gelir). parallel>1 ise en fazla parallel
+    parça aynı anda tamamen okunur ve sırayla üretilir.
+    """
+    if parallel <= 1:
+        for params in chunks:
+            attempt = 0
+            while True:
+                try:
+                    yield from fetch(params)
+                    break
+                except Exception as e:
+                    if attempt >= retries:
+                        raise ChunkError(f"Rapor parçası {_describe(params)} alınamadı: {e}") from e
+                    time.sleep(backoff * (2 ** attempt))
+                    attempt += 1
+        return
+
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="chunk") as pool:
+        # Bellekte en fazla parallel parça bekler: biri tüketilirken sıradaki gönderilir
+        pending = [pool.submit(_fetch_with_retry, fetch, p, retries, backoff) for p in chunks[:parallel]]
+        next_idx = len(pending)
+        try:
+            while pending:
+                rows = pending.pop(0).result()
+                if next_idx < len(chunks):
+                    pending.append(pool.submit(_fetch_with_retry, fetch, chunks[next_idx], retries, backoff))
+                    next_idx += 1
+                yield from rows
+                del rows
+        finally:
+            for fut in pending:
+                fut.cancel()
@@ -0,0 +1,205 @@
+# report_stream.py
+# -*- coding: utf-8 -*-
+"""
+rpr_raporsonuc_getir yanıtını belleğe almadan çözümleme.
+Yanıt {"code": "200", "result": "<base64(JSON)>"} biçimindedir; base64 metni parça parça
+çözülür, içindeki {"__rows": [...]} dizisinin elemanları artımlı JSON ayrıştırıcıyla
+tek tek üretilir. Bellekte aynı anda yalnızca bir okuma parçası ve o an ayrıştırılan
+satır bulunur.
+"""
+
+import base64
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+# Tamponun başındaki tüketilmiş kısım bu boyutu geçince kırpılır
+_COMPACT_AT = 64 * 1024
+_WS = " \t\r\n"
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class StreamDecodeError(ValueError):
+    """Yanıt beklenen JSON/base64 yapısında değil."""
+
+
+def iter_utf8(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Bayt parçalarını metne çevirir (parça sınırına düşen çok baytlı karakterler korunur)."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_b64decode(pieces: Iterable[str]) -> Iterator[bytes]:
+    """base64 metin parçalarını 4 karakterlik bloklar halinde çözer (boşluklar atlanır)."""
+    rest = ""
+    for piece in pieces:
+        text = rest + "".join(piece.split())
+        cut = len(text) - len(text) % 4
+        rest = text[cut:]
+        if cut:
+            yield base64.b64decode(text[:cut])
+    if rest:
+        yield base64.b64decode(rest + "=" * (-len(rest) % 4))
+
+
+class JsonWalker:
+    """
+    Metin parçaları üzerinde ileri yönlü JSON gezgini. Nesne anahtarları, dizi elemanları
+    ve büyük string değerler tüm belge belleğe alınmadan okunur; küçük değerler
+    json.JSONDecoder.raw_decode ile çözülür.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    # ---------- tampon ----------
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        if self._pos > _COMPACT_AT:
+            self._buf, self._pos = self._buf[self._pos:], 0
+        for chunk in self._chunks:
+            if chunk:
+                self._buf += chunk
+                return True
+        self._eof = True
+        return False
+
+    def peek(self) -> str:
+        """Boşlukları atlayıp sıradaki karakteri döndürür (belge bittiyse '')."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WS:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise StreamDecodeError(f"'{ch}' bekleniyordu, '{got or 'EOF'}' bulundu")
+        self._pos += 1
+
+    # ---------- okuma ----------
+    def value(self) -> Any:
+        """Sıradaki JSON değerini tamamen okur."""
+        first = self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if not self._fill():
+                    raise StreamDecodeError(f"Eksik/bozuk JSON: {e}") from None
+                continue
+            # Sayı/true/null gibi değerler tamponun sonunda bitiyorsa devamı gelebilir
+            if end == len(self._buf) and first not in '{["' and self._fill():
+                continue
+            self._pos = end
+            return obj
+
+    def keys(self) -> Iterator[str]:
+        """
+        Nesnenin anahtarlarını sırayla üretir. Her anahtardan sonra çağıran değeri
+        value() / items() / string_pieces() ile tüketmelidir.
+        """
+        self._expect("{")
+        first = True
+        while True:
+            if self.peek() == "}":
+                self._pos += 1
+                return
+            if not first:
+                self._expect(",")
+            key = self.value()
+            if not isinstance(key, str):
+                raise StreamDecodeError("Nesne anahtarı string değil")
+            self._expect(":")
+            yield key
+            first = False
+
+    def items(self) -> Iterator[Any]:
+        """Dizinin elemanlarını tek tek üretir."""
+        self._expect("[")
+        first = True
+        while True:
+            if self.peek() == "]":
+                self._pos += 1
+                return
+            if not first:
+                self._expect(",")
+            yield self.value()
+            first = False
+
+    def string_pieces(self) -> Iterator[str]:
+        """Bir string değeri kaçış dizileri çözülmüş parçalar halinde üretir."""
+        self._expect('"')
+        while True:
+            buf, pos = self._buf, self._pos
+            quote = buf.find('"', pos)
+            slash = buf.find("\\", pos)
+            stop = min(i for i in (quote, slash) if i >= 0) if quote >= 0 or slash >= 0 else -1
+            if stop < 0:
+                if pos < len(buf):
+                    yield buf[pos:]
+                self._pos = len(buf)
+                if not self._fill():
+                    raise StreamDecodeError("String değeri kapanmadan yanıt bitti")
+                continue
+            if stop > pos:
+                yield buf[pos:stop]
+            if stop == quote:
+                self._pos = stop + 1
+                return
+            # kaçış dizisi: \x ya da \uXXXX (_fill tamponu kırpabilir, konum yeniden okunur)
+            self._pos = stop
+            while len(self._buf) - self._pos < 6 and self._fill():
+                pass
+            buf, stop = self._buf, self._pos
+            esc = buf[stop + 1:stop + 2]
+            if esc == "u":
+                yield chr(int(buf[stop + 2:stop + 6], 16))
+                self._pos = stop + 6
+            elif esc in _ESCAPES:
+                yield _ESCAPES[esc]
+                self._pos = stop + 2
+            else:
+                raise StreamDecodeError(f"Geçersiz kaçış dizisi: \\{esc}")
+
+
+def iter_rows(text_chunks: Iterable[str], rows_key: str = "__rows") -> Iterator[Any]:
+    """Çözülmüş rapor JSON'undaki rows_key dizisinin elemanlarını üretir (anahtar yoksa hiç)."""
+    walker = JsonWalker(text_chunks)
+    for key in walker.keys():
+        if key == rows_key:
+            yield from walker.items()
+            return
+        walker.value()
+
+
+def open_report(byte_chunks: Iterable[bytes]) -> Tuple[Dict[str, Any], Optional[Iterator[Any]]]:
+    """
+    HTTP gövdesini (bayt parçaları) okuyup zarfı çözer.
+    Dönüş: (zarf alanları, satır üreteci)
+      code "200" ise ve "result" alanına gelindiyse satır üreteci base64'ü akış halinde
+      çözer; zarf alanlarında "result" bulunmaz. Aksi halde tüm zarf okunur ve
+      satır üreteci None döner ("result" hata mesajını taşır).
+    """
+    walker = JsonWalker(iter_utf8(byte_chunks))
+    fields: Dict[str, Any] = {}
+    for key in walker.keys():
+        if key == "result" and str(fields.get("code", "")) == "200" and walker.peek() == '"':
+            rows = iter_rows(iter_utf8(iter_b64decode(walker.string_pieces())))
+            return fields, rows
+        fields[key] = walker.value()
+    return fields, None
@@ -0,0 +1,253 @@
+# run_history.py
+# -*- coding: utf-8 -*-
+"""
+Görev çalışmalarının aşama süreleri ve satır sayıları.
+Bir görev track(code) içinde çalışırken alt katmanlar (api_requests, sql_crud) stage()/count()
+ile ölçüm bırakır; ölçümler aynı iş parçacığına bağlı olduğu için parametre geçirmek gerekmez.
+Çalışma bitince sonuç yerel SQLite dosyasındaki run_history tablosuna yazılır; kart son süreyi
+ve önceki çalışmalara göre eğilimi buradan gösterir.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app_log import get_logger
+from config import CONFIG
+
+# Kayıt sırası (arayüz/CLI aşamaları bu sırada gösterir)
+STAGES = ("http", "decode", "key_fetch", "diff", "insert", "update", "delete", "commit", "result5")
+TREND_WINDOW = 5          # eğilim için karşılaştırılan önceki başarılı çalışma sayısı
+
+log = get_logger("history")
+
+_local = threading.local()
+_db_lock = threading.Lock()
+_db_ready: set = set()
+
+
+class RunStats:
+    """Tek bir görev çalışmasının ölçümleri."""
+
+    def __init__(self, code: str):
+        self.code = code
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.stages: Dict[str, float] = {}     # aşama -> sn
+        self.counts: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @property
+    def total_ms(self) -> float:
+        return ((self.finished or time.time()) - self.started) * 1000.0
+
+    def stages_ms(self) -> Dict[str, float]:
+        order = {s: i for i, s in enumerate(STAGES)}
+        return {k: round(v * 1000.0, 1) for k, v in sorted(self.stages.items(), key=lambda kv: order.get(kv[0], 99))}
+
+
+def current() -> Optional[RunStats]:
+    return getattr(_local, "run", None)
+
+
+@contextmanager
+def activate(run: RunStats) -> Iterator[RunStats]:
+    """
+    run'ı bu iş parçacığında etkin ölçüm yapar. Aşamaları farklı iş parçacıklarında
+    çalışan görevler (bkz. pipeline) her aşamada aynı RunStats'ı etkinleştirir.
+    """
+    prev = current()
+    _local.run = run
+    try:
+        yield run
+    finally:
+        _local.run = prev
+
+
+@contextmanager
+def track(code: str) -> Iterator[RunStats]:
+    """Bu iş parçacığında code görevinin ölçümlerini topla."""
+    with activate(RunStats(code)) as run:
+        try:
+            yield run
+        finally:
+            run.finished = time.time()
+
+
+@contextmanager
+def stage(name: str, exclude: Iterable[str] = ()):
+    """
+    Bloğun süresini name aşamasına ekler (aktif çalışma yoksa hiçbir şey yapmaz).
+    exclude: blok içinde ölçülen başka aşamaların süresi düşülür (ör. diff döngüsü içindeki decode).
+    """
+    run = current()
+    if run is None:
+        yield
+        return
+    before = sum(run.stages.get(e, 0.0) for e in exclude)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        nested = sum(run.stages.get(e, 0.0) for e in exclude) - before
+        run.add(name, time.perf_counter() - t0 - nested)
+
+
+def count(name: str, n: int) -> None:
+    run = current()
+    if run is not None:
+        run.counts[name] = run.counts.get(name, 0) + int(n)
+
+
+def timed_iter(items: Iterable, name: str = "decode") -> Iterator:
+    """Akış halindeki satır üretecinde next() içinde geçen süreyi (okuma + çözümleme) name'e ekler."""
+    run = current()
+    if run is None:
+        yield from items
+        return
+    it = iter(items)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            run.add(name, time.perf_counter() - t0)
+            return
+        run.add(name, time.perf_counter() - t0)
+        yield item
+
+
+# ---------------------------
+# SQLite kayıt
+# ---------------------------
+def history_settings() -> Dict[str, Any]:
+    """data.json'daki isteğe bağlı "history": {"path": "run_history.db", "keep_per_task": 500} ayarı."""
+    try:
+        opts = CONFIG.data.get("history") or {}
+    except FileNotFoundError:
+        opts = {}
+    path = str(opts.get("path", "run_history.db"))
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(CONFIG.path)), path)
+    return {"path": path, "keep": int(opts.get("keep_per_task", 500))}
+
+
+def _open(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=5)
+    with _db_lock:
+        if path not in _db_ready:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS run_history (
+                    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                    code        TEXT NOT NULL,
+                    started_at  TEXT NOT NULL,
+                    finished_at TEXT NOT NULL,
+                    ok          INTEGER NOT NULL,
+                    mode        TEXT,
+                    total_ms    REAL NOT NULL,
+                    rows        INTEGER,
+                    inserted    INTEGER,
+                    updated     INTEGER,
+                    unchanged   INTEGER,
+                    deleted     INTEGER,
+                    stages      TEXT
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_run_history_code ON run_history (code, id)")
+            conn.commit()
+            _db_ready.add(path)
+    return conn
+
+
+def _ts(t: float) -> str:
+    return datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def save(run: RunStats, ok: bool, mode: str = "", rows: int = 0) -> bool:
+    """Çalışmayı run_history tablosuna yazar; görev başına en fazla keep_per_task kayıt tutulur."""
+    opts = history_settings()
+    c = run.counts
+    try:
+        conn = _open(opts["path"])
+        try:
+            conn.execute("""
+                INSERT INTO run_history (code, started_at, finished_at, ok, mode, total_ms, rows,
+                                         inserted, updated, unchanged, deleted, stages)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (run.code, _ts(run.started), _ts(run.finished or time.time()), int(bool(ok)), mode,
+                  round(run.total_ms, 1), rows, c.get("inserted"), c.get("updated"), c.get("unchanged"),
+                  c.get("deleted"), json.dumps(run.stages_ms())))
+            conn.execute("""
+                DELETE FROM run_history
+                 WHERE code = ? AND id <= (SELECT id FROM run_history WHERE code = ?
+                                           ORDER BY id DESC LIMIT 1 OFFSET ?)
+            """, (run.code, run.code, max(1, opts["keep"])))
+            conn.commit()
+        finally:
+            conn.close()
+        return True
+    except sqlite3.Error as e:
+        log.warning("çalışma geçmişi yazılamadı: %s", e, extra={"fields": {"task": run.code}})
+        return False
+
+
+def recent(code: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """code görevinin son çalışmaları (yeniden eskiye)."""
+    try:
+        conn = _open(history_settings()["path"])
+        try:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("SELECT * FROM run_history WHERE code = ? ORDER BY id DESC LIMIT ?",
+                                (code, limit)).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return []
+    out = []
+    for r in rows:
+        d = dict(r)
+        d["stages"] = json.loads(d["stages"] or "{}")
+        out.append(d)
+    return out
+
+
+def summary(code: str) -> Optional[Dict[str, Any]]:
+    """
+    Kart için özet: son çalışma ve önceki TREND_WINDOW başarılı çalışmanın ortalamasına göre değişim.
+    Dönüş: {"last_ms", "ok", "avg_ms" (None olabilir), "trend_pct" (None olabilir), "stages", "finished_at"}
+    """
+    runs = recent(code, TREND_WINDOW + 1)
+    if not runs:
+        return None
+    last, prev = runs[0], [r for r in runs[1:] if r["ok"]]
+    avg = sum(r["total_ms"] for r in prev) / len(prev) if prev else None
+    trend = (last["total_ms"] - avg) / avg * 100.0 if avg else None
+    return {"last_ms": last["total_ms"], "ok": bool(last["ok"]), "avg_ms": avg, "trend_pct": trend,
+            "stages": last["stages"], "finished_at": last["finished_at"]}
+
+
+def format_summary(s: Optional[Dict[str, Any]]) -> str:
+    """Kart hücresi metni, ör. '12.4 sn  ▲ %18 (ort. 10.5 sn)'."""
+    if not s:
+        return "-"
+    text = f"{s['last_ms'] / 1000.0:.1f} sn"
+    if s["trend_pct"] is not None:
+        arrow = "▲" if s["trend_pct"] >= 1 else "▼" if s["trend_pct"] <= -1 else "≈"
+        text += f"  {arrow} %{abs(s['trend_pct']):.0f} (ort. {s['avg_ms'] / 1000.0:.1f} sn)"
+    if not s["ok"]:
+        text += "  [hata]"
+    return text
+
+
+def format_stages(stages: Dict[str, float]) -> str:
+    """Aşama dökümü (tooltip / CLI), ör. 'http 820 ms, decode 1.2 sn, ...'."""
+    parts = []
+    for name, ms in stages.items():
+        parts.append(f"{name} {ms / 1000.0:.1f} sn" if ms >= 1000 else f"{name} {ms:.0f} ms")
+    return ", ".join(parts)
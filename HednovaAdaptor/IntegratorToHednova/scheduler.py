@@ -0,0 +1,97 @@
+# scheduler.py
+# -*- coding: utf-8 -*-
+"""
+Bağımlılık farkındalıklı paralel görev çalıştırıcı.
+Görevler bir DAG oluşturur (ör. ENT-08 BOM başlıkları -> ENT-09 BOM satırları);
+bağımlılıkları biten görevler max_workers sınırı içinde eşzamanlı çalışır, böylece
+toplam süre görev sürelerinin toplamına değil en uzun zincire yaklaşır.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+
+def build_deps(codes: Iterable[str], depends_on: Callable[[str], Iterable[str]]) -> Dict[str, Set[str]]:
+    """Her kod için, çalıştırılacak kümede bulunan bağımlılıklarını döndürür."""
+    codes = list(codes)
+    present = set(codes)
+    return {c: {d for d in depends_on(c) if d in present and d != c} for c in codes}
+
+
+def topo_order(deps: Dict[str, Set[str]]) -> List[str]:
+    """Kahn sıralaması; döngü varsa ValueError."""
+    remaining = {c: set(d) for c, d in deps.items()}
+    order: List[str] = []
+    while remaining:
+        ready = sorted(c for c, d in remaining.items() if not d)
+        if not ready:
+            raise ValueError(f"Görev bağımlılıklarında döngü var: {', '.join(sorted(remaining))}")
+        for c in ready:
+            order.append(c)
+            del remaining[c]
+        for d in remaining.values():
+            d.difference_update(ready)
+    return order
+
+
+def run_dag(tasks: Dict[str, Callable[[], Any]], deps: Dict[str, Set[str]], max_workers: int = 3,
+            is_success: Callable[[Any], bool] = lambda r: True,
+            on_start: Optional[Callable[[str], None]] = None,
+            on_done: Optional[Callable[[str, Any], None]] = None,
+            on_skip: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
+    """
+    tasks : kod -> argümansız çağrılabilir
+    deps  : kod -> önce bitmesi gereken kodlar
+    is_success: sonucun başarılı sayılıp sayılmadığı; başarısız görevin bağımlıları atlanır
+    Geri çağrılar havuz iş parçacıklarından çağrılır.
+    Dönüş: kod -> sonuç (istisna fırlatan görev için istisna nesnesi, atlanan görev için None)
+    """
+    topo_order(deps)   # döngü kontrolü
+
+    waiting = {c: set(deps.get(c, ())) & set(tasks) for c in tasks}
+    results: Dict[str, Any] = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="ent") as pool:
+        running = {}
+
+        def _launch_ready():
+            for code in sorted(c for c, d in waiting.items() if not d):
+                del waiting[code]
+                if on_start:
+                    on_start(code)
+                running[pool.submit(tasks[code])] = code
+
+        def _skip_dependents(code: str):
+            # Başarısız görevin (doğrudan/dolaylı) bağımlılarını atla
+            stack = [code]
+            while stack:
+                cur = stack.pop()
+                for c, d in list(waiting.items()):
+                    if cur in d:
+                        del waiting[c]
+                        results[c] = None
+                        if on_skip:
+                            on_skip(c, cur)
+                        stack.append(c)
+
+        _launch_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                code = running.pop(fut)
+                try:
+                    res = fut.result()
+                    ok = is_success(res)
+                except Exception as e:
+                    res, ok = e, False
+                results[code] = res
+                if on_done:
+                    on_done(code, res)
+                if ok:
+                    for d in waiting.values():
+                        d.discard(code)
+                else:
+                    _skip_dependents(code)
+            _launch_ready()
+
+    return results
@@ -1,55 +1,82 @@
 # sql_crud.py
 # -*- coding: utf-8 -*-
 
-import json
-import pyodbc
-from typing import Tuple
-from typing import Tuple, List, Dict
+import hashlib
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from app_log import get_logger
+from config import CONFIG
+from db_pool import ConnectionPool, PooledConnection, reconnecting
+import progress
+from progress import Cancelled
+from run_history import count, stage
+from sync_specs import SyncSpec, as_text
+import tenants
+
+log = get_logger("db")
 
-def _pick_odbc_driver() -> str:
-    """Makinede yüklü SQL Server ODBC sürücülerinden en uygun olanı seç."""
-    try:
-        drivers = pyodbc.drivers()
-    except Exception:
-        drivers = []
-    preferred = [
-        "ODBC Driver 18 for SQL Server",
-        "ODBC Driver 17 for SQL Server",
-        "SQL Server Native Client 11.0",
-        "SQL Server"
-    ]
-    for p in preferred:
-        if p in drivers:
-            return p
-    # Hiçbiri bulunamazsa boş dön (kullanıcıya anlamlı hata vereceğiz)
-    return ""
 
 def _load_conn_string() -> str:
-    """data.json'daki connectionstring'i al; gerekirse DRIVER ve Encrypt/Trust seçeneklerini ekle."""
-    with open("data.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    base = data["hednova"]["connectionstring"].strip()
-
-    # Driver yoksa otomatik ekle
-    if "driver=" not in base.lower():
-        driver_name = _pick_odbc_driver()
-        if not driver_name:
-            raise RuntimeError(
-                "Uygun SQL Server ODBC sürücüsü bulunamadı. Lütfen 'ODBC Driver 18 for SQL Server' "
-                "veya 'ODBC Driver 17 for SQL Server' kurun."
+    """
+    data.json'daki connectionstring'i (DRIVER ve Encrypt/Trust eklenmiş) paylaşılan CONFIG'ten al;
+    bu iş parçacığında bir kiracı etkinse onun veritabanı kullanılır (bkz. tenants).
+    """
+    tenant = tenants.current()
+    return tenant.conn_string() if tenant is not None else CONFIG.conn_string()
+
+
+# ---------------------------------------------------------------
+# Bağlantı havuzu
+# Tüm fonksiyonlar bağlantıyı havuzdan ödünç alır; conn.close() bağlantıyı
+# kapatmaz, havuza geri bırakır. Bağlantı cümlesi değişirse yeni havuz açılır.
+# ---------------------------------------------------------------
+POOL_MAX_SIZE = 4          # aynı anda açık en fazla bağlantı
+POOL_IDLE_TIMEOUT = 300    # sn; daha uzun boşta kalan bağlantı kapatılır
+POOL_PING_AFTER = 30       # sn; daha uzun boşta kalan bağlantı SELECT 1 ile sınanır
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _odbc_connect(conn_str: str):
+    # "sqlite:///..." yalnızca benchmark / çevrimdışı deneme içindir (bkz. sqlite_dialect)
+    if conn_str.lower().startswith("sqlite:///"):
+        import sqlite_dialect
+        return sqlite_dialect.connect(conn_str)
+    # pyodbc (ve ODBC sürücü yöneticisi) ilk bağlantıda yüklenir; CLI'nin açılışını yavaşlatmaz
+    import pyodbc
+    return pyodbc.connect(conn_str, autocommit=True, timeout=10)
+
+
+def _get_pool(conn_str: str) -> ConnectionPool:
+    with _pools_lock:
+        pool = _pools.get(conn_str)
+        if pool is None:
+            pool = ConnectionPool(
+                lambda: _odbc_connect(conn_str),
+                max_size=POOL_MAX_SIZE, idle_timeout=POOL_IDLE_TIMEOUT, ping_after=POOL_PING_AFTER,
             )
-        base = f"Driver={{{driver_name}}};" + base
+            _pools[conn_str] = pool
+        return pool
 
-    # ODBC 18'de varsayılan Encrypt=yes. TrustServerCertificate varsa sorun yok.
-    # Emin olmak için eksikse ekleyelim:
-    low = base.lower()
-    if "encrypt=" not in low and "trustservercertificate=" not in low:
-        # Sunucuda sertifika yönetmiyorsak şöyle güvenli bir ikili iyi çalışır:
-        base += "Encrypt=yes;TrustServerCertificate=yes;"
 
-    return base
+def _connect(autocommit: bool = True, conn_str: str = None) -> PooledConnection:
+    """Havuzdan bağlantı ödünç alır (conn_str verilmezse data.json'dan okunur)."""
+    return _get_pool(conn_str or _load_conn_string()).acquire(autocommit=autocommit)
 
+
+def close_pools() -> None:
+    """Uygulama kapanırken havuzdaki tüm bağlantıları kapatır."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+@reconnecting
 def update_session_row(session_id: str, text_datetime: str) -> Tuple[bool, str]:
     """
     KR_ENTEGRASYONE tablosunda CODE='ENT-01' satırını günceller:
@@ -63,7 +90,7 @@ def update_session_row(session_id: str, text_datetime: str) -> Tuple[bool, str]:
         return (False, f"Bağlantı cümlesi hazırlanamadı: {e}")
 
     try:
-        conn = pyodbc.connect(conn_str, autocommit=True, timeout=10)
+        conn = _connect(autocommit=True, conn_str=conn_str)
     except Exception as e:
         return (False, f"Veritabanı bağlantı hatası: {e}")
 
@@ -91,6 +118,7 @@ def update_session_row(session_id: str, text_datetime: str) -> Tuple[bool, str]:
 
 
 
+@reconnecting
 def fetch_va_rows() -> Tuple[bool, List[Dict], str]:
     """
     KR_ENTEGRASYONE tablosundan RESULT6='VA' olan satırları çeker.
@@ -104,7 +132,7 @@ def fetch_va_rows() -> Tuple[bool, List[Dict], str]:
         return (False, [], f"Bağlantı cümlesi hazırlanamadı: {e}")
 
     try:
-        conn = pyodbc.connect(conn_str, autocommit=True, timeout=10)
+        conn = _connect(autocommit=True, conn_str=conn_str)
     except Exception as e:
         return (False, [], f"Veritabanı bağlantı hatası: {e}")
 
@@ -138,13 +166,39 @@ def fetch_va_rows() -> Tuple[bool, List[Dict], str]:
     
       
 
+def ping_db() -> Tuple[bool, str, float]:
+    """
+    Bağlantı ön kontrolü: havuzdan bir bağlantıyla SELECT 1 çalıştırır.
+    Dönüş: (ok, mesaj, süre_ms)
+    """
+    t0 = time.perf_counter()
+    try:
+        conn = _connect(autocommit=True)
+    except Exception as e:
+        return (False, f"Veritabanı bağlantı hatası: {e}", (time.perf_counter() - t0) * 1000.0)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        cur.fetchall()
+        cur.close()
+        return (True, "Veritabanı erişilebilir.", (time.perf_counter() - t0) * 1000.0)
+    except Exception as e:
+        return (False, f"Sorgu hatası: {e}", (time.perf_counter() - t0) * 1000.0)
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+@reconnecting
 def get_active_session() -> Tuple[bool, str]:
     """
     KR_ENTEGRASYONE tablosunda CODE='ENT-01' satırının RESULT1 alanını (aktif session id) döndürür.
     Dönüş: (ok, session_id_or_error_message)
     """
     try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=True, timeout=10)
+        conn = _connect(autocommit=True)
     except Exception as e:
         return (False, f"Veritabanı bağlantı hatası: {e}")
 
@@ -165,586 +219,464 @@ def get_active_session() -> Tuple[bool, str]:
         try: conn.close()
         except Exception: pass
         return (False, f"Sorgu hatası: {e}")
-    
-    
-def update_entegrasyone_last_update(code: str, text_datetime: str) -> Tuple[bool, str]:
+
+
+
+@reconnecting
+def get_session_info() -> Tuple[bool, str, str]:
     """
-    KR_ENTEGRASYONE tablosunda ilgili CODE satırının RESULT5 alanını günceller.
-    text_datetime -> 'YYYY-MM-DD HH:MM:SS' formatlı TEXT.
-    Dönüş: (ok, mesaj)
+    KR_ENTEGRASYONE CODE='ENT-01' satırından session id (RESULT1) ve alınma zamanını (RESULT2) döndürür.
+    Dönüş: (ok, session_id_or_error_message, 'YYYY-MM-DD HH:MM:SS')
     """
     try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=True, timeout=10)
+        conn = _connect(autocommit=True)
     except Exception as e:
-        return (False, f"Veritabanı bağlantı hatası: {e}")
+        return (False, f"Veritabanı bağlantı hatası: {e}", "")
 
     try:
         cur = conn.cursor()
         cur.execute("""
-            UPDATE [KR_ENTEGRASYONE]
-               SET [RESULT5] = ?
-             WHERE [CODE] = ?
-        """, (text_datetime, code))
-        rows = cur.rowcount
+            SELECT TOP 1 [RESULT1], [RESULT2]
+              FROM [KR_ENTEGRASYONE]
+             WHERE [CODE] = 'ENT-01';
+        """)
+        row = cur.fetchone()
         cur.close()
         conn.close()
-        return (True, f"RESULT5 güncellendi (etkilenen satır: {rows}).")
+        if row and row[0]:
+            return (True, str(row[0]), str(row[1] or ""))
+        return (False, "Aktif session bulunamadı (RESULT1 boş).", "")
     except Exception as e:
         try: conn.close()
         except Exception: pass
-        return (False, f"RESULT5 güncellenemedi: {e}")
+        return (False, f"Sorgu hatası: {e}", "")
     
-
-
-
-def ent02_update(rows: List[Dict]) -> Tuple[bool, str, int]:
+    
+@reconnecting
+def get_entegrasyone_last_update(code: str) -> Tuple[bool, str]:
     """
-    rows: [{"key": 13482, "kod":"HZ", "aciklama":"HİZMET"}, ...]
-    Dönüş: (ok, mesaj, yeni_eklenen_kayit_sayisi)
+    KR_ENTEGRASYONE'de ilgili CODE satırının RESULT5 (son başarılı senkron) değerini okur.
+    Dönüş: (ok, 'YYYY-MM-DD HH:MM:SS' ya da boş metin / hata mesajı)
     """
     try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=False, timeout=10)
+        conn = _connect(autocommit=True)
     except Exception as e:
-        return (False, f"Veritabanı bağlantı hatası: {e}", 0)
+        return (False, f"Veritabanı bağlantı hatası: {e}")
 
-    evrak_const = "STUNIT"
     try:
         cur = conn.cursor()
-
-        # 1) Mevcut ENT01 kümesini çek (EVRAKNO 'STUNIT')
-        cur.execute("""
-            SELECT [ENT01]
-              FROM [KR_GECOUST]
-             WHERE LTRIM(RTRIM([EVRAKNO])) = ?
-        """, (evrak_const,))
-        db_keys = set()
-        for r in cur.fetchall():
-            if r[0] is not None:
-                db_keys.add(str(r[0]))
-
-        # 2) API keys + normalize
-        api_rows = []
-        api_keys = set()
-        for it in rows or []:
-            key = str(it.get("key", "")).strip()
-            kod = str(it.get("kod", "")).strip()
-            aci = str(it.get("aciklama", "")).strip()
-            if not key:
-                continue
-            api_rows.append({"key": key, "kod": kod, "aciklama": aci})
-            api_keys.add(key)
-
-        # 3) Eklenen / Güncellenen / Silinen kümeleri hesapla
-        to_insert = api_keys - db_keys
-        to_update = api_keys & db_keys
-        to_delete = db_keys - api_keys
-
-        # 4) INSERT
-        inserted = 0
-        for row in api_rows:
-            if row["key"] in to_insert:
-                cur.execute("""
-                    INSERT INTO [KR_GECOUST] ([EVRAKNO], [KOD], [AD], [AP10], [ENT01])
-                    VALUES (?, ?, ?, ?, ?)
-                """, (evrak_const, row["kod"], row["aciklama"], 1, row["key"]))
-                inserted += 1
-
-        # 5) UPDATE
-        for row in api_rows:
-            if row["key"] in to_update:
-                cur.execute("""
-                    UPDATE [KR_GECOUST]
-                       SET [KOD] = ?, [AD] = ?, [AP10] = ?, [EVRAKNO] = ?
-                     WHERE [ENT01] = ? AND LTRIM(RTRIM([EVRAKNO])) = ?
-                """, (row["kod"], row["aciklama"], 1, evrak_const, row["key"], evrak_const))
-
-        # 6) DELETE (DB’de olup API’de olmayanlar)
-        for key in to_delete:
-            cur.execute("""
-                DELETE FROM [KR_GECOUST]
-                 WHERE [ENT01] = ? AND LTRIM(RTRIM([EVRAKNO])) = ?
-            """, (key, evrak_const))
-
-        conn.commit()
-        msg = f"ENT-02 senkron tamamlandı: eklenen {inserted}, güncellenen {len(to_update)}, silinen {len(to_delete)}."
-        return (True, msg, inserted)
-
+        cur.execute("SELECT [RESULT5] FROM [KR_ENTEGRASYONE] WHERE [CODE] = ?", (code,))
+        row = cur.fetchone()
+        cur.close()
+        conn.close()
+        return (True, str(row[0]).strip() if row and row[0] is not None else "")
     except Exception as e:
-        try:
-            conn.rollback()
-        except Exception:
-            pass
-        return (False, f"ENT-02 hata: {e}", 0)
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
-
+        try: conn.close()
+        except Exception: pass
+        return (False, f"RESULT5 okunamadı: {e}")
 
-def ent03_update(rows: List[Dict]) -> Tuple[bool, str, int]:
 
+@reconnecting
+def update_entegrasyone_last_update(code: str, text_datetime: str) -> Tuple[bool, str]:
+    """
+    KR_ENTEGRASYONE tablosunda ilgili CODE satırının RESULT5 alanını günceller.
+    text_datetime -> 'YYYY-MM-DD HH:MM:SS' formatlı TEXT.
+    Dönüş: (ok, mesaj)
+    """
     try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=False, timeout=10)
+        conn = _connect(autocommit=True)
     except Exception as e:
-        return (False, f"Veritabanı bağlantı hatası: {e}", 0)
+        return (False, f"Veritabanı bağlantı hatası: {e}")
 
     try:
         cur = conn.cursor()
+        cur.execute("""
+            UPDATE [KR_ENTEGRASYONE]
+               SET [RESULT5] = ?
+             WHERE [CODE] = ?
+        """, (text_datetime, code))
+        rows = cur.rowcount
+        cur.close()
+        conn.close()
+        return (True, f"RESULT5 güncellendi (etkilenen satır: {rows}).")
+    except Exception as e:
+        try: conn.close()
+        except Exception: pass
+        return (False, f"RESULT5 güncellenemedi: {e}")
+    
 
 
-        cur.execute("SELECT [ENT01] FROM [KR_PERS00]")
-        db_keys = set()
-        for r in cur.fetchall():
-            if r[0] is not None:
-                db_keys.add(str(r[0]).strip())
-
-
-        api_rows: List[Dict] = []
-        api_keys = set()
-        for it in rows or []:
-            key = str(it.get("key", "")).strip()
-            kod = str(it.get("kod", "")).strip()
-            aci = str(it.get("aciklama", "")).strip()
-            tez = str(it.get("tezgah_kodu", "")).strip()
-            if not key:
-                continue
-            api_rows.append({"key": key, "kod": kod, "aciklama": aci, "tezgah_kodu": tez})
-            api_keys.add(key)
-
-  
-        to_insert = api_keys - db_keys
-        to_update = api_keys & db_keys
-        to_delete = db_keys - api_keys
-
-
-        inserted = 0
-        for row in api_rows:
-            if row["key"] in to_insert:
-                cur.execute("""
-                    INSERT INTO [KR_PERS00] ([KOD], [AD], [REFTEXT01], [ENT01])
-                    VALUES (?, ?, ?, ?)
-                """, (row["kod"], row["aciklama"], row["tezgah_kodu"], row["key"]))
-                inserted += 1
+# ---------------------------------------------------------------
+# Toplu yazma (bulk) yardımcıları
+# Satır başına cur.execute yerine fast_executemany ile staging (#temp)
+# tabloya yükleyip tek bir UPDATE/DELETE JOIN ile uygular.
+# ---------------------------------------------------------------
+BULK_WRITE = True          # False -> eski satır satır yazma davranışı
+BULK_BATCH_SIZE = 5000     # executemany başına gönderilecek satır sayısı
 
 
-        for row in api_rows:
-            if row["key"] in to_update:
-                cur.execute("""
-                    UPDATE [KR_PERS00]
-                       SET [KOD] = ?, [AD] = ?, [REFTEXT01] = ?
-                     WHERE [ENT01] = ?
-                """, (row["kod"], row["aciklama"], row["tezgah_kodu"], row["key"]))
+def _chunks(seq: List, size: int):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
 
 
-        for key in to_delete:
-            cur.execute("DELETE FROM [KR_PERS00] WHERE [ENT01] = ?", (key,))
+def _cols_sql(cols: List[str], alias: str = "") -> str:
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(f"{prefix}[{c}]" for c in cols)
 
-        conn.commit()
-        msg = (f"ENT-03 senkron tamamlandı: "
-               f"eklenen {inserted}, güncellenen {len(to_update)}, silinen {len(to_delete)}.")
-        return (True, msg, inserted)
 
-    except Exception as e:
-        try:
-            conn.rollback()
-        except Exception:
-            pass
-        return (False, f"ENT-03 hata: {e}", 0)
+def _executemany(cur, sql: str, params: List[tuple], track: str = "") -> None:
+    """
+    BULK_WRITE açıksa fast_executemany ile parça parça, değilse satır satır çalıştırır.
+    Her parçadan önce iptal kontrol edilir (progress.checkpoint); track verilirse
+    ("inserted" | "updated" | "deleted") gönderilen satırlar ilerlemeye eklenir.
+    """
+    if not BULK_WRITE:
+        for part in _chunks(params, BULK_BATCH_SIZE):
+            progress.checkpoint()
+            for p in part:
+                cur.execute(sql, p)
+            if track:
+                progress.advance(track, len(part))
+        return
+    cur.fast_executemany = True
+    try:
+        for part in _chunks(params, BULK_BATCH_SIZE):
+            progress.checkpoint()
+            cur.executemany(sql, part)
+            if track:
+                progress.advance(track, len(part))
     finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
-
-
+        cur.fast_executemany = False
 
-def ent04_update(rows: List[Dict]) -> Tuple[bool, str, int]:
 
-    try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=False, timeout=10)
-    except Exception as e:
-        return (False, f"Veritabanı bağlantı hatası: {e}", 0)
+def _bulk_insert(cur, table: str, cols: List[str], params: List[tuple]) -> int:
+    """params satırlarını hedef tabloya toplu INSERT eder. Dönüş: eklenen satır sayısı."""
+    if not params:
+        return 0
+    marks = ", ".join("?" for _ in cols)
+    _executemany(cur, f"INSERT INTO [{table}] ({_cols_sql(cols)}) VALUES ({marks})", params, "inserted")
+    return len(params)
 
-    try:
-        cur = conn.cursor()
 
-        # 1) DB'deki ENT01 kümesini çek (tüm kayıtlar)
-        cur.execute("SELECT [ENT01] FROM [KR_IMLT00]")
-        db_keys = set()
-        for r in cur.fetchall():
-            if r[0] is not None:
-                db_keys.add(str(r[0]).strip())
-
-        # 2) API verisini normalize et
-        api_rows: List[Dict] = []
-        api_keys = set()
-        for it in rows or []:
-            key = str(it.get("key", "")).strip()
-            kod = str(it.get("kod", "")).strip()
-            aci = str(it.get("aciklama", "")).strip()
-            if not key:
-                continue
-            api_rows.append({"key": key, "kod": kod, "aciklama": aci})
-            api_keys.add(key)
-
-        # 3) fark kümeleri
-        to_insert = api_keys - db_keys
-        to_update = api_keys & db_keys
-        to_delete = db_keys - api_keys
-
-        # 4) INSERT
-        inserted = 0
-        for row in api_rows:
-            if row["key"] in to_insert:
-                cur.execute("""
-                    INSERT INTO [KR_IMLT00] ([KOD], [AD], [ENT01])
-                    VALUES (?, ?, ?)
-                """, (row["kod"], row["aciklama"], row["key"]))
-                inserted += 1
-
-        # 5) UPDATE
-        for row in api_rows:
-            if row["key"] in to_update:
-                cur.execute("""
-                    UPDATE [KR_IMLT00]
-                       SET [KOD] = ?, [AD] = ?
-                     WHERE [ENT01] = ?
-                """, (row["kod"], row["aciklama"], row["key"]))
-
-        # 6) DELETE (API'de olmayanları sil)
-        for key in to_delete:
-            cur.execute("DELETE FROM [KR_IMLT00] WHERE [ENT01] = ?", (key,))
+def _load_staging(cur, table: str, cols: List[str], params: List[tuple], track: str = "") -> str:
+    """
+    Hedef tablonun kolon tipleriyle oturuma özel bir #temp tablo açar ve params ile doldurur.
+    Dönüş: staging tablo adı.
+    """
+    stg = f"#STG_{table}"
+    cur.execute(f"IF OBJECT_ID('tempdb..{stg}') IS NOT NULL DROP TABLE {stg};")
+    cur.execute(f"SELECT TOP 0 {_cols_sql(cols)} INTO {stg} FROM [{table}];")
+    marks = ", ".join("?" for _ in cols)
+    _executemany(cur, f"INSERT INTO {stg} ({_cols_sql(cols)}) VALUES ({marks})", params, track)
+    return stg
 
-        conn.commit()
-        msg = (f"ENT-04 senkron tamamlandı: "
-               f"eklenen {inserted}, güncellenen {len(to_update)}, silinen {len(to_delete)}.")
-        return (True, msg, inserted)
 
-    except Exception as e:
-        try:
-            conn.rollback()
-        except Exception:
-            pass
-        return (False, f"ENT-04 hata: {e}", 0)
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
-        
-        
+def _bulk_update(cur, table: str, key_cols: List[str], set_cols: List[str],
+                 params: List[tuple], where_sql: str = "", where_params: tuple = ()) -> int:
+    """
+    params: (key_cols..., set_cols...) sırasında tuple listesi.
+    BULK_WRITE açıkken tek bir UPDATE ... FROM ... JOIN ile uygulanır.
+    where_sql: hedef tablo (t) için ek filtre, ör. "AND t.[EVRAKNO] = ?"
+    """
+    if not params:
+        return 0
+    if not BULK_WRITE:
+        sets = ", ".join(f"t.[{c}] = ?" for c in set_cols)
+        keys = " AND ".join(f"t.[{k}] = ?" for k in key_cols)
+        sql = f"UPDATE t SET {sets} FROM [{table}] t WHERE {keys} {where_sql}"
+        nk = len(key_cols)
+        _executemany(cur, sql, [tuple(p[nk:]) + tuple(p[:nk]) + tuple(where_params) for p in params], "updated")
+        return len(params)
+
+    # İlerleme staging yüklemesinde sayılır (asıl süre orada; JOIN sunucuda tek cümledir)
+    stg = _load_staging(cur, table, key_cols + set_cols, params, "updated")
+    sets = ", ".join(f"t.[{c}] = s.[{c}]" for c in set_cols)
+    on = " AND ".join(f"t.[{k}] = s.[{k}]" for k in key_cols)
+    cur.execute(f"UPDATE t SET {sets} FROM [{table}] t INNER JOIN {stg} s ON {on} {where_sql};",
+                *where_params)
+    cur.execute(f"DROP TABLE {stg};")
+    return len(params)
+
+
+def _bulk_delete(cur, table: str, key_cols: List[str], keys: List[tuple],
+                 where_sql: str = "", where_params: tuple = ()) -> int:
+    """keys: key_cols sırasında tuple listesi. Tek bir DELETE ... JOIN ile siler."""
+    if not keys:
+        return 0
+    if not BULK_WRITE:
+        cond = " AND ".join(f"t.[{k}] = ?" for k in key_cols)
+        sql = f"DELETE t FROM [{table}] t WHERE {cond} {where_sql}"
+        _executemany(cur, sql, [tuple(k) + tuple(where_params) for k in keys], "deleted")
+        return len(keys)
+
+    stg = _load_staging(cur, table, key_cols, keys, "deleted")
+    on = " AND ".join(f"t.[{k}] = s.[{k}]" for k in key_cols)
+    cur.execute(f"DELETE t FROM [{table}] t INNER JOIN {stg} s ON {on} {where_sql};", *where_params)
+    cur.execute(f"DROP TABLE {stg};")
+    return len(keys)
+
+
+
+# ---------------------------------------------------------------
+# Satır içerik özeti (hash)
+# Eşlenen kolonların özeti ENT01'in yanında [ENTHASH] kolonunda tutulur;
+# özeti değişmeyen satırlar UPDATE edilmez.
+# ---------------------------------------------------------------
+HASH_COLUMN = "ENTHASH"
+
+
+# Çok kolonlu anahtarlar için isteğe bağlı kalıcı vekil anahtar (SyncSpec.key_hash):
+# kırpılmış anahtar parçalarının özeti; tek kolonlu indeksle eşleşme/silme yapılır.
+KEY_HASH_COLUMN = "ENTKEY"
+
+
+def _key_hash(key: Tuple[str, ...]) -> str:
+    """Kırpılmış anahtar parçalarından vekil anahtar (32 karakter); parçalar '\x1f' ile ayrılır."""
+    return hashlib.md5("\x1f".join(key).encode("utf-8")).hexdigest()
+
+
+def _row_hash(values) -> str:
+    """Eşlenen kolon değerlerinden sabit uzunlukta (32) bir içerik özeti üretir."""
+    text = "\x1f".join("" if v is None else str(v) for v in values)
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def _ensure_hash_column(cur, table: str) -> None:
+    """Hedef tabloda [ENTHASH] kolonu yoksa ekler."""
+    cur.execute(f"""
+        IF COL_LENGTH('{table}', '{HASH_COLUMN}') IS NULL
+            ALTER TABLE [{table}] ADD [{HASH_COLUMN}] CHAR(32) NULL;
+    """)
+
+
+def _scope_sql(spec: SyncSpec) -> str:
+    # Kolonlar yazarken as_text ile kırpılır (eski kayıtlar için cli.py schema --trim); indeks kullanılabilir
+    return "".join(f" AND t.[{c}] = ?" for c in spec.scope)
+
+
+# ---------------------------------------------------------------
+# Şema / indeks kontrolü
+# Senkron tablolarında anahtar (ENT01 ya da ENT01..ENT05) ve scope (EVRAKNO) kolonları
+# için indeks olup olmadığına bakılır; varsayılan yalnızca uyarıdır, indeks ancak
+# "schema": {"create_indexes": true} ya da "cli.py schema" ile oluşturulur. Anahtar ve scope
+# değerleri yazarken as_text ile kırpılır, böylece "t.[ENT01] = ?" gibi koşullar indeks
+# araması (seek) yapabilir. Her tablo süreç içinde bir kez kontrol edilir.
+# ---------------------------------------------------------------
+_schema_checked: set = set()
+_schema_lock = threading.Lock()
+
+
+def schema_settings() -> Dict[str, bool]:
+    """data.json'daki isteğe bağlı "schema": {"create_indexes": true} ayarı; verilmezse eksik indeks yalnızca uyarıdır."""
+    try:
+        opts = CONFIG.data.get("schema") or {}
+    except FileNotFoundError:
+        opts = {}
+    return {"create_indexes": bool(opts.get("create_indexes", False))}
+
+
+def _index_plan(spec: SyncSpec) -> List[Tuple[str, List[str]]]:
+    """(indeks adı, kolonlar) listesi: anahtar (ya da vekil anahtar) indeksi ve varsa scope + anahtar indeksi."""
+    keys = _match_cols(spec)
+    plan = [(f"IX_{spec.table}_{'_'.join(keys)}", keys)]
+    if spec.scope:
+        scope = list(spec.scope)
+        plan.append((f"IX_{spec.table}_{'_'.join(scope)}_{'_'.join(keys)}", scope + keys))
+    return plan
+
+
+def _existing_index_columns(cur, table: str) -> List[List[str]]:
+    """Tablodaki her indeksin anahtar kolonları (sıralı, küçük harf)."""
+    cur.execute("""
+        SELECT i.index_id, c.name
+          FROM sys.indexes i
+          JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+          JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+         WHERE i.object_id = OBJECT_ID(?) AND ic.key_ordinal > 0
+         ORDER BY i.index_id, ic.key_ordinal
+    """, (table,))
+    by_index: Dict[int, List[str]] = {}
+    for index_id, name in cur.fetchall():
+        by_index.setdefault(index_id, []).append(str(name).lower())
+    return list(by_index.values())
 
-def ent05_update(rows: List[Dict]) -> Tuple[bool, str, int]:
 
+def _backfill_key_hash(cur, spec: SyncSpec) -> int:
+    """
+    [ENTKEY] kolonunu ekler ve boş olan satırlar için Python tarafında (API tarafıyla aynı
+    _key_hash ile) doldurur. Anahtarı tamamen boş satırlar NULL kalır ve senkrona girmez.
+    """
+    table, keys = spec.table, list(spec.keys)
+    cur.execute(f"""
+        IF COL_LENGTH('{table}', '{KEY_HASH_COLUMN}') IS NULL
+            ALTER TABLE [{table}] ADD [{KEY_HASH_COLUMN}] CHAR(32) NULL;
+    """)
+    cur.execute(f"SELECT DISTINCT {_cols_sql(keys)} FROM [{table}] WHERE [{KEY_HASH_COLUMN}] IS NULL;")
+    params = []
+    for r in cur.fetchall():
+        key = tuple(as_text(v) for v in r)
+        if any(key):
+            params.append(key + (_key_hash(key),))
+    if not params:
+        return 0
+    stg = _load_staging(cur, table, keys + [KEY_HASH_COLUMN], params)
+    on = " AND ".join(f"ISNULL(t.[{k}], '') = s.[{k}]" for k in keys)
+    cur.execute(f"UPDATE t SET t.[{KEY_HASH_COLUMN}] = s.[{KEY_HASH_COLUMN}] FROM [{table}] t "
+                f"INNER JOIN {stg} s ON {on} WHERE t.[{KEY_HASH_COLUMN}] IS NULL;")
+    filled = max(cur.rowcount, 0)
+    cur.execute(f"DROP TABLE {stg};")
+    return filled
+
+
+@reconnecting
+def ensure_schema(spec: SyncSpec, create: bool = None) -> Tuple[bool, str, List[str]]:
+    """
+    spec tablosunda [ENTHASH] kolonunu ve gereken indeksleri doğrular; tablodaki veriye
+    ([ENTKEY] doldurma dışında) dokunmaz. create verilmezse schema_settings()'e bakılır; False ise eksik indeks yalnızca uyarıdır.
+    Dönüş: (ok, özet mesaj, uyarılar)
+    """
+    if create is None:
+        create = schema_settings()["create_indexes"]
     try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=False, timeout=10)
+        conn = _connect(autocommit=True)
     except Exception as e:
-        return (False, f"Veritabanı bağlantı hatası: {e}", 0)
+        return (False, f"Veritabanı bağlantı hatası: {e}", [])
 
+    warnings: List[str] = []
+    created: List[str] = []
     try:
         cur = conn.cursor()
+        _ensure_hash_column(cur, spec.table)
+        filled = _backfill_key_hash(cur, spec) if spec.key_hash else 0
 
-        # 1) DB'deki ENT01 kümesini çek (tüm kayıtlar)
-        cur.execute("SELECT [ENT01] FROM [KR_IMLT01]")
-        db_keys = set()
-        for r in cur.fetchall():
-            if r[0] is not None:
-                db_keys.add(str(r[0]).strip())
-
-        # 2) API verisini normalize et
-        api_rows: List[Dict] = []
-        api_keys = set()
-        for it in rows or []:
-            key = str(it.get("key", "")).strip()
-            kod = str(it.get("kod", "")).strip()
-            aci = str(it.get("aciklama", "")).strip()
-            if not key:
+        existing = _existing_index_columns(cur, spec.table)
+        for name, cols in _index_plan(spec):
+            wanted = [c.lower() for c in cols]
+            if any(ix[:len(wanted)] == wanted for ix in existing):
                 continue
-            api_rows.append({"key": key, "kod": kod, "aciklama": aci})
-            api_keys.add(key)
-
-        # 3) fark kümeleri
-        to_insert = api_keys - db_keys
-        to_update = api_keys & db_keys
-        to_delete = db_keys - api_keys
-
-        # 4) INSERT
-        inserted = 0
-        for row in api_rows:
-            if row["key"] in to_insert:
-                cur.execute("""
-                    INSERT INTO [KR_IMLT01] ([KOD], [AD], [ENT01])
-                    VALUES (?, ?, ?)
-                """, (row["kod"], row["aciklama"], row["key"]))
-                inserted += 1
-
-        # 5) UPDATE
-        for row in api_rows:
-            if row["key"] in to_update:
-                cur.execute("""
-                    UPDATE [KR_IMLT01]
-                       SET [KOD] = ?, [AD] = ?
-                     WHERE [ENT01] = ?
-                """, (row["kod"], row["aciklama"], row["key"]))
-
-        # 6) DELETE (API'de olmayanları sil)
-        for key in to_delete:
-            cur.execute("DELETE FROM [KR_IMLT01] WHERE [ENT01] = ?", (key,))
-
-        conn.commit()
-        msg = (f"ENT-05 senkron tamamlandı: "
-               f"eklenen {inserted}, güncellenen {len(to_update)}, silinen {len(to_delete)}.")
-        return (True, msg, inserted)
-
-    except Exception as e:
-        try:
-            conn.rollback()
-        except Exception:
-            pass
-        return (False, f"ENT-05 hata: {e}", 0)
+            if not create:
+                warnings.append(f"{spec.table}: ({', '.join(cols)}) için indeks yok.")
+                continue
+            try:
+                cur.execute(f"CREATE NONCLUSTERED INDEX [{name}] ON [{spec.table}] ({_cols_sql(cols)}) "
+                            f"INCLUDE ([{HASH_COLUMN}]);")
+                created.append(name)
+            except Exception as e:
+                warnings.append(f"{spec.table}: ({', '.join(cols)}) için indeks oluşturulamadı: {e}")
+
+        parts = [f"{spec.table} şema kontrolü tamam"]
+        if created:
+            parts.append(f"oluşturulan indeks: {', '.join(created)}")
+        if filled:
+            parts.append(f"{KEY_HASH_COLUMN} doldurulan satır: {filled}")
+        return (True, "; ".join(parts) + ".", warnings)
+
+    except Exception as e:
+        return (False, f"{spec.table} şema kontrolü hatası: {e}", warnings)
     finally:
         try:
             conn.close()
         except Exception:
             pass
-        
-        
 
 
-def ent06_update(rows: List[Dict]) -> Tuple[bool, str, int]:
-
+@reconnecting
+def trim_key_values(spec: SyncSpec) -> Tuple[bool, str]:
+    """
+    Eski kayıtlardaki anahtar değerlerinin baş/son boşluklarını temizler (cli.py schema --trim).
+    Yalnızca spec'in scope'undaki satırlara dokunur ve tek transaction içinde çalışır. SQL Server
+    '=' karşılaştırmasında sondaki boşlukları zaten yok sayar; indeks aramasını bozan baştaki boşluklardır.
+    """
     try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=False, timeout=10)
+        conn = _connect(autocommit=False)
     except Exception as e:
-        return (False, f"Veritabanı bağlantı hatası: {e}", 0)
+        return (False, f"Veritabanı bağlantı hatası: {e}")
 
+    scope_vals = tuple(spec.scope.values())
     try:
         cur = conn.cursor()
-
-        # 1) DB'deki ENT01 kümesini çek (tüm kayıtlar)
-        cur.execute("SELECT [ENT01] FROM [KR_GDEF00]")
-        db_keys = set()
-        for r in cur.fetchall():
-            if r[0] is not None:
-                db_keys.add(str(r[0]).strip())
-
-        # 2) API verisini normalize et
-        api_rows: List[Dict] = []
-        api_keys = set()
-        for it in rows or []:
-            key = str(it.get("key", "")).strip()
-            kod = str(it.get("kod", "")).strip()
-            aci = str(it.get("aciklama", "")).strip()
-            if not key:
-                continue
-            api_rows.append({"key": key, "kod": kod, "aciklama": aci})
-            api_keys.add(key)
-
-        # 3) fark kümeleri
-        to_insert = api_keys - db_keys
-        to_update = api_keys & db_keys
-        to_delete = db_keys - api_keys
-
-        # 4) INSERT
-        inserted = 0
-        for row in api_rows:
-            if row["key"] in to_insert:
-                cur.execute("""
-                    INSERT INTO [KR_GDEF00] ([KOD], [AD], [ENT01])
-                    VALUES (?, ?, ?)
-                """, (row["kod"], row["aciklama"], row["key"]))
-                inserted += 1
-
-        # 5) UPDATE
-        for row in api_rows:
-            if row["key"] in to_update:
-                cur.execute("""
-                    UPDATE [KR_GDEF00]
-                       SET [KOD] = ?, [AD] = ?
-                     WHERE [ENT01] = ?
-                """, (row["kod"], row["aciklama"], row["key"]))
-
-        # 6) DELETE (API'de olmayanları sil)
-        for key in to_delete:
-            cur.execute("DELETE FROM [KR_GDEF00] WHERE [ENT01] = ?", (key,))
-
+        fixed = 0
+        for k in spec.keys:
+            cur.execute(f"UPDATE t SET t.[{k}] = LTRIM(RTRIM(t.[{k}])) FROM [{spec.table}] t "
+                        f"WHERE t.[{k}] LIKE ' %'{_scope_sql(spec)};", *scope_vals)
+            fixed += max(cur.rowcount, 0)
         conn.commit()
-        msg = (f"ENT-06 senkron tamamlandı: "
-               f"eklenen {inserted}, güncellenen {len(to_update)}, silinen {len(to_delete)}.")
-        return (True, msg, inserted)
+        return (True, f"{spec.table} kırpılan değer: {fixed}.")
 
     except Exception as e:
         try:
             conn.rollback()
         except Exception:
             pass
-        return (False, f"ENT-06 hata: {e}", 0)
+        return (False, f"{spec.table} kırpma hatası: {e}")
     finally:
         try:
             conn.close()
         except Exception:
             pass
-        
-        
 
 
-def ent07_update(rows: List[Dict]) -> Tuple[bool, str, int]:
-
-    try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=False, timeout=10)
-    except Exception as e:
-        return (False, f"Veritabanı bağlantı hatası: {e}", 0)
+def _check_schema_once(spec: SyncSpec) -> None:
+    """Senkrondan önce tabloyu süreç içinde bir kez kontrol eder; uyarıları günlüğe yazar."""
+    marker = (_load_conn_string(), spec.table, spec.keys, tuple(spec.scope), spec.key_hash)
+    with _schema_lock:
+        if marker in _schema_checked:
+            return
+        _schema_checked.add(marker)
+    ok, msg, warnings = ensure_schema(spec)
+    for w in warnings:
+        log.warning("%s: %s", spec.code, w, extra={"fields": {"table": spec.table}})
+    if not ok:
+        log.warning("%s: %s", spec.code, msg, extra={"fields": {"table": spec.table}})
 
-    try:
-        cur = conn.cursor()
 
-        # 1) DB'deki ENT01 kümesini çek (tüm kayıtlar)
-        cur.execute("SELECT [ENT01] FROM [KR_CARI00]")
-        db_keys = set()
-        for r in cur.fetchall():
-            if r[0] is not None:
-                db_keys.add(str(r[0]).strip())
-
-        # 2) API verisini normalize et
-        api_rows: List[Dict] = []
-        api_keys = set()
-        for it in rows or []:
-            key = str(it.get("key", "")).strip()
-            kod = str(it.get("kod", "")).strip()
-            aci = str(it.get("aciklama", "")).strip()
-            if not key:
-                continue
-            api_rows.append({"key": key, "kod": kod, "aciklama": aci})
-            api_keys.add(key)
-
-        # 3) fark kümeleri
-        to_insert = api_keys - db_keys
-        to_update = api_keys & db_keys
-        to_delete = db_keys - api_keys
-
-        # 4) INSERT
-        inserted = 0
-        for row in api_rows:
-            if row["key"] in to_insert:
-                cur.execute("""
-                    INSERT INTO [KR_CARI00] ([KOD], [AD], [ENT01])
-                    VALUES (?, ?, ?)
-                """, (row["kod"], row["aciklama"], row["key"]))
-                inserted += 1
-
-        # 5) UPDATE
-        for row in api_rows:
-            if row["key"] in to_update:
-                cur.execute("""
-                    UPDATE [KR_CARI00]
-                       SET [KOD] = ?, [AD] = ?
-                     WHERE [ENT01] = ?
-                """, (row["kod"], row["aciklama"], row["key"]))
-
-        # 6) DELETE (API'de olmayanları sil)
-        for key in to_delete:
-            cur.execute("DELETE FROM [KR_CARI00] WHERE [ENT01] = ?", (key,))
+def _write_cols(spec: SyncSpec) -> List[str]:
+    # Yazılan kolonlar: eşlenen alanlar + scope sabitleri + (vekil anahtar) + içerik özeti
+    return spec.columns + list(spec.scope) + ([KEY_HASH_COLUMN] if spec.key_hash else []) + [HASH_COLUMN]
 
-        conn.commit()
-        msg = (f"ENT-07 senkron tamamlandı: "
-               f"eklenen {inserted}, güncellenen {len(to_update)}, silinen {len(to_delete)}.")
-        return (True, msg, inserted)
 
-    except Exception as e:
-        try:
-            conn.rollback()
-        except Exception:
-            pass
-        return (False, f"ENT-07 hata: {e}", 0)
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+def _match_cols(spec: SyncSpec) -> List[str]:
+    """DB satırının API satırıyla eşleştirildiği kolon(lar): vekil anahtar ya da doğal anahtar."""
+    return [KEY_HASH_COLUMN] if spec.key_hash else list(spec.keys)
 
 
+def _keyed(spec: SyncSpec, record: Tuple, key_idx: List[int], scope_vals: Tuple):
+    """
+    Kayıttan (eşleşme anahtarı, yazılacak params) üretir; anahtar boşsa (None, None).
+    İki tarafta aynı normalleştirme: anahtar parçaları as_text ile kırpılmış metin.
+    """
+    key = tuple(as_text(record[i]) for i in key_idx)
+    if not any(key):
+        return None, None
+    if spec.key_hash:
+        key = (_key_hash(key),)
+        return key, record + scope_vals + key + (_row_hash(record),)
+    return key, record + scope_vals + (_row_hash(record),)
 
-def ent08_update(rows: List[Dict]) -> Tuple[bool, str, int]:
 
+@reconnecting
+def _load_hashes(spec: SyncSpec) -> Tuple[bool, str, Dict[Tuple, str]]:
+    """DB'deki anahtar -> özet eşlemesini çeker (gerekirse [ENTHASH] kolonunu ekler)."""
     try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=False, timeout=10)
+        conn = _connect(autocommit=True)
     except Exception as e:
-        return (False, f"Veritabanı bağlantı hatası: {e}", 0)
+        return (False, f"Veritabanı bağlantı hatası: {e}", {})
 
     try:
         cur = conn.cursor()
-
-        # 1) DB'deki ENT01 kümesini çek (tüm kayıtlar)
-        cur.execute("SELECT [ENT01] FROM [KR_BOMU01E]")
-        db_keys = set()
-        for r in cur.fetchall():
-            if r[0] is not None:
-                db_keys.add(str(r[0]).strip())
-
-        # 2) API verisini normalize et
-        api_rows: List[Dict] = []
-        api_keys = set()
-        for it in rows or []:
-            key = str(it.get("key", "")).strip()
-            kod = str(it.get("kod", "")).strip()
-            aci = str(it.get("aciklama", "")).strip()
-            durum = str(it.get("durum", "")).strip()
-            mamulkey = str(it.get("mamulkey", "")).strip()
-            mamulmiktar = float(it.get("mamulmiktar") or 0)
-            mamulkod = str(it.get("mamulkod", "")).strip()
-            if not key:
-                continue
-            api_rows.append({"key": key, "kod": kod, "aciklama": aci, "durum": durum, "mamulkey": mamulkey, "mamulmiktar": mamulmiktar, "mamulkod": mamulkod})
-            api_keys.add(key)
-
-        # 3) fark kümeleri
-        to_insert = api_keys - db_keys
-        to_update = api_keys & db_keys
-        to_delete = db_keys - api_keys
-
-        # 4) INSERT
-        inserted = 0
-        for row in api_rows:
-            if row["key"] in to_insert:
-                cur.execute("""
-                    INSERT INTO [KR_BOMU01E] ([ENT01], [EVRAKNO], [ACIKLAMA], [AKTIF_PASIF], [ENT02], [MAMULMIKTAR], [MAMULCODE])
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (row["key"], row["kod"], row["aciklama"], row["durum"], row["mamulkey"], row["mamulmiktar"], row["mamulkod"]))
-                inserted += 1
-
-        # 5) UPDATE
-        # 5) UPDATE
-        for row in api_rows:
-            if row["key"] in to_update:
-                cur.execute("""
-                    UPDATE [KR_BOMU01E]
-                    SET [EVRAKNO] = ?, 
-                        [ACIKLAMA] = ?, 
-                        [AKTIF_PASIF] = ?, 
-                        [ENT02] = ?, 
-                        [MAMULMIKTAR] = ?, 
-                        [MAMULCODE] = ?
-                    WHERE [ENT01] = ?
-                """, (row["kod"], row["aciklama"], row["durum"], row["mamulkey"], row["mamulmiktar"], row["mamulkod"], row["key"]))
-                
-
-
-        # 6) DELETE (API'de olmayanları sil)
-        for key in to_delete:
-            cur.execute("DELETE FROM [KR_BOMU01E] WHERE [ENT01] = ?", (key,))
-
-        conn.commit()
-        msg = (f"ENT-08 senkron tamamlandı: "
-               f"eklenen {inserted}, güncellenen {len(to_update)}, silinen {len(to_delete)}.")
-        return (True, msg, inserted)
-
-    except Exception as e:
-        try:
-            conn.rollback()
-        except Exception:
-            pass
-        return (False, f"ENT-08 hata: {e}", 0)
+        _ensure_hash_column(cur, spec.table)
+        db_hashes: Dict[Tuple, str] = {}
+        with stage("key_fetch"):
+            cur.execute(f"SELECT {_cols_sql(_match_cols(spec))}, [{HASH_COLUMN}] FROM [{spec.table}] t "
+                        f"WHERE 1 = 1{_scope_sql(spec)}", *spec.scope.values())
+            for r in cur.fetchall():
+                key = tuple(as_text(v) for v in r[:-1])
+                if any(key):
+                    db_hashes[key] = r[-1]
+        return (True, "", db_hashes)
+    except Exception as e:
+        return (False, f"{spec.code} hata: {e}", {})
     finally:
         try:
             conn.close()
@@ -752,122 +684,42 @@ def ent08_update(rows: List[Dict]) -> Tuple[bool, str, int]:
             pass
 
 
-
-
-
-def ent09_update(rows: List[Dict]) -> Tuple[bool, str, int]:
+@reconnecting
+def _apply_diff(spec: SyncSpec, to_insert: List[Tuple], to_update: List[Tuple],
+                to_delete: List[Tuple]) -> Tuple[bool, str, int]:
+    """Hesaplanmış fark kümelerini tek transaction içinde yazar."""
     try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=False, timeout=10)
+        conn = _connect(autocommit=False)
     except Exception as e:
         return (False, f"Veritabanı bağlantı hatası: {e}", 0)
 
+    key_cols = _match_cols(spec)
+    scope_vals = tuple(spec.scope.values())
+    scope_sql = _scope_sql(spec)
+    write_cols = _write_cols(spec)
+    set_cols = [c for c in write_cols if c not in key_cols]
+
     try:
         cur = conn.cursor()
-
-        # 1) Mevcut veriyi çek (ENT01+ENT02+ENT03+ENT04+ENT05 birleşimi)
-        cur.execute("SELECT [ENT01], [ENT02], [ENT03], [ENT04], [ENT05] FROM [KR_BOMU01T]")
-        db_keys = set()
-        for r in cur.fetchall():
-            key_combo = f"{r[0]}|{r[1]}|{r[2]}|{r[3]}|{r[4]}"
-            db_keys.add(key_combo)
-
-        # 2) API verisini normalize et
-        api_rows: List[Dict] = []
-        api_keys = set()
-
-        for it in rows or []:
-            ent01 = str(it.get("evraknokey", "")).strip()
-            ent02 = str(it.get("bomreccodekey", "")).strip()
-            ent03 = str(it.get("bomreckaynakcodekey", "")).strip()
-            ent04 = str(it.get("bomrecoperasyonkey", "")).strip()
-            ent05 = str(it.get("tuketimtezgahkey", "")).strip()
-
-            composite_key = f"{ent01}|{ent02}|{ent03}|{ent04}|{ent05}"
-            api_keys.add(composite_key)
-
-            api_rows.append({
-                "ent01": ent01,
-                "evrakno": str(it.get("evrakno", "")).strip(),
-                "durum": str(it.get("durum", "")).strip(),
-                "ent02": ent02,
-                "bomreccode": str(it.get("bomreccode", "")).strip(),
-                "bomrecinputtype": str(it.get("bomrecinputtype", "")).strip(),
-                "ent03": ent03,
-                "bomreckaynakcode": str(it.get("bomreckaynakcode", "")).strip(),
-                "bomrecmamulmiktar": float(it.get("bomrecmamulmiktar") or 0),
-                "bomreckaynak0": str(it.get("bomreckaynak0", "")).strip(),
-                "ent04": ent04,
-                "bomrecoperasyon": str(it.get("bomrecoperasyon", "")).strip(),
-                "ent05": ent05,
-                "tuketimtezgah": str(it.get("tuketimtezgah", "")).strip(),
-                "composite_key": composite_key
-            })
-
-        # 3) fark kümeleri
-        to_insert = api_keys - db_keys
-        to_update = api_keys & db_keys
-        to_delete = db_keys - api_keys
-
-        inserted = 0
-
-        # 4) INSERT
-        for row in api_rows:
-            if row["composite_key"] in to_insert:
-                cur.execute("""
-                    INSERT INTO [KR_BOMU01T]
-                    ([ENT01], [EVRAKNO], [AKTIF_PASIF], [ENT02], [BOMREC_CODE], [BOMREC_INPUTTYPE],
-                     [ENT03], [BOMREC_KAYNAKCODE], [BOMREC_MAMULMIKTAR], [BOMREC_KAYNAK0],
-                     [ENT04], [BOMREC_OPERASYON], [ENT05], [REFTEXT01])
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    row["ent01"], row["evrakno"], row["durum"], row["ent02"], row["bomreccode"],
-                    row["bomrecinputtype"], row["ent03"], row["bomreckaynakcode"],
-                    row["bomrecmamulmiktar"], row["bomreckaynak0"], row["ent04"],
-                    row["bomrecoperasyon"], row["ent05"], row["tuketimtezgah"]
-                ))
-                inserted += 1
-
-        # 5) UPDATE
-        for row in api_rows:
-            if row["composite_key"] in to_update:
-                cur.execute("""
-                    UPDATE [KR_BOMU01T]
-                    SET [EVRAKNO] = ?, 
-                        [AKTIF_PASIF] = ?, 
-                        [BOMREC_CODE] = ?, 
-                        [BOMREC_INPUTTYPE] = ?, 
-                        [BOMREC_KAYNAKCODE] = ?, 
-                        [BOMREC_MAMULMIKTAR] = ?, 
-                        [BOMREC_KAYNAK0] = ?, 
-                        [BOMREC_OPERASYON] = ?, 
-                        [REFTEXT01] = ?
-                    WHERE [ENT01] = ? AND [ENT02] = ? AND [ENT03] = ? AND [ENT04] = ? AND [ENT05] = ?
-                """, (
-                    row["evrakno"], row["durum"], row["bomreccode"], row["bomrecinputtype"],
-                    row["bomreckaynakcode"], row["bomrecmamulmiktar"], row["bomreckaynak0"],
-                    row["bomrecoperasyon"], row["tuketimtezgah"],
-                    row["ent01"], row["ent02"], row["ent03"], row["ent04"], row["ent05"]
-                ))
-
-        # 6) DELETE
-        for composite_key in to_delete:
-            ent01, ent02, ent03, ent04, ent05 = composite_key.split("|")
-            cur.execute("""
-                DELETE FROM [KR_BOMU01T]
-                WHERE [ENT01] = ? AND [ENT02] = ? AND [ENT03] = ? AND [ENT04] = ? AND [ENT05] = ?
-            """, (ent01, ent02, ent03, ent04, ent05))
-
-        conn.commit()
-        msg = (f"ENT-09 senkron tamamlandı: eklenen {inserted}, güncellenen {len(to_update)}, silinen {len(to_delete)}.")
-        return (True, msg, inserted)
+        with stage("insert"):
+            inserted = _bulk_insert(cur, spec.table, write_cols, to_insert)
+        with stage("update"):
+            _bulk_update(cur, spec.table, key_cols, set_cols, to_update, scope_sql, scope_vals)
+        with stage("delete"):
+            _bulk_delete(cur, spec.table, key_cols, to_delete, scope_sql, scope_vals)
+        progress.checkpoint()   # iptal için son nokta; sonrası kalıcıdır
+        with stage("commit"):
+            conn.commit()
+        return (True, "", inserted)
 
     except Exception as e:
         try:
             conn.rollback()
         except Exception:
             pass
-        return (False, f"ENT-09 hata: {e}", 0)
-
+        if isinstance(e, Cancelled):
+            raise
+        return (False, f"{spec.code} hata: {e}", 0)
     finally:
         try:
             conn.close()
@@ -875,242 +727,210 @@ def ent09_update(rows: List[Dict]) -> Tuple[bool, str, int]:
             pass
 
 
+def sync_records(spec: SyncSpec, records: Iterable[Tuple], delete_missing: bool = True) -> Tuple[bool, str, int]:
+    """
+    spec (bkz. sync_specs) tanımına göre normalize edilmiş kayıtları (spec.normalize /
+    row_codec.decode_records çıktısı) hedef tabloya senkronize eder:
+      API'de olup DB'de olmayanlar INSERT, özeti değişenler UPDATE, DB'de olup API'de olmayanlar DELETE.
+    records liste ya da üreteç olabilir; tek geçişte tüketilir. Kopan bağlantıda yeniden deneme
+    yalnızca DB okuma/yazma adımlarında yapılır, kayıtlar ikinci kez okunmaz.
+    delete_missing=False (delta senkron): kayıtlar tablonun yalnızca bir kısmıdır, silme yapılmaz.
+    Fark hesabı yeri data.json "sync": {"diff": "client" | "server"} ile seçilir (bkz. diff_mode).
+    Dönüş: (ok, mesaj, yeni_eklenen_kayit_sayisi)
+    """
+    _check_schema_once(spec)
+    if diff_mode() == "server":
+        return _sync_server_diff(spec, records, delete_missing)
+
+    # 1) DB'deki anahtar -> özet eşlemesi
+    ok, msg, db_hashes = _load_hashes(spec)
+    if not ok:
+        return (False, msg, 0)
+
+    write_cols = _write_cols(spec)
+    match_cols = _match_cols(spec)
+    key_idx = [write_cols.index(k) for k in spec.keys]
+    match_idx = [write_cols.index(k) for k in match_cols]
+    set_idx = [i for i, c in enumerate(write_cols) if c not in match_cols]
+    scope_vals = tuple(spec.scope.values())
+
+    # 2) Kayıtları akış halinde sınıflandır (anahtarı boş satırlar atlanır).
+    #    Bellekte yalnızca görülen anahtarlar ve yazılacak (yeni/değişen) satırlar tutulur;
+    #    aynı anahtar tekrar gelirse son satır geçerlidir.
+    seen: set = set()
+    inserts: Dict[Tuple, Tuple] = {}
+    updates: Dict[Tuple, Tuple] = {}
+    try:
+        # records üreteçse okuma/çözümleme süresi decode aşamasında sayılır, diff'ten düşülür
+        with stage("diff", exclude=("decode", "http")):
+            for record in records:
+                key, params = _keyed(spec, record, key_idx, scope_vals)
+                if key is None:
+                    continue
+                seen.add(key)
+                inserts.pop(key, None)
+                updates.pop(key, None)
+                # [ENTHASH] yeni eklenmiş satırlarda NULL'dur: satır vardır, özeti farklı sayılır
+                if key not in db_hashes:
+                    inserts[key] = params
+                elif db_hashes[key] != params[-1]:
+                    updates[key] = tuple(params[i] for i in match_idx) + tuple(params[i] for i in set_idx)
+
+            # 3) fark kümeleri
+            to_insert: List[Tuple] = list(inserts.values())
+            to_update: List[Tuple] = list(updates.values())
+            unchanged = len(seen) - len(to_insert) - len(to_update)
+            to_delete = [key for key in db_hashes if key not in seen] if delete_missing else []
+    except Cancelled:
+        raise
+    except Exception as e:
+        return (False, f"{spec.code} hata: {e}", 0)
+    del inserts, updates, seen, db_hashes
+    progress.set_totals(len(to_insert), len(to_update), len(to_delete))
+
+    # 4) INSERT / UPDATE / DELETE
+    ok, msg, inserted = _apply_diff(spec, to_insert, to_update, to_delete)
+    if not ok:
+        return (False, msg, 0)
+    _count_result(inserted, len(to_update), unchanged, len(to_delete))
+    label = "senkron" if delete_missing else "delta senkron"
+    msg = (f"{spec.code} {label} tamamlandı: "
+           f"eklenen {inserted}, güncellenen {len(to_update)}, değişmeyen {unchanged}, silinen {len(to_delete)}.")
+    return (True, msg, inserted)
+
+
+def _count_result(inserted: int, updated: int, unchanged: int, deleted: int) -> None:
+    """Senkron sonucunu çalışma geçmişine (run_history) bırakır."""
+    count("inserted", inserted)
+    count("updated", updated)
+    count("unchanged", unchanged)
+    count("deleted", deleted)
+
+
+# ---------------------------------------------------------------
+# Sunucu tarafı fark hesabı
+# Tablodaki tüm anahtar/özetleri WAN üzerinden çekmek yerine API anahtar + özet listesi
+# #temp tabloya toplu yüklenir; yeni/değişen anahtarlar JOIN ile sunucuda bulunur,
+# silinecekler doğrudan sunucuda silinir. Geriye yalnızca gereken anahtarlar döner.
+# ---------------------------------------------------------------
+def diff_mode() -> str:
+    """data.json'daki isteğe bağlı "sync": {"diff": "client" | "server"} ayarı (varsayılan client)."""
+    try:
+        mode = str((CONFIG.data.get("sync") or {}).get("diff", "client")).lower()
+    except (FileNotFoundError, AttributeError):
+        mode = "client"
+    return mode if mode in ("client", "server") else "client"
+
+
+def _sync_server_diff(spec: SyncSpec, records: Iterable[Tuple], delete_missing: bool) -> Tuple[bool, str, int]:
+    """
+    sync_records'ın sunucu tarafı fark hesaplı hali. API kayıtları anahtara göre
+    tekilleştirilip bellekte tutulur (yalnızca gereken satırlar yazılır).
+    """
+    write_cols = _write_cols(spec)
+    key_idx = [write_cols.index(k) for k in spec.keys]
+    scope_vals = tuple(spec.scope.values())
 
-
-def ent10_update(rows: List[Dict]) -> Tuple[bool, str, int]:
+    api_rows: Dict[Tuple, Tuple] = {}
     try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=False, timeout=10)
+        with stage("diff", exclude=("decode", "http")):
+            for record in records:
+                key, params = _keyed(spec, record, key_idx, scope_vals)
+                if key is not None:
+                    api_rows[key] = params
+    except Cancelled:
+        raise
     except Exception as e:
-        return (False, f"Veritabanı bağlantı hatası: {e}", 0)
+        return (False, f"{spec.code} hata: {e}", 0)
 
-    try:
-        cur = conn.cursor()
-
-        # 1) DB'deki mevcut ENT01 kayıtlarını çek
-        cur.execute("SELECT [ENT01] FROM [KR_STOK40E]")
-        db_keys = set()
-        for r in cur.fetchall():
-            if r[0] is not None:
-                db_keys.add(str(r[0]).strip())
-
-        # 2) API verisini normalize et
-        api_rows: List[Dict] = []
-        api_keys = set()
-
-        for it in rows or []:
-            key = str(it.get("key", "")).strip()
-            kod = str(it.get("kod", "")).strip()                  # fisno -> EVRAKNO
-            tarih = str(it.get("tarih", "")).strip()              # tarih -> TARIH
-            saat = str(it.get("saat", "")).strip()                # saat -> ISLEM_SAATI
-            a1 = str(it.get("a1", "")).strip()                    # aciklama1 -> SIPLEILGILINOTLAR_1
-            a2 = str(it.get("a2", "")).strip()                    # aciklama2 -> SIPLEILGILINOTLAR_2
-            a3 = str(it.get("a3", "")).strip()                    # aciklama3 -> SIPLEILGILINOTLAR_3
-            keycari = str(it.get("keycari", "")).strip()          # _key_scf_carikart -> ENT02
-            carikod = str(it.get("carikod", "")).strip()          # carikartkodu -> MUSTERIKODU
-
-            if not key:
-                continue
+    ok, msg, counts = _apply_server_diff(spec, api_rows, delete_missing)
+    if not ok:
+        return (False, msg, 0)
+    inserted, updated, deleted = counts
+    _count_result(inserted, updated, len(api_rows) - inserted - updated, deleted)
+    label = "senkron" if delete_missing else "delta senkron"
+    msg = (f"{spec.code} {label} tamamlandı: "
+           f"eklenen {inserted}, güncellenen {updated}, değişmeyen {len(api_rows) - inserted - updated}, "
+           f"silinen {deleted}.")
+    return (True, msg, inserted)
 
-            api_rows.append({
-                "key": key,
-                "kod": kod,
-                "tarih": tarih,
-                "saat": saat,
-                "a1": a1,
-                "a2": a2,
-                "a3": a3,
-                "keycari": keycari,
-                "carikod": carikod
-            })
-            api_keys.add(key)
-
-        # 3) Farkları bul
-        to_insert = api_keys - db_keys
-        to_update = api_keys & db_keys
-        to_delete = db_keys - api_keys
-
-        inserted = 0
-
-        # 4) Yeni kayıt ekleme
-        for row in api_rows:
-            if row["key"] in to_insert:
-                cur.execute("""
-                    INSERT INTO [KR_STOK40E]
-                        ([ENT01], [EVRAKNO], [TARIH], [ISLEM_SAATI],
-                         [SIPLEILGILINOTLAR_1], [SIPLEILGILINOTLAR_2], [SIPLEILGILINOTLAR_3],
-                         [ENT02], [MUSTERIKODU])
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    row["key"], row["kod"], row["tarih"], row["saat"],
-                    row["a1"], row["a2"], row["a3"], row["keycari"], row["carikod"]
-                ))
-                inserted += 1
-
-        # 5) Güncelleme
-        for row in api_rows:
-            if row["key"] in to_update:
-                cur.execute("""
-                    UPDATE [KR_STOK40E]
-                       SET [EVRAKNO] = ?, [TARIH] = ?, [ISLEM_SAATI] = ?,
-                           [SIPLEILGILINOTLAR_1] = ?, [SIPLEILGILINOTLAR_2] = ?, [SIPLEILGILINOTLAR_3] = ?,
-                           [ENT02] = ?, [MUSTERIKODU] = ?
-                     WHERE [ENT01] = ?
-                """, (
-                    row["kod"], row["tarih"], row["saat"],
-                    row["a1"], row["a2"], row["a3"],
-                    row["keycari"], row["carikod"], row["key"]
-                ))
-
-        # 6) Silme
-        for key in to_delete:
-            cur.execute("DELETE FROM [KR_STOK40E] WHERE [ENT01] = ?", (key,))
-
-        # 7) Commit
-        conn.commit()
-        msg = (f"ENT-10 senkron tamamlandı: "
-               f"eklenen {inserted}, güncellenen {len(to_update)}, silinen {len(to_delete)}.")
-        return (True, msg, inserted)
-
-    except Exception as e:
-        try:
-            conn.rollback()
-        except Exception:
-            pass
-        return (False, f"ENT-10 hata: {e}", 0)
-
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
-
-
-
-
-def ent11_update(rows: List[Dict]) -> Tuple[bool, str, int]:
-    """
-    KR_STOK40T tablosunu API'den gelen satırlarla senkronize eder.
-    Alanlar: ENT01, ENT02, EVRAKNO, TARIH, ENT03, KOD, NOTES, OR_FIYAT, PRICEUNIT, 
-             OR_TUTAR, SF_MIKTAR, ENT04, ENT05, SF_SF_UNIT, SF_STOK_MIKTAR, RTESTARIH
-    """
 
+@reconnecting
+def _apply_server_diff(spec: SyncSpec, api_rows: Dict[Tuple, Tuple],
+                       delete_missing: bool) -> Tuple[bool, str, Tuple[int, int, int]]:
+    """Tek transaction: anahtar/özet yükle -> yeni/değişenleri bul -> sil -> yaz. Dönüş sayıları: (eklenen, güncellenen, silinen)."""
     try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=False, timeout=10)
+        conn = _connect(autocommit=False)
     except Exception as e:
-        return (False, f"Veritabanı bağlantı hatası: {e}", 0)
+        return (False, f"Veritabanı bağlantı hatası: {e}", (0, 0, 0))
+
+    table = spec.table
+    key_cols = _match_cols(spec)
+    scope_vals = tuple(spec.scope.values())
+    scope_sql = _scope_sql(spec)
+    write_cols = _write_cols(spec)
+    key_idx = [write_cols.index(k) for k in key_cols]
+    set_idx = [i for i, c in enumerate(write_cols) if c not in key_cols]
+    set_cols = [write_cols[i] for i in set_idx]
 
     try:
         cur = conn.cursor()
-
-        # 1️⃣ Mevcut kayıtları al (ENT01 anahtar)
-        cur.execute("SELECT [ENT01] FROM [KR_STOK40T]")
-        db_keys = set()
-        for r in cur.fetchall():
-            if r[0] is not None:
-                db_keys.add(str(r[0]).strip())
-
-        # 2️⃣ API verisini normalize et
-        api_rows: List[Dict] = []
-        api_keys = set()
-
-        for it in rows or []:
-            satirkey = str(it.get("satirkey", "")).strip()
-            evraknokey = str(it.get("evraknokey", "")).strip()
-            evrakno = str(it.get("evrakno", "")).strip()
-            tarih = str(it.get("tarih", "")).strip()
-            kodkey = str(it.get("kodkey", "")).strip()
-            kod = str(it.get("kod", "")).strip()
-            notes = str(it.get("notes", "")).strip()
-            orfiyat = str(it.get("orfiyat", "")).strip()
-            priceunit = str(it.get("priceunit", "")).strip()
-            ortutar = str(it.get("ortutar", "")).strip()
-            sfmiktar = str(it.get("sfmiktar", "")).strip()
-            sfsfunitkey = str(it.get("sfsfunitkey", "")).strip()
-            sistembirimkey = str(it.get("sistembirimkey", "")).strip()
-            sfsfunit = str(it.get("sfsfunit", "")).strip()
-            sfstokmiktar = str(it.get("sfstokmiktar", "")).strip()
-            rtestarih = str(it.get("rtestarih", "")).strip()
-
-            if not satirkey:
-                continue
-
-            api_rows.append({
-                "satirkey": satirkey,
-                "evraknokey": evraknokey,
-                "evrakno": evrakno,
-                "tarih": tarih,
-                "kodkey": kodkey,
-                "kod": kod,
-                "notes": notes,
-                "orfiyat": orfiyat,
-                "priceunit": priceunit,
-                "ortutar": ortutar,
-                "sfmiktar": sfmiktar,
-                "sfsfunitkey": sfsfunitkey,
-                "sistembirimkey": sistembirimkey,
-                "sfsfunit": sfsfunit,
-                "sfstokmiktar": sfstokmiktar,
-                "rtestarih": rtestarih
-            })
-            api_keys.add(satirkey)
-
-        # 3️⃣ Değişiklik kümelerini oluştur
-        to_insert = api_keys - db_keys
-        to_update = api_keys & db_keys
-        to_delete = db_keys - api_keys
-
-        inserted = 0
-
-        # 4️⃣ Yeni kayıt ekleme
-        for row in api_rows:
-            if row["satirkey"] in to_insert:
-                cur.execute("""
-                    INSERT INTO [KR_STOK40T] 
-                        ([ENT01], [ENT02], [EVRAKNO], [TARIH], [ENT03], [KOD],
-                         [NOTES], [OR_FIYAT], [PRICEUNIT], [OR_TUTAR], [SF_MIKTAR],
-                         [ENT04], [ENT05], [SF_SF_UNIT], [SF_STOK_MIKTAR], [RTESTARIH])
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    row["satirkey"], row["evraknokey"], row["evrakno"], row["tarih"],
-                    row["kodkey"], row["kod"], row["notes"], row["orfiyat"], row["priceunit"],
-                    row["ortutar"], row["sfmiktar"], row["sfsfunitkey"], row["sistembirimkey"],
-                    row["sfsfunit"], row["sfstokmiktar"], row["rtestarih"]
-                ))
-                inserted += 1
-
-        # 5️⃣ Güncelleme
-        for row in api_rows:
-            if row["satirkey"] in to_update:
-                cur.execute("""
-                    UPDATE [KR_STOK40T]
-                       SET [ENT02] = ?, [EVRAKNO] = ?, [TARIH] = ?, [ENT03] = ?, [KOD] = ?,
-                           [NOTES] = ?, [OR_FIYAT] = ?, [PRICEUNIT] = ?, [OR_TUTAR] = ?, [SF_MIKTAR] = ?,
-                           [ENT04] = ?, [ENT05] = ?, [SF_SF_UNIT] = ?, [SF_STOK_MIKTAR] = ?, [RTESTARIH] = ?
-                     WHERE [ENT01] = ?
-                """, (
-                    row["evraknokey"], row["evrakno"], row["tarih"], row["kodkey"], row["kod"],
-                    row["notes"], row["orfiyat"], row["priceunit"], row["ortutar"], row["sfmiktar"],
-                    row["sfsfunitkey"], row["sistembirimkey"], row["sfsfunit"], row["sfstokmiktar"],
-                    row["rtestarih"], row["satirkey"]
-                ))
-
-        # 6️⃣ Silme
-        for key in to_delete:
-            cur.execute("DELETE FROM [KR_STOK40T] WHERE [ENT01] = ?", (key,))
-
-        # 7️⃣ Commit
-        conn.commit()
-        msg = (f"ENT-11 senkron tamamlandı: "
-               f"eklenen {inserted}, güncellenen {len(to_update)}, silinen {len(to_delete)}.")
-        return (True, msg, inserted)
+        _ensure_hash_column(cur, table)
+
+        # 1) API anahtar + özetlerini oturuma özel tabloya yükle
+        with stage("key_fetch"):
+            stg = _load_staging(cur, table, key_cols + [HASH_COLUMN],
+                                [key + (params[-1],) for key, params in api_rows.items()])
+        match = " AND ".join(f"t.[{k}] = s.[{k}]" for k in key_cols)
+
+        # 2) yeni (eşleşmeyen) ve özeti değişen anahtarlar
+        with stage("diff"):
+            cur.execute(f"""
+                SELECT {_cols_sql(key_cols, 's')}, CASE WHEN t.[{key_cols[0]}] IS NULL THEN 1 ELSE 0 END
+                  FROM {stg} s
+                  LEFT JOIN [{table}] t ON {match}{scope_sql}
+                 WHERE t.[{key_cols[0]}] IS NULL OR t.[{HASH_COLUMN}] IS NULL OR t.[{HASH_COLUMN}] <> s.[{HASH_COLUMN}]
+            """, *scope_vals)
+            new_keys, changed_keys = set(), set()
+            for r in cur.fetchall():
+                (new_keys if r[-1] else changed_keys).add(tuple(as_text(v) for v in r[:-1]))
+
+        # 3) API'de olmayanları sunucuda sil (anahtarı boş satırlara dokunulmaz)
+        deleted = 0
+        if delete_missing:
+            not_empty = " OR ".join(f"ISNULL(t.[{k}], '') <> ''" for k in key_cols)
+            with stage("delete"):
+                cur.execute(f"""
+                    DELETE t FROM [{table}] t
+                     WHERE ({not_empty}){scope_sql}
+                       AND NOT EXISTS (SELECT 1 FROM {stg} s WHERE {match})
+                """, *scope_vals)
+                deleted = max(cur.rowcount, 0)
+        cur.execute(f"DROP TABLE {stg};")
+        progress.set_totals(len(new_keys), len(changed_keys), deleted)
+        progress.advance("deleted", deleted)
+
+        # 4) yalnızca gereken satırları yaz
+        with stage("insert"):
+            inserted = _bulk_insert(cur, table, write_cols, [api_rows[k] for k in new_keys])
+        to_update = [tuple(api_rows[k][i] for i in key_idx) + tuple(api_rows[k][i] for i in set_idx)
+                     for k in changed_keys]
+        with stage("update"):
+            _bulk_update(cur, table, key_cols, set_cols, to_update, scope_sql, scope_vals)
+
+        progress.checkpoint()   # iptal için son nokta; sonrası kalıcıdır
+        with stage("commit"):
+            conn.commit()
+        return (True, "", (inserted, len(to_update), deleted))
 
     except Exception as e:
         try:
             conn.rollback()
         except Exception:
             pass
-        return (False, f"ENT-11 hata: {e}", 0)
-
+        if isinstance(e, Cancelled):
+            raise
+        return (False, f"{spec.code} hata: {e}", (0, 0, 0))
     finally:
         try:
             conn.close()
@@ -1118,103 +938,9 @@ def ent11_update(rows: List[Dict]) -> Tuple[bool, str, int]:
             pass
 
 
-def ent12_update(rows: List[Dict]) -> Tuple[bool, str, int]:
+def sync_rows(spec: SyncSpec, rows: Iterable[Dict], delete_missing: bool = True) -> Tuple[bool, str, int]:
     """
-    KR_STOK00 tablosunu API'den gelen stok kart verileriyle senkronize eder.
-    Alanlar: ENT01, KOD, AD, ENT02, ENT03, IUNIT
+    API satırlarını (dict; liste ya da report_stream üreteci) spec.normalize ile kayda
+    çevirip sync_records'a verir.
     """
-
-    try:
-        conn = pyodbc.connect(_load_conn_string(), autocommit=False, timeout=10)
-    except Exception as e:
-        return (False, f"Veritabanı bağlantı hatası: {e}", 0)
-
-    try:
-        cur = conn.cursor()
-
-        # 1️⃣ Mevcut ENT01 kayıtlarını al
-        cur.execute("SELECT [ENT01] FROM [KR_STOK00]")
-        db_keys = set()
-        for r in cur.fetchall():
-            if r[0] is not None:
-                db_keys.add(str(r[0]).strip())
-
-        # 2️⃣ API verisini normalize et
-        api_rows: List[Dict] = []
-        api_keys = set()
-
-        for it in rows or []:
-            kodkey = str(it.get("kodkey", "")).strip()
-            kod = str(it.get("kod", "")).strip()
-            ad = str(it.get("ad", "")).strip()
-            iunitstokkey = str(it.get("iunitstokkey", "")).strip()
-            iunitsistemkey = str(it.get("iunitsistemkey", "")).strip()
-            iunit = str(it.get("iunit", "")).strip()
-
-            if not kodkey:
-                continue
-
-            api_rows.append({
-                "kodkey": kodkey,
-                "kod": kod,
-                "ad": ad,
-                "iunitstokkey": iunitstokkey,
-                "iunitsistemkey": iunitsistemkey,
-                "iunit": iunit
-            })
-            api_keys.add(kodkey)
-
-        # 3️⃣ Fark kümelerini oluştur
-        to_insert = api_keys - db_keys
-        to_update = api_keys & db_keys
-        to_delete = db_keys - api_keys
-
-        inserted = 0
-
-        # 4️⃣ Yeni kayıt ekleme
-        for row in api_rows:
-            if row["kodkey"] in to_insert:
-                cur.execute("""
-                    INSERT INTO [KR_STOK00]
-                        ([ENT01], [KOD], [AD], [ENT02], [ENT03], [IUNIT])
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    row["kodkey"], row["kod"], row["ad"],
-                    row["iunitstokkey"], row["iunitsistemkey"], row["iunit"]
-                ))
-                inserted += 1
-
-        # 5️⃣ Güncelleme
-        for row in api_rows:
-            if row["kodkey"] in to_update:
-                cur.execute("""
-                    UPDATE [KR_STOK00]
-                       SET [KOD] = ?, [AD] = ?, [ENT02] = ?, [ENT03] = ?, [IUNIT] = ?
-                     WHERE [ENT01] = ?
-                """, (
-                    row["kod"], row["ad"], row["iunitstokkey"],
-                    row["iunitsistemkey"], row["iunit"], row["kodkey"]
-                ))
-
-        # 6️⃣ Silme
-        for key in to_delete:
-            cur.execute("DELETE FROM [KR_STOK00] WHERE [ENT01] = ?", (key,))
-
-        # 7️⃣ Commit
-        conn.commit()
-        msg = (f"ENT-12 senkron tamamlandı: "
-               f"eklenen {inserted}, güncellenen {len(to_update)}, silinen {len(to_delete)}.")
-        return (True, msg, inserted)
-
-    except Exception as e:
-        try:
-            conn.rollback()
-        except Exception:
-            pass
-        return (False, f"ENT-12 hata: {e}", 0)
-
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+    return sync_records(spec, map(spec.normalize, rows or ()), delete_missing)
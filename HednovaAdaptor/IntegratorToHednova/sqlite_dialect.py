@@ -0,0 +1,233 @@
+# sqlite_dialect.py
+# -*- coding: utf-8 -*-
+"""
+Senkron motorunu SQL Server olmadan çalıştırmak (benchmark / çevrimdışı deneme) için
+pyodbc benzeri SQLite bağlantısı. sql_crud'un ürettiği T-SQL alt kümesi SQLite'a çevrilir:
+  #temp tablolar (SELECT TOP 0 ... INTO), UPDATE/DELETE ... JOIN, IF COL_LENGTH(...) ALTER,
+  ISNULL, NONCLUSTERED/INCLUDE indeksler ve sys.indexes sorgusu.
+Bağlantı cümlesi "sqlite:///<dosya yolu>" biçimindedir (bkz. sql_crud._odbc_connect).
+Her execute/executemany çağrısı bir sunucu gidiş-dönüşü sayılır (fast_executemany'de
+bir parça tek seferde gönderildiği için executemany de bir sayılır).
+"""
+
+import re
+import sqlite3
+import threading
+from typing import Any, List, Optional, Sequence, Tuple
+
+PREFIX = "sqlite:///"
+
+_trips = 0
+_trips_lock = threading.Lock()
+
+
+def is_sqlite(conn_str: str) -> bool:
+    return conn_str.strip().lower().startswith(PREFIX)
+
+
+def round_trips(reset: bool = False) -> int:
+    """Süreç içindeki toplam gidiş-dönüş sayısı (reset=True ise sıfırlanır)."""
+    global _trips
+    with _trips_lock:
+        n = _trips
+        if reset:
+            _trips = 0
+        return n
+
+
+def _trip() -> None:
+    global _trips
+    with _trips_lock:
+        _trips += 1
+
+
+# ---------------------------
+# T-SQL -> SQLite çevirisi
+# ---------------------------
+_RX_ADD_COLUMN = re.compile(
+    r"IF\s+COL_LENGTH\('(\w+)',\s*'(\w+)'\)\s+IS\s+NULL\s+ALTER\s+TABLE\s+\[\w+\]\s+ADD\s+\[\w+\]\s+(.+?);?\s*$",
+    re.I | re.S)
+_RX_DROP_TEMP = re.compile(r"IF\s+OBJECT_ID\('tempdb\.\.#(\w+)'\)\s+IS\s+NOT\s+NULL\s+DROP\s+TABLE\s+#\w+;?", re.I)
+_RX_SELECT_INTO = re.compile(r"SELECT\s+TOP\s+0\s+(.+?)\s+INTO\s+#(\w+)\s+FROM\s+(\[\w+\]);?", re.I | re.S)
+_RX_UPDATE_JOIN = re.compile(
+    r"UPDATE\s+t\s+SET\s+(.+?)\s+FROM\s+(\[\w+\])\s+t\s+INNER\s+JOIN\s+(\S+)\s+s\s+ON\s+(.+?)(?:\s+WHERE\s+(.+?))?\s*;?\s*$",
+    re.I | re.S)
+_RX_UPDATE_WHERE = re.compile(r"UPDATE\s+t\s+SET\s+(.+?)\s+FROM\s+(\[\w+\])\s+t\s+WHERE\s+(.+?);?\s*$", re.I | re.S)
+_RX_DELETE_JOIN = re.compile(
+    r"DELETE\s+t\s+FROM\s+(\[\w+\])\s+t\s+INNER\s+JOIN\s+(\S+)\s+s\s+ON\s+(.+?)\s*;?\s*$", re.I | re.S)
+_RX_DELETE_WHERE = re.compile(r"DELETE\s+t\s+FROM\s+(\[\w+\])\s+t\s+WHERE\s+", re.I)
+_RX_INDEX = re.compile(r"CREATE\s+NONCLUSTERED\s+INDEX\s+(.+?)\s+INCLUDE\s*\(.*?\)\s*;?\s*$", re.I | re.S)
+_RX_SET_TARGET = re.compile(r"\bt\.(\[\w+\])\s*=")
+
+
+def _temp_names(sql: str) -> str:
+    return re.sub(r"#(\w+)", r"temp.[\1]", sql)
+
+
+def _set_targets(sets: str) -> str:
+    """SQLite UPDATE'te SET hedefi takma adla yazılamaz: 't.[A] = s.[A]' -> '[A] = s.[A]'."""
+    return _RX_SET_TARGET.sub(r"\1 =", sets)
+
+
+def _split_on(on_where: str) -> Tuple[str, str]:
+    """'t.[A] = s.[A] AND t.[B] = ?' -> (s'li eşleşme koşulları, geri kalan t filtresi)."""
+    parts = re.split(r"\s+AND\s+", on_where.strip(), flags=re.I)
+    on = [p for p in parts if re.search(r"\bs\.\[", p)]
+    rest = [p for p in parts if p not in on]
+    return " AND ".join(on), " AND ".join(rest)
+
+
+def translate(sql: str) -> Optional[str]:
+    """
+    T-SQL cümlesini SQLite'a çevirir; birden çok adım gerekenler (COL_LENGTH, SELECT ... INTO #temp,
+    sys.indexes) için None döner (bkz. Cursor._special).
+    """
+    text = sql.strip()
+    if _RX_ADD_COLUMN.match(text) or _RX_SELECT_INTO.match(text) or "sys.indexes" in text:
+        return None
+    m = _RX_DROP_TEMP.match(text)
+    if m:
+        return f"DROP TABLE IF EXISTS temp.[{m.group(1)}]"
+    m = _RX_UPDATE_JOIN.match(text)
+    if m:
+        sets, table, stg, on, where = m.groups()
+        on, extra = _split_on(on)
+        cond = " AND ".join(c for c in (on, extra, where) if c)
+        text = f"UPDATE {table} AS t SET {_set_targets(sets)} FROM {stg} s WHERE {cond}"
+    else:
+        m = _RX_UPDATE_WHERE.match(text)
+        if m:
+            sets, table, where = m.groups()
+            text = f"UPDATE {table} AS t SET {_set_targets(sets)} WHERE {where}"
+    m = _RX_DELETE_JOIN.match(text)
+    if m:
+        table, stg, on = m.groups()
+        on, extra = _split_on(on)
+        # Eşleşen satırlar JOIN ile bulunur (staging dış döngüde, hedef tablo indeksle aranır)
+        cond = " AND ".join(c for c in (on, extra) if c)
+        text = f"DELETE FROM {table} WHERE rowid IN (SELECT t.rowid FROM {stg} s JOIN {table} t ON {cond})"
+    else:
+        text = _RX_DELETE_WHERE.sub(lambda mm: f"DELETE FROM {mm.group(1)} AS t WHERE ", text)
+    m = _RX_INDEX.match(text)
+    if m:
+        text = f"CREATE INDEX IF NOT EXISTS {m.group(1)}"
+    text = re.sub(r"\bISNULL\(", "IFNULL(", text)
+    return _temp_names(text)
+
+
+# ---------------------------
+# pyodbc benzeri bağlantı
+# ---------------------------
+class Cursor:
+    def __init__(self, conn: "Connection"):
+        self._conn = conn
+        self._cur = conn._db.cursor()
+        self._rows: Optional[List[Tuple]] = None
+        self.fast_executemany = False
+        self.rowcount = -1
+
+    @staticmethod
+    def _params(params: Sequence[Any]) -> Tuple:
+        # pyodbc hem execute(sql, a, b) hem execute(sql, (a, b)) kabul eder
+        if len(params) == 1 and isinstance(params[0], (tuple, list)):
+            return tuple(params[0])
+        return tuple(params)
+
+    def execute(self, sql: str, *params):
+        _trip()
+        self._conn._begin()
+        self._rows = None
+        args = self._params(params)
+        text = translate(sql)
+        if text is None:
+            self._special(sql.strip(), args)
+            return self
+        self._cur.execute(text, args)
+        self.rowcount = self._cur.rowcount
+        return self
+
+    def _special(self, sql: str, args: Tuple) -> None:
+        m = _RX_ADD_COLUMN.match(sql)
+        if m:
+            table, column, decl = m.groups()
+            cols = [r[1].lower() for r in self._cur.execute(f"PRAGMA table_info([{table}])")]
+            if column.lower() not in cols:
+                self._cur.execute(f"ALTER TABLE [{table}] ADD [{column}] {decl}")
+            self.rowcount = -1
+            return
+        m = _RX_SELECT_INTO.match(sql)
+        if m:
+            # SQL Server staging JOIN'lerini hash join ile yapar; SQLite'ta ilk (anahtar) kolona
+            # indeks olmadan UPDATE/DELETE ... JOIN iç içe tarama olur
+            cols, name, table = m.groups()
+            self._cur.execute(f"CREATE TEMP TABLE [{name}] AS SELECT {cols} FROM {table} WHERE 0")
+            first = cols.split(",")[0].strip()
+            self._cur.execute(f"CREATE INDEX temp.[IX_{name}] ON [{name}] ({first})")
+            self.rowcount = -1
+            return
+        # _existing_index_columns: (index_id, kolon) satırları
+        table = args[0]
+        rows: List[Tuple] = []
+        for i, ix in enumerate(self._cur.execute(f"PRAGMA index_list([{table}])").fetchall()):
+            for info in self._cur.execute(f"PRAGMA index_info([{ix[1]}])").fetchall():
+                rows.append((i + 1, info[2]))
+        self._rows = rows
+
+    def executemany(self, sql: str, seq_params):
+        _trip()
+        self._conn._begin()
+        self._rows = None
+        self._cur.executemany(_temp_names(sql), seq_params)
+        self.rowcount = self._cur.rowcount
+        return self
+
+    def fetchall(self) -> List[Tuple]:
+        if self._rows is not None:
+            rows, self._rows = self._rows, []
+            return rows
+        return self._cur.fetchall()
+
+    def fetchone(self):
+        if self._rows is not None:
+            return self._rows.pop(0) if self._rows else None
+        return self._cur.fetchone()
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self) -> None:
+        self._cur.close()
+
+
+class Connection:
+    """autocommit=False iken ilk cümlede transaction açılır; commit/rollback ile kapanır."""
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self.autocommit = True
+
+    def _begin(self) -> None:
+        if not self.autocommit and not self._db.in_transaction:
+            self._db.execute("BEGIN")
+
+    def cursor(self) -> Cursor:
+        return Cursor(self)
+
+    def commit(self) -> None:
+        _trip()
+        if self._db.in_transaction:
+            self._db.execute("COMMIT")
+
+    def rollback(self) -> None:
+        if self._db.in_transaction:
+            self._db.execute("ROLLBACK")
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def connect(conn_str: str) -> Connection:
+    """'sqlite:///<yol>' -> Connection."""
+    return Connection(conn_str.strip()[len(PREFIX):])
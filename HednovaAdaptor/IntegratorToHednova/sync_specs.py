@@ -0,0 +1,251 @@
+# sync_specs.py
+# -*- coding: utf-8 -*-
+"""
+ENT görevlerinin tanımları (hangi rapor satırı hangi tabloya, hangi kolona yazılır).
+sql_crud.sync_rows() bu tanımları tek bir genel senkron motoruyla çalıştırır;
+yeni bir ENT kodu için buraya bir SyncSpec eklemek (ya da KR_ENTEGRASYONE.RESULT3
+alanına JSON tanım yazmak) yeterlidir.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# ---------------------------
+# Tip dönüştürücüler
+# ---------------------------
+def as_text(value: Any) -> str:
+    """API değerini kırpılmış metne çevirir (None -> "")."""
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def as_float(value: Any) -> float:
+    """API değerini sayıya çevirir (boş/None -> 0)."""
+    return float(value or 0)
+
+
+COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "text": as_text,
+    "float": as_float,
+}
+
+
+@dataclass(frozen=True)
+class Field:
+    """Hedef tablodaki bir kolon: API alanından (source) ya da sabit değerden (const) beslenir."""
+    column: str
+    source: Optional[str] = None
+    coerce: Callable[[Any], Any] = as_text
+    const: Any = None
+
+    def value(self, item: Dict) -> Any:
+        if self.source is None:
+            return self.const
+        return self.coerce(item.get(self.source))
+
+
+@dataclass(frozen=True)
+class SyncSpec:
+    """
+    Bir ENT görevinin senkron tanımı.
+      table : hedef tablo
+      keys  : anahtar kolon(lar)ı, ör. ("ENT01",) ya da ENT-09 için ENT01..ENT05
+      fields: kolon eşlemeleri (anahtar kolonlar dahil)
+      scope : tabloyu paylaşan görevler için sabit filtre, ör. {"EVRAKNO": "STUNIT"};
+              hem okuma/silme filtresine hem de yazılan satıra eklenir.
+      depends_on: "tümünü çalıştır"da bu görevden önce bitmesi gereken ENT kodları
+      delta_param: raporun "şu tarihten sonra değişenler" parametresinin adı; verilirse görev
+              delta modunda yalnızca RESULT5'ten bu yana değişen satırları çeker (bkz. sync_tasks)
+      chunk_params: raporun (başlangıç, bitiş) tarih parametrelerinin adları; verilirse tam
+              senkron tarih aralığı parçalarıyla çekilebilir (bkz. report_chunks)
+      key_hash: çok kolonlu anahtar için tabloda kalıcı [ENTKEY] vekil anahtarı tutulur;
+              eşleşme/güncelleme/silme tek kolonlu indeks üzerinden yapılır
+    """
+    code: str
+    table: str
+    keys: Tuple[str, ...]
+    fields: Tuple[Field, ...]
+    scope: Dict[str, Any] = field(default_factory=dict)
+    depends_on: Tuple[str, ...] = ()
+    delta_param: Optional[str] = None
+    chunk_params: Tuple[str, ...] = ()
+    key_hash: bool = False
+    # (kaynak, dönüştürücü, sabit) planı; normalize() her satırda Field nesnelerini dolaşmaz
+    _plan: Tuple = field(init=False, repr=False, compare=False, default=())
+
+    def __post_init__(self):
+        object.__setattr__(self, "_plan", tuple((f.source, f.coerce, f.const) for f in self.fields))
+
+    @property
+    def columns(self) -> List[str]:
+        return [f.column for f in self.fields]
+
+    def normalize(self, item: Dict) -> Tuple:
+        """Tek bir API satırını fields sırasında değer tuple'ına çevirir."""
+        get = item.get
+        return tuple([const if src is None else coerce(get(src)) for src, coerce, const in self._plan])
+
+    def key_of(self, record: Tuple) -> Tuple[str, ...]:
+        cols = self.columns
+        return tuple(as_text(record[cols.index(k)]) for k in self.keys)
+
+
+def _f(column: str, source: Optional[str] = None, coerce: Callable[[Any], Any] = as_text,
+       const: Any = None) -> Field:
+    return Field(column, source, coerce, const)
+
+
+def _simple(code: str, table: str) -> SyncSpec:
+    """key/kod/aciklama -> ENT01/KOD/AD eşlemeli basit tanım tabloları."""
+    return SyncSpec(code, table, ("ENT01",), (
+        _f("ENT01", "key"), _f("KOD", "kod"), _f("AD", "aciklama"),
+    ))
+
+
+# ---------------------------
+# Kayıtlı görevler
+# ---------------------------
+SPECS: Dict[str, SyncSpec] = {}
+
+
+def register(spec: SyncSpec) -> SyncSpec:
+    SPECS[spec.code] = spec
+    return spec
+
+
+register(SyncSpec("ENT-02", "KR_GECOUST", ("ENT01",), (
+    _f("ENT01", "key"), _f("KOD", "kod"), _f("AD", "aciklama"), _f("AP10", const=1),
+), scope={"EVRAKNO": "STUNIT"}))
+
+register(SyncSpec("ENT-03", "KR_PERS00", ("ENT01",), (
+    _f("ENT01", "key"), _f("KOD", "kod"), _f("AD", "aciklama"), _f("REFTEXT01", "tezgah_kodu"),
+)))
+
+register(_simple("ENT-04", "KR_IMLT00"))
+register(_simple("ENT-05", "KR_IMLT01"))
+register(_simple("ENT-06", "KR_GDEF00"))
+register(_simple("ENT-07", "KR_CARI00"))
+
+register(SyncSpec("ENT-08", "KR_BOMU01E", ("ENT01",), (
+    _f("ENT01", "key"),
+    _f("EVRAKNO", "kod"),
+    _f("ACIKLAMA", "aciklama"),
+    _f("AKTIF_PASIF", "durum"),
+    _f("ENT02", "mamulkey"),
+    _f("MAMULMIKTAR", "mamulmiktar", as_float),
+    _f("MAMULCODE", "mamulkod"),
+), depends_on=("ENT-12",)))
+
+register(SyncSpec("ENT-09", "KR_BOMU01T", ("ENT01", "ENT02", "ENT03", "ENT04", "ENT05"), (
+    _f("ENT01", "evraknokey"),
+    _f("EVRAKNO", "evrakno"),
+    _f("AKTIF_PASIF", "durum"),
+    _f("ENT02", "bomreccodekey"),
+    _f("BOMREC_CODE", "bomreccode"),
+    _f("BOMREC_INPUTTYPE", "bomrecinputtype"),
+    _f("ENT03", "bomreckaynakcodekey"),
+    _f("BOMREC_KAYNAKCODE", "bomreckaynakcode"),
+    _f("BOMREC_MAMULMIKTAR", "bomrecmamulmiktar", as_float),
+    _f("BOMREC_KAYNAK0", "bomreckaynak0"),
+    _f("ENT04", "bomrecoperasyonkey"),
+    _f("BOMREC_OPERASYON", "bomrecoperasyon"),
+    _f("ENT05", "tuketimtezgahkey"),
+    _f("REFTEXT01", "tuketimtezgah"),
+), depends_on=("ENT-08", "ENT-12"), key_hash=True))
+
+# Sipariş fişleri sık değişir ve büyüktür; DİA raporlarında bu parametre tanımlıysa
+# (fişin son değişiklik tarihi >= parametre) delta senkron kullanılabilir.
+STOK40_DELTA_PARAM = "degisim_tarihi"
+# Fiş tarihine göre [başlangıç, bitiş) aralığı parametreleri (parçalı çekme için)
+STOK40_CHUNK_PARAMS = ("baslangic_tarihi", "bitis_tarihi")
+
+register(SyncSpec("ENT-10", "KR_STOK40E", ("ENT01",), (
+    _f("ENT01", "key"),
+    _f("EVRAKNO", "kod"),                  # fisno
+    _f("TARIH", "tarih"),
+    _f("ISLEM_SAATI", "saat"),
+    _f("SIPLEILGILINOTLAR_1", "a1"),       # aciklama1
+    _f("SIPLEILGILINOTLAR_2", "a2"),       # aciklama2
+    _f("SIPLEILGILINOTLAR_3", "a3"),       # aciklama3
+    _f("ENT02", "keycari"),                # _key_scf_carikart
+    _f("MUSTERIKODU", "carikod"),          # carikartkodu
+), delta_param=STOK40_DELTA_PARAM, chunk_params=STOK40_CHUNK_PARAMS))
+
+register(SyncSpec("ENT-11", "KR_STOK40T", ("ENT01",), (
+    _f("ENT01", "satirkey"),
+    _f("ENT02", "evraknokey"),
+    _f("EVRAKNO", "evrakno"),
+    _f("TARIH", "tarih"),
+    _f("ENT03", "kodkey"),
+    _f("KOD", "kod"),
+    _f("NOTES", "notes"),
+    _f("OR_FIYAT", "orfiyat"),
+    _f("PRICEUNIT", "priceunit"),
+    _f("OR_TUTAR", "ortutar"),
+    _f("SF_MIKTAR", "sfmiktar"),
+    _f("ENT04", "sfsfunitkey"),
+    _f("ENT05", "sistembirimkey"),
+    _f("SF_SF_UNIT", "sfsfunit"),
+    _f("SF_STOK_MIKTAR", "sfstokmiktar"),
+    _f("RTESTARIH", "rtestarih"),
+), depends_on=("ENT-10", "ENT-12"), delta_param=STOK40_DELTA_PARAM, chunk_params=STOK40_CHUNK_PARAMS))
+
+register(SyncSpec("ENT-12", "KR_STOK00", ("ENT01",), (
+    _f("ENT01", "kodkey"),
+    _f("KOD", "kod"),
+    _f("AD", "ad"),
+    _f("ENT02", "iunitstokkey"),
+    _f("ENT03", "iunitsistemkey"),
+    _f("IUNIT", "iunit"),
+)))
+
+
+# ---------------------------
+# RESULT3 (JSON) üzerinden tanım
+# ---------------------------
+def spec_from_json(code: str, text: str) -> Optional[SyncSpec]:
+    """
+    KR_ENTEGRASYONE.RESULT3 içindeki JSON tanımı SyncSpec'e çevirir. Örnek:
+      {"table": "KR_XXX", "keys": ["ENT01"],
+       "fields": {"ENT01": "key", "KOD": "kod",
+                  "MIKTAR": {"source": "miktar", "type": "float"},
+                  "AP10": {"const": 1}},
+       "scope": {"EVRAKNO": "STUNIT"}, "depends_on": ["ENT-12"], "delta_param": "degisim_tarihi",
+       "chunk_params": ["baslangic_tarihi", "bitis_tarihi"], "key_hash": false}
+    Geçerli bir tanım değilse None döner.
+    """
+    try:
+        data = json.loads(text)
+        if not isinstance(data, dict):
+            return None
+        fields = []
+        for column, src in data["fields"].items():
+            if isinstance(src, str):
+                fields.append(_f(column, src))
+            elif "const" in src:
+                fields.append(_f(column, const=src["const"]))
+            else:
+                fields.append(_f(column, src["source"], COERCERS[src.get("type", "text")]))
+        keys = tuple(data.get("keys") or ["ENT01"])
+        if any(k not in {f.column for f in fields} for k in keys):
+            return None
+        if data.get("chunk_params") and len(data["chunk_params"]) != 2:
+            return None
+        return SyncSpec(code, str(data["table"]), keys, tuple(fields), dict(data.get("scope") or {}),
+                        tuple(data.get("depends_on") or ()), data.get("delta_param") or None,
+                        tuple(data.get("chunk_params") or ()), bool(data.get("key_hash", False)))
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def resolve_spec(code: str, result3: str = "") -> Optional[SyncSpec]:
+    """Önce RESULT3'teki JSON tanıma, yoksa kayıtlı SPECS'e bakar."""
+    text = (result3 or "").strip()
+    if text.startswith("{"):
+        spec = spec_from_json(code, text)
+        if spec is not None:
+            return spec
+    return SPECS.get(code)
@@ -0,0 +1,393 @@
+# sync_tasks.py
+# -*- coding: utf-8 -*-
+"""
+Bir VA görevinin (KR_ENTEGRASYONE satırı) uçtan uca çalıştırılması:
+DİA raporunu çek -> görev tanımına göre DB'ye senkronize et -> RESULT5'i güncelle.
+Qt'ye bağımlı değildir; arayüz bu fonksiyonu arka plan iş parçacığında çağırır.
+"""
+
+import threading
+import time
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from api_requests import report_result_get
+from app_log import get_logger, row_sampler
+from config import CONFIG
+import progress
+from progress import Cancelled, CancelToken, TaskProgress
+from report_chunks import date_ranges, iter_chunks
+from scheduler import build_deps, run_dag
+import row_codec
+import run_history
+from run_history import stage, timed_iter
+from sql_crud import get_entegrasyone_last_update, sync_records, sync_rows, update_entegrasyone_last_update
+from sync_specs import resolve_spec
+import tenants
+
+
+log = get_logger("sync")
+
+DECODE_MODES = ("stream", "fast")
+
+
+def report_decode_mode() -> str:
+    """
+    data.json'daki isteğe bağlı "report": {"decode": "stream" | "fast"} ayarı.
+      stream (varsayılan): yanıt belleğe alınmadan akış halinde çözülür (bkz. report_stream)
+      fast : yanıt tek seferde alınır, row_codec (msgspec/orjson) ile doğrudan kayıtlara çözülür;
+             daha hızlıdır ama gövde bellekte tutulur
+    """
+    try:
+        mode = str((CONFIG.data.get("report") or {}).get("decode", "stream")).lower()
+    except (FileNotFoundError, AttributeError):
+        mode = "stream"
+    return mode if mode in DECODE_MODES else "stream"
+
+
+def delta_settings() -> Dict[str, float]:
+    """
+    data.json'daki isteğe bağlı "delta" bloğu:
+      "delta": {"enabled": false, "overlap_minutes": 5, "reconcile_hours": 6}
+    enabled         : delta_param tanımlı görevlerde delta senkronu aç
+    overlap_minutes : RESULT5'ten bu kadar geriye gidilir (saat farkı / aynı anda değişen kayıtlar için)
+    reconcile_hours : bu süreden eski tam senkron varsa (ya da süreç yeni başladıysa) bir sonraki
+                      çalışma silinenleri de yakalamak için tam senkron yapar
+    """
+    try:
+        opts = CONFIG.data.get("delta") or {}
+    except FileNotFoundError:
+        opts = {}
+    return {
+        "enabled": bool(opts.get("enabled", False)),
+        "overlap": float(opts.get("overlap_minutes", 5)) * 60,
+        "reconcile": float(opts.get("reconcile_hours", 6)) * 3600,
+    }
+
+
+# Görev kodu (kiracı etkinse "<ad>/<kod>") -> son başarılı tam senkronun zamanı (time.time()); süreç içinde tutulur
+_last_full: Dict[str, float] = {}
+_last_full_lock = threading.Lock()
+
+
+def _delta_since(code: str, spec, mode: str) -> Optional[str]:
+    """
+    Bu çalışma delta olacaksa raporun delta_param'ına verilecek tarihi, tam senkron
+    olacaksa None döndürür. mode: "auto" | "full" | "delta"
+    """
+    if mode == "full" or spec is None or not spec.delta_param:
+        return None
+    opts = delta_settings()
+    if mode == "auto":
+        if not opts["enabled"]:
+            return None
+        with _last_full_lock:
+            last_full = _last_full.get(tenants.qualify(code))
+        if last_full is None or time.time() - last_full > opts["reconcile"]:
+            return None
+    ok, text = get_entegrasyone_last_update(code)
+    if not ok or not text:
+        return None
+    try:
+        watermark = datetime.strptime(text[:19], "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+    return (watermark - timedelta(seconds=opts["overlap"])).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def chunk_settings() -> Dict[str, Any]:
+    """
+    data.json'daki isteğe bağlı "chunking" bloğu (chunk_params tanımlı görevlerin tam senkronu için):
+      "chunking": {"enabled": false, "start_date": "2020-01-01", "days": 31, "parallel": 1, "retries": 2,
+                   "delete_missing": false}
+    start_date: ilk parçanın başlangıcı (raporun en eski kaydından önce olmalı); varsayılanı yoktur,
+                verilmezse parçalı çekme yapılmaz
+    days      : parça genişliği (gün); parallel: aynı anda alınan parça sayısı
+    retries   : başarısız parçanın tek başına yeniden deneme sayısı
+    delete_missing: parçalı tam senkronda DB'de olup raporda olmayanları sil. Tarihi start_date'ten
+                önce, boş ya da okunamayan satırlar hiçbir parçada gelmez; bu yüzden yalnızca raporun
+                tüm satırları [start_date, yarın) aralığına düşüyorsa açılmalıdır
+    """
+    try:
+        opts = CONFIG.data.get("chunking") or {}
+    except FileNotFoundError:
+        opts = {}
+    return {
+        "enabled": bool(opts.get("enabled", False)),
+        "start_date": str(opts.get("start_date") or "").strip(),
+        "days": int(opts.get("days", 31)),
+        "parallel": max(1, int(opts.get("parallel", 1))),
+        "retries": max(0, int(opts.get("retries", 2))),
+        "delete_missing": bool(opts.get("delete_missing", False)),
+    }
+
+
+def _chunk_plan(spec, since: Optional[str]) -> Optional[List[Dict[str, str]]]:
+    """Parçalı çekilecekse her parçanın rapor parametreleri; değilse None (delta zaten küçüktür)."""
+    if since or spec is None or len(spec.chunk_params) != 2:
+        return None
+    opts = chunk_settings()
+    if not opts["enabled"]:
+        return None
+    if not opts["start_date"]:
+        log.warning("%s: chunking.start_date verilmediği için rapor parçalanmadan çekiliyor", spec.code)
+        return None
+    start = datetime.strptime(opts["start_date"], "%Y-%m-%d").date()
+    # Bitiş hariç tutulur; bugünü de kapsamak için yarına kadar
+    ranges = date_ranges(start, date.today() + timedelta(days=1), opts["days"])
+    p_from, p_to = spec.chunk_params
+    return [{p_from: a, p_to: b} for a, b in ranges]
+
+
+def _fetch_chunk(report_code: str, spec, fast: bool, lazy: bool, params: Dict[str, Any]):
+    """Tek bir rapor parçası: fast ise görev kayıtları, değilse API satırları; hata -> istisna."""
+    result = report_result_get(report_code, stream=lazy and not fast, raw=fast, params=params)
+    rcode = str(result.get("code", "0"))
+    if rcode != "200":
+        raise RuntimeError(f"code: {rcode}  msg: {result.get('msg', '')}")
+    if fast:
+        return row_codec.decode_records(spec, result["payload"])
+    return result.get("rows") or []
+
+
+def _echo_rows(rows: Iterable[Dict], out: Dict[str, Any]) -> Iterator[Dict]:
+    """
+    Satırları out["rows"]'u artırarak aynen geçirir. DEBUG seviyesinde satırların
+    örneklenmiş, hız sınırlı dökümü günlüğe yazılır (bkz. app_log.RowSampler).
+    progress.CHECK_EVERY satırda bir ilerleme bildirilir ve iptal kontrol edilir.
+    """
+    sampler = row_sampler(log)
+    for row in rows:
+        out["rows"] += 1
+        if not out["rows"] % progress.CHECK_EVERY:
+            progress.rows_read(out["rows"])
+        if sampler is not None and sampler.allow():
+            log.debug("%s satır %d: %s", out["code"], out["rows"], row,
+                      extra={"fields": {"task": out["code"], "n": out["rows"], "row": row}})
+        yield row
+    progress.rows_read(out["rows"])
+    if sampler is not None and sampler.skipped:
+        log.debug("%s: %d satır dökülmedi (örnekleme/hız sınırı)", out["code"], sampler.skipped)
+    log.info("%s: rapor %d satır döndü", tenants.qualify(out["code"]), out["rows"],
+             extra={"fields": {"task": out["code"], "rows": out["rows"]}})
+
+
+def run_va_task(code: str, report_code: str, result3: str = "", mode: str = "auto",
+                on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                cancel: Optional[CancelToken] = None) -> Dict[str, Any]:
+    """
+    mode: "auto" (delta ayarına göre), "full" (tam senkron + silme), "delta" (RESULT5'ten beri değişenler)
+    on_progress: ilerleme olayları (bkz. progress; çalışan iş parçacığından, seyreltilerek çağrılır)
+    cancel: iptal edilirse görev ilk partiler arası noktada durur, transaction geri alınır
+    Dönüş:
+      {"code": <ENT kodu>, "ok": bool, "text": <kart 'API Yanıtı' metni>,
+       "last_update": <'YYYY-MM-DD HH:MM:SS' ya da None>, "rows": <rapor satır sayısı>,
+       "mode": "full" | "delta", "duration_ms": <toplam süre>, "stages": {aşama: ms},
+       "history": <run_history.summary(code)>, "cancelled": <yalnızca iptal edildiyse True>}
+    Her çalışma aşama süreleriyle birlikte run_history tablosuna kaydedilir (kiracı etkinse
+    "<ad>/<kod>" olarak, bkz. tenants).
+    """
+    with run_history.track(tenants.qualify(code)) as run, progress.activate(TaskProgress(code, on_progress, cancel)):
+        try:
+            progress.checkpoint()
+            out = _run_va_task(code, report_code, result3, mode)
+        except Cancelled as e:
+            out = _cancelled(code, mode, e)
+    return _record_run(run, out)
+
+
+def _cancelled(code: str, mode: str, err: Cancelled) -> Dict[str, Any]:
+    return {"code": code, "ok": False, "text": f"{err}: değişiklikler geri alındı", "last_update": None,
+            "rows": 0, "mode": "delta" if mode == "delta" else "full", "cancelled": True}
+
+
+def _record_run(run: run_history.RunStats, out: Dict[str, Any]) -> Dict[str, Any]:
+    """Çalışmayı run_history'ye yazar; süreleri ve kart özetini out'a ekler."""
+    run_history.save(run, out["ok"], out["mode"], out["rows"])
+    out["duration_ms"] = round(run.total_ms, 1)
+    out["stages"] = run.stages_ms()
+    out["history"] = run_history.summary(run.code)
+    return out
+
+
+def _begin(code: str, result3: str, mode: str):
+    """
+    Görev çalışmasının ortak başlangıcı.
+    Dönüş: (out, spec, started, now_text_db, since) — since delta çalışmada rapora verilecek tarih, değilse None
+    """
+    out: Dict[str, Any] = {"code": code, "ok": False, "text": "", "last_update": None, "rows": 0, "mode": "full"}
+    spec = resolve_spec(code, result3)
+
+    # RESULT5 rapor isteği başlamadan alınan zamandır; istek sürerken değişen satırlar
+    # bir sonraki delta çalışmasında yeniden gelir.
+    started = time.time()
+    now_text_db = datetime.fromtimestamp(started).strftime("%Y-%m-%d %H:%M:%S")
+    since = _delta_since(code, spec, mode)
+    if since:
+        out["mode"] = "delta"
+    return out, spec, started, now_text_db, since
+
+
+def _decode_fast(out: Dict[str, Any], spec, result: Dict[str, Any]) -> Optional[List]:
+    """
+    fast yolu: rapor yanıtını (raw=True) görev kayıtlarına çözer.
+    None dönerse görev burada biter ve sonucu out'tadır (API/çözümleme hatası ya da tanımsız görev).
+    """
+    rcode = str(result.get("code", "0"))
+    if rcode != "200":
+        out["text"] = f"code: {rcode}  msg: {result.get('msg', '')}"
+        return None
+    try:
+        with stage("decode"):
+            if spec is None:
+                out["rows"] = row_codec.count_rows(result["payload"])
+            else:
+                return row_codec.decode_records(spec, result["payload"])
+    except Exception as e:
+        out["text"] = f"code: 996  msg: Base64/JSON çözümleme hatası: {e}"
+        return None
+    out["ok"] = True
+    out["text"] = f"code 200 başarılı - toplam {out['rows']} satır döndü"
+    return None
+
+
+def _write_records(out: Dict[str, Any], code: str, spec, records: List, since: Optional[str],
+                   now_text_db: str, started: float) -> Dict[str, Any]:
+    """Çözülmüş kayıtları senkronize edip RESULT5'i günceller."""
+    ok, db_msg, new_count = sync_records(spec, timed_iter(_echo_rows(records, out)), delete_missing=not since)
+    return _finish(out, code, now_text_db, started, ok, db_msg)
+
+
+def _run_va_task(code: str, report_code: str, result3: str, mode: str) -> Dict[str, Any]:
+    out, spec, started, now_text_db, since = _begin(code, result3, mode)
+    params = {spec.delta_param: since} if since else None
+
+    fast = report_decode_mode() == "fast"
+
+    # Büyük raporlar: tarih aralığı parçaları geldikçe senkrona akar; biri hep başarısız
+    # olursa senkron hiçbir şey yazmadan hata döner (eksik parça yüzünden silme yapılmaz).
+    # Parçalar yalnızca [start_date, yarın) aralığını kapsar; silme açıkça istenmedikçe yapılmaz.
+    chunks = _chunk_plan(spec, since)
+    if chunks:
+        opts = chunk_settings()
+        fetch = tenants.bind(partial(_fetch_chunk, report_code, spec, fast, opts["parallel"] == 1))
+        # Parçalarda indirme ve çözümleme iç içedir; ikisi birlikte http aşamasına yazılır
+        items = timed_iter(_echo_rows(iter_chunks(fetch, chunks, opts["parallel"], opts["retries"]), out), "http")
+        sync = sync_records if fast else sync_rows
+        ok, db_msg, _ = sync(spec, items, delete_missing=opts["delete_missing"])
+        if ok and not opts["delete_missing"]:
+            db_msg += " (parçalı senkron: silme yapılmadı)"
+        return _finish(out, code, now_text_db, started, ok, db_msg)
+
+    # 1) API’den raporu çek (stream modunda satırlar senkron sırasında çözülür)
+    with stage("http"):
+        result = report_result_get(report_code, stream=not fast, raw=fast, params=params)
+    rcode = str(result.get("code", "0"))
+    msg   = str(result.get("msg", ""))
+    if rcode != "200":
+        out["text"] = f"code: {rcode}  msg: {msg}"
+        return out  # başarısızsa senkrona geçmeyelim
+
+    if fast:
+        # 2-3) baytlardan doğrudan görev kayıtlarına çöz, sonra senkron
+        records = _decode_fast(out, spec, result)
+        del result
+        if records is None:
+            return out
+        return _write_records(out, code, spec, records, since, now_text_db, started)
+
+    # 2) Konsol çıktısı: satırlar tüketildikçe basılır ve sayılır
+    # (akışta ağdan okuma ile çözümleme ayrılamaz; ikisi birlikte decode aşamasıdır)
+    rows = timed_iter(_echo_rows(result.get("rows") or [], out))
+
+    # 3) görev tanımına (RESULT3 JSON ya da kayıtlı SPECS) göre senkron
+    if spec is None:
+        # Tanımı olmayan kodlar için bir şey yapmıyoruz (satırlar yalnızca sayılır)
+        try:
+            for _ in rows:
+                pass
+        except Exception as e:
+            out["text"] = f"code: 996  msg: Base64/JSON çözümleme hatası: {e}"
+            return out
+        out["ok"] = True
+        out["text"] = f"code 200 başarılı - toplam {out['rows']} satır döndü"
+        return out
+
+    ok, db_msg, new_count = sync_rows(spec, rows, delete_missing=not since)
+    return _finish(out, code, now_text_db, started, ok, db_msg)
+
+
+def _finish(out: Dict[str, Any], code: str, now_text_db: str, started: float,
+            ok: bool, db_msg: str) -> Dict[str, Any]:
+    """Senkron sonucunu karta yazar; başarılıysa RESULT5'i (ve tam senkron zamanını) günceller."""
+    if not ok:
+        out["text"] = f"HATA: {db_msg} | yeni kayıt: 0"
+        return out
+
+    if out["mode"] == "full":
+        with _last_full_lock:
+            _last_full[tenants.qualify(code)] = started
+
+    with stage("result5"):
+        ok2, msg2 = update_entegrasyone_last_update(code, now_text_db)
+    if ok2:
+        out["last_update"] = now_text_db
+
+    # API Yanıtı: senkron özeti + RESULT5 güncelleme durumu
+    suffix = f" | RESULT5: {'OK' if ok2 else 'HATA'}"
+    out["ok"] = True
+    out["text"] = f"{db_msg}{suffix}"
+    return out
+
+
+def run_all_workers() -> int:
+    """data.json'daki isteğe bağlı "run_all": {"max_workers": N} ayarı (varsayılan 3)."""
+    try:
+        return int((CONFIG.data.get("run_all") or {}).get("max_workers", 3))
+    except (FileNotFoundError, TypeError, ValueError):
+        return 3
+
+
+def run_all_va_tasks(va_rows: List[Dict], max_workers: Optional[int] = None,
+                     on_start: Optional[Callable[[str], None]] = None,
+                     on_task_done: Optional[Callable[[str, Any], None]] = None,
+                     on_skip: Optional[Callable[[str, str], None]] = None,
+                     mode: str = "auto", pipeline: Optional[bool] = None,
+                     on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     cancel: Optional[CancelToken] = None,
+                     slots: Optional[threading.Semaphore] = None) -> Dict[str, Any]:
+    """
+    fetch_va_rows() satırlarının tümünü görev tanımlarındaki depends_on'a göre kurulan
+    DAG üzerinden, bağımsız olanları paralel çalıştırır.
+    pipeline=True (ya da data.json "run_all": {"pipeline": true}) ise görevler bunun yerine
+    fetch/decode/write aşamalarına bölünüp pipeline.run_pipeline ile çalıştırılır.
+    on_progress / cancel tüm görevlere verilir (olaylardaki "code" görevi belirtir); iptalden
+    sonra sıradaki görevler de başlar başlamaz iptal sonucu döner.
+    slots: birden çok çalıştırıcı arasında paylaşılan eşzamanlılık sınırı (bkz. tenants.run_tenants);
+    her görev çalışmadan önce bir yer alır. Etkin kiracı görev iş parçacıklarına taşınır.
+    Dönüş: kod -> run_va_task sonucu (atlanan görevler için None)
+    """
+    from pipeline import pipeline_settings, run_pipeline
+
+    if pipeline if pipeline is not None else pipeline_settings()["enabled"]:
+        return run_pipeline(va_rows, on_start=on_start, on_task_done=on_task_done, on_skip=on_skip,
+                            mode=mode, on_progress=on_progress, cancel=cancel, slots=slots)
+
+    by_code = {str(r.get("CODE", "")): r for r in va_rows if r.get("CODE")}
+
+    def _depends_on(code: str):
+        spec = resolve_spec(code, by_code[code].get("RESULT3", ""))
+        return spec.depends_on if spec else ()
+
+    def _run(code: str, row: Dict) -> Dict[str, Any]:
+        with slots or nullcontext():
+            return run_va_task(code, str(row.get("RESULT2", "")), str(row.get("RESULT3", "")), mode,
+                               on_progress, cancel)
+
+    tasks = {code: tenants.bind(partial(_run, code, row)) for code, row in by_code.items()}
+    return run_dag(tasks, build_deps(by_code, _depends_on),
+                   max_workers=max_workers or run_all_workers(),
+                   is_success=lambda res: bool(res and res.get("ok")),
+                   on_start=on_start, on_done=on_task_done, on_skip=on_skip)
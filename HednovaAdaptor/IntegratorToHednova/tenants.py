@@ -0,0 +1,197 @@
+# tenants.py
+# -*- coding: utf-8 -*-
+"""
+Birden çok DİA firma/dönemini, her biri kendi Hednova veritabanına, tek süreçten senkronlama.
+
+data.json'daki isteğe bağlı "tenants" bloğu:
+  "tenants": {
+    "max_parallel": 4,          tüm kiracılarda aynı anda çalışan en fazla görev (genel sınır)
+    "workers_per_tenant": 2,    bir kiracının DAG'ında aynı anda çalışan en fazla görev
+    "list": [
+      {"name": "merkez", "company": "11", "period": "1", "connectionstring": "Server=...;Database=A;..."},
+      {"name": "sube",   "company": "12", "period": "1", "connectionstring": "Server=...;Database=B;..."}
+    ]
+  }
+name verilmezse "<company>-<period>" kullanılır; adlar tekil olmalıdır.
+
+Bir iş parçacığında kiracı etkinken (bkz. activate) firma/dönem (api_requests._load_integrator_fp)
+ve Hednova bağlantı cümlesi (sql_crud._load_conn_string) kiracıdan gelir. Bağlantı havuzları
+bağlantı cümlesine göre ayrıldığından her kiracının kendi havuzu olur. Görev geçmişi ve tam
+senkron zamanları "<ad>/<kod>" anahtarıyla tutulur (bkz. qualify).
+DİA session'ı kiracılar arasında paylaşılır ve her zaman varsayılan ("hednova") veritabanının
+ENT-01 satırında saklanır: login disconnect_same_user ile yapıldığından kiracı başına ayrı login
+birbirinin session'ını düşürürdü (bkz. on_default_db).
+Kiracı etkin değilse her şey tek firmalı kurulumdaki gibi data.json'dan okunur.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config import CONFIG
+
+_local = threading.local()
+
+
+class Tenant:
+    """Bir firma/dönem + hedef Hednova veritabanı."""
+
+    def __init__(self, name: str, company: str, period: str, connectionstring: str):
+        self.name = name
+        self.company = company
+        self.period = period
+        self.connectionstring = connectionstring
+        self._conn_str: Optional[str] = None
+
+    def conn_string(self) -> str:
+        """Kiracının bağlantı cümlesi (DRIVER/Encrypt eklenmiş hali)."""
+        if self._conn_str is None:
+            self._conn_str = CONFIG.resolve_conn_string(self.connectionstring)
+        return self._conn_str
+
+    def __repr__(self) -> str:
+        return f"Tenant({self.name!r}, company={self.company!r}, period={self.period!r})"
+
+
+def tenants_settings() -> Dict[str, Any]:
+    """data.json'daki isteğe bağlı "tenants" bloğu (biçim modül açıklamasında)."""
+    try:
+        opts = CONFIG.data.get("tenants") or {}
+    except FileNotFoundError:
+        opts = {}
+    return {
+        "max_parallel": max(1, int(opts.get("max_parallel", 4))),
+        "workers_per_tenant": max(1, int(opts.get("workers_per_tenant", 2))),
+        "list": list(opts.get("list") or []),
+    }
+
+
+def load_tenants(names: Optional[List[str]] = None) -> List[Tenant]:
+    """
+    data.json'daki kiracılar (names verilirse yalnızca onlar, verilen sırayla).
+    Eksik alan, tekrarlanan ya da bulunamayan ad ValueError fırlatır.
+    """
+    tenants: Dict[str, Tenant] = {}
+    for i, item in enumerate(tenants_settings()["list"], start=1):
+        try:
+            company = str(item["company"]).strip()
+            period = str(item["period"]).strip()
+            conn = str(item["connectionstring"]).strip()
+        except (KeyError, TypeError):
+            raise ValueError(f"tenants.list[{i}]: company, period ve connectionstring zorunludur")
+        name = str(item.get("name") or f"{company}-{period}").strip()
+        if name in tenants:
+            raise ValueError(f"tenants.list[{i}]: '{name}' adı birden fazla kez kullanılmış")
+        tenants[name] = Tenant(name, company, period, conn)
+    if names is None:
+        return list(tenants.values())
+    missing = [n for n in names if n not in tenants]
+    if missing:
+        raise ValueError(f"data.json'da tanımlı olmayan kiracı: {', '.join(missing)}")
+    return [tenants[n] for n in names]
+
+
+# ---------------------------
+# Etkin kiracı (iş parçacığına özel)
+# ---------------------------
+def current() -> Optional[Tenant]:
+    return getattr(_local, "tenant", None)
+
+
+@contextmanager
+def activate(tenant: Optional[Tenant]) -> Iterator[Optional[Tenant]]:
+    """tenant'ı bu iş parçacığında etkin yapar (None: varsayılan data.json ayarları)."""
+    prev = current()
+    _local.tenant = tenant
+    try:
+        yield tenant
+    finally:
+        _local.tenant = prev
+
+
+def bind(fn: Callable) -> Callable:
+    """
+    fn'i çağıranın o anki kiracısına bağlar: başka iş parçacığında (havuz, DAG, pipeline)
+    çalıştırılsa da aynı kiracı etkin olur. Kiracı yoksa fn olduğu gibi döner.
+    """
+    tenant = current()
+    if tenant is None:
+        return fn
+
+    @wraps(fn)
+    def _bound(*args, **kwargs):
+        with activate(tenant):
+            return fn(*args, **kwargs)
+    return _bound
+
+
+def on_default_db(fn: Callable) -> Callable:
+    """fn'i etkin kiracıdan bağımsız olarak varsayılan veritabanında çalıştırır (DİA session satırı)."""
+    @wraps(fn)
+    def _default(*args, **kwargs):
+        with activate(None):
+            return fn(*args, **kwargs)
+    return _default
+
+
+def qualify(code: str) -> str:
+    """Kiracı etkinse "<ad>/<kod>", değilse kod (geçmiş ve süreç içi önbellek anahtarları için)."""
+    tenant = current()
+    return code if tenant is None else f"{tenant.name}/{code}"
+
+
+# ---------------------------
+# Çalıştırıcı
+# ---------------------------
+def run_tenants(tenants: Optional[List[Tenant]] = None, mode: str = "auto",
+                max_parallel: Optional[int] = None, workers_per_tenant: Optional[int] = None,
+                pipeline: Optional[bool] = None,
+                on_task_done: Optional[Callable[[str, str, Any], None]] = None,
+                on_tenant_done: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                cancel=None) -> Dict[str, Dict[str, Any]]:
+    """
+    Her kiracının VA görevlerini kendi veritabanından okuyup run_all_va_tasks ile çalıştırır.
+    Kiracılar paralel ilerler; hepsinde aynı anda çalışan görev sayısı max_parallel ile sınırlıdır.
+    Bir kiracının hatası (DB'ye ulaşılamaması dahil) diğerlerini etkilemez.
+    on_task_done(kiracı, kod, sonuç) kiracının iş parçacığından, on_tenant_done(kiracı, özet)
+    çağıran iş parçacığından çağrılır.
+    Dönüş: kiracı adı -> {"ok": bool, "text": str, "results": kod -> run_va_task sonucu}
+    """
+    from sql_crud import fetch_va_rows
+    from sync_tasks import run_all_va_tasks
+
+    opts = tenants_settings()
+    tenants = load_tenants() if tenants is None else tenants
+    slots = threading.BoundedSemaphore(max_parallel or opts["max_parallel"])
+    workers = workers_per_tenant or opts["workers_per_tenant"]
+
+    def _run(tenant: Tenant) -> Dict[str, Any]:
+        with activate(tenant):
+            ok, va_rows, msg = fetch_va_rows()
+            if not ok:
+                return {"ok": False, "text": f"VA satırları okunamadı: {msg}", "results": {}}
+            done = (lambda code, res: on_task_done(tenant.name, code, res)) if on_task_done else None
+            results = run_all_va_tasks(va_rows, max_workers=workers, on_task_done=done, mode=mode,
+                                       pipeline=pipeline, cancel=cancel, slots=slots)
+        failed = sorted(c for c, r in results.items() if not (isinstance(r, dict) and r.get("ok")))
+        text = f"{len(results) - len(failed)}/{len(results)} görev başarılı"
+        if failed:
+            text += f" (başarısız/atlanan: {', '.join(failed)})"
+        return {"ok": not failed, "text": text, "results": results}
+
+    summary: Dict[str, Dict[str, Any]] = {}
+    if not tenants:
+        return summary
+    with ThreadPoolExecutor(max_workers=len(tenants), thread_name_prefix="tenant") as pool:
+        futures = {pool.submit(_run, t): t for t in tenants}
+        for fut in as_completed(futures):
+            name = futures[fut].name
+            try:
+                summary[name] = fut.result()
+            except Exception as e:
+                summary[name] = {"ok": False, "text": f"HATA {type(e).__name__}: {e}", "results": {}}
+            if on_tenant_done:
+                on_tenant_done(name, summary[name])
+    return summary
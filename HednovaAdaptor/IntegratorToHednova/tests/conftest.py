@@ -0,0 +1,52 @@
+# conftest.py
+# -*- coding: utf-8 -*-
+"""
+Testler modülleri uygulamadaki gibi düz içe aktarır (IntegratorToHednova klasörü sys.path'te).
+DB gereken testler "sqlite:///" bağlantısıyla (bkz. sqlite_dialect) geçici bir dosyada çalışır.
+
+  cd HednovaAdaptor/IntegratorToHednova && python -m pytest -q tests
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CONFIG  # noqa: E402
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    """
+    Geçici data.json yazar ve CONFIG'i ona yönlendirir. Dönüş: write(**blocks) fonksiyonu;
+    data.json'ı verilen ek bloklarla yeniden yazar. write.db_path SQLite dosyasının yoludur.
+    """
+    old_path = CONFIG.path
+    db_path = str(tmp_path / "hednova.db")
+
+    def write(**blocks):
+        data = {
+            "hednova": {"connectionstring": "sqlite:///" + db_path},
+            "integrator": {"user": "u", "password": "p", "apikey": "k", "company": "1", "period": "1"},
+            "history": {"path": str(tmp_path / "run_history.db")},
+            "logging": {"path": str(tmp_path / "logs" / "integrator.log")},
+        }
+        data.update(blocks)
+        path = tmp_path / "data.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        CONFIG.path = str(path)
+        CONFIG.reload()
+        return db_path
+
+    write.db_path = db_path
+    write()
+    yield write
+
+    import sql_crud
+
+    sql_crud.close_pools()
+    sql_crud._schema_checked.clear()
+    CONFIG.path = old_path   # damga (mtime, boyut) farklı olduğundan bir sonraki okumada yeniden yüklenir
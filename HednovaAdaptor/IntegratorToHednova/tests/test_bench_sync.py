@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""bench_sync senaryoları ve benchmark'ın dayandığı sqlite_dialect T-SQL çevirileri."""
+
+import pytest
+
+import bench_sync
+import sql_crud
+import sqlite_dialect
+from sync_specs import SPECS
+
+TABLE = "[KR_TEST]"
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("IF OBJECT_ID('tempdb..#STG_KR_TEST') IS NOT NULL DROP TABLE #STG_KR_TEST;",
+     "DROP TABLE IF EXISTS temp.[STG_KR_TEST]"),
+    ("DROP TABLE #STG_KR_TEST;", "DROP TABLE temp.[STG_KR_TEST];"),
+    ("UPDATE t SET t.[B] = s.[B], t.[C] = s.[C] FROM [KR_TEST] t INNER JOIN #STG_KR_TEST s "
+     "ON t.[A] = s.[A] AND t.[UNIT] = ?;",
+     "UPDATE [KR_TEST] AS t SET [B] = s.[B], [C] = s.[C] FROM temp.[STG_KR_TEST] s "
+     "WHERE t.[A] = s.[A] AND t.[UNIT] = ?"),
+    ("DELETE t FROM [KR_TEST] t INNER JOIN #STG_KR_TEST s ON t.[A] = s.[A] AND t.[UNIT] = ?;",
+     "DELETE FROM [KR_TEST] WHERE rowid IN (SELECT t.rowid FROM temp.[STG_KR_TEST] s "
+     "JOIN [KR_TEST] t ON t.[A] = s.[A] AND t.[UNIT] = ?)"),
+    ("SELECT ISNULL(t.[B], '') FROM [KR_TEST] t", "SELECT IFNULL(t.[B], '') FROM [KR_TEST] t"),
+])
+def test_translate(sql, expected):
+    assert sqlite_dialect.translate(sql) == expected
+
+
+def test_select_into_temp_is_handled_by_cursor():
+    assert sqlite_dialect.translate("SELECT TOP 0 [A], [B] INTO #STG_KR_TEST FROM [KR_TEST];") is None
+
+
+def test_update_and_delete_join_through_staging(tmp_path):
+    conn = sqlite_dialect.connect(f"sqlite:///{tmp_path / 'd.db'}")
+    cur = conn.cursor()
+    cur.execute(f"CREATE TABLE {TABLE} ([A] TEXT, [B] TEXT, [UNIT] TEXT)")
+    cur.executemany(f"INSERT INTO {TABLE} VALUES (?, ?, ?)",
+                    [("1", "x", "U1"), ("2", "x", "U1"), ("3", "x", "U1"), ("1", "x", "U2")])
+
+    cur.execute(f"SELECT TOP 0 [A], [B] INTO #STG FROM {TABLE};")
+    cur.executemany("INSERT INTO #STG ([A], [B]) VALUES (?, ?)", [("1", "y"), ("2", "y")])
+    cur.execute(f"UPDATE t SET t.[B] = s.[B] FROM {TABLE} t INNER JOIN #STG s ON t.[A] = s.[A] AND t.[UNIT] = ?;",
+                "U1")
+    cur.execute(f"DELETE t FROM {TABLE} t INNER JOIN #STG s ON t.[A] = s.[A] AND t.[UNIT] = ?;", "U2")
+    cur.execute("IF OBJECT_ID('tempdb..#STG') IS NOT NULL DROP TABLE #STG;")
+
+    cur.execute(f"SELECT [A], [B], [UNIT] FROM {TABLE} ORDER BY [UNIT], [A]")
+    # Güncelleme ve silme yalnızca verilen scope'taki eşleşen satırlara uygulanır
+    assert cur.fetchall() == [("1", "y", "U1"), ("2", "y", "U1"), ("3", "x", "U1")]
+    conn.close()
+
+
+def test_run_scenario_counts(app_config):
+    spec = SPECS["ENT-04"]
+    bench_sync.create_table(app_config.db_path, spec)
+    sql_crud.ensure_schema(spec, create=True)
+
+    body = bench_sync.make_body(bench_sync.make_rows(spec, 100))
+    full = bench_sync.run_scenario(spec, "full", 100, body, "stream")
+    assert full["ok"], full["msg"]
+    assert full["counts"].get("inserted") == 100
+
+    same = bench_sync.run_scenario(spec, "no-change", 100, body, "stream")
+    assert same["ok"], same["msg"]
+    assert not any(same["counts"].get(k) for k in ("inserted", "updated", "deleted"))
+
+    # churn 0.1: 6 satır değişir, 2 satır silinir, 2 satır yeni anahtarla gelir (eskisi de silinir)
+    churn = bench_sync.run_scenario(spec, "churn", 100, bench_sync.make_body(bench_sync.make_rows(spec, 100, 0.1)),
+                                    "stream")
+    assert churn["ok"], churn["msg"]
+    assert {k: churn["counts"].get(k) for k in ("inserted", "updated", "deleted")} == \
+        {"inserted": 2, "updated": 6, "deleted": 4}
+    assert churn["round_trips"] > 0
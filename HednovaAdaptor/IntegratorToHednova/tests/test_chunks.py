@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Tarih aralığı parçaları (report_chunks) ve parçalı tam senkronda silme güvenliği."""
+
+import sqlite3
+from datetime import date
+
+import pytest
+
+import bench_sync
+import report_chunks
+import sql_crud
+import sync_tasks
+from sync_specs import SPECS
+
+SPEC = SPECS["ENT-11"]
+START = "2024-01-01"
+
+
+def test_date_ranges_cover_interval_without_gaps():
+    ranges = report_chunks.date_ranges(date(2024, 1, 1), date(2024, 3, 5), 31)
+    assert ranges[0][0] == "2024-01-01" and ranges[-1][1] == "2024-03-05"
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+def test_iter_chunks_retries_only_failed_chunk():
+    calls = []
+
+    def fetch(params):
+        calls.append(params["n"])
+        if params["n"] == 1 and calls.count(1) == 1:
+            raise RuntimeError("geçici hata")
+        return [params["n"]]
+
+    chunks = [{"n": i} for i in range(3)]
+    assert list(report_chunks.iter_chunks(fetch, chunks, parallel=2, retries=1, backoff=0)) == [0, 1, 2]
+    assert calls.count(0) == 1 and calls.count(1) == 2
+
+
+def test_iter_chunks_raises_after_retries():
+    def fetch(params):
+        raise RuntimeError("kalıcı hata")
+
+    with pytest.raises(report_chunks.ChunkError):
+        list(report_chunks.iter_chunks(fetch, [{"n": 0}], retries=1, backoff=0))
+
+
+def test_chunk_plan_requires_start_date(app_config):
+    app_config(chunking={"enabled": True})
+    assert sync_tasks._chunk_plan(SPEC, None) is None
+
+    app_config(chunking={"enabled": True, "start_date": START, "days": 400})
+    plan = sync_tasks._chunk_plan(SPEC, None)
+    assert plan[0] == {"baslangic_tarihi": START, "bitis_tarihi": "2025-02-04"}
+    assert sync_tasks._chunk_plan(SPEC, "2024-05-01 00:00:00") is None   # delta çalışma parçalanmaz
+
+
+def _row(i, tarih):
+    return {"satirkey": f"K{i}", "evrakno": "E", "tarih": tarih, "kod": f"S{i}", "sfmiktar": i}
+
+
+@pytest.fixture
+def chunked_report(app_config, monkeypatch):
+    """Tarihi start_date'ten eski ve boş iki satırı parçalarda hiç döndürmeyen sahte rapor."""
+    bench_sync.create_table(app_config.db_path, SPEC)
+    old_rows = [_row(1, "2019-06-01"), _row(2, "")]
+    new_rows = [_row(3, "2024-02-01")]
+    assert sql_crud.sync_rows(SPEC, old_rows + new_rows)[0]
+
+    def report(report_code, stream=False, raw=False, params=None):
+        rows = [r for r in new_rows if params["baslangic_tarihi"] <= r["tarih"] < params["bitis_tarihi"]]
+        return {"code": "200", "msg": "", "rows": rows}
+
+    monkeypatch.setattr(sync_tasks, "report_result_get", report)
+    return app_config
+
+
+def _keys(db_path):
+    with sqlite3.connect(db_path) as db:
+        return sorted(r[0] for r in db.execute(f"SELECT [ENT01] FROM [{SPEC.table}]"))
+
+
+def test_chunked_full_sync_keeps_rows_outside_chunks(chunked_report):
+    chunked_report(chunking={"enabled": True, "start_date": START})
+    out = sync_tasks.run_va_task("ENT-11", "R11", "", mode="full")
+    assert out["ok"], out["text"]
+    assert "silme yapılmadı" in out["text"]
+    assert _keys(chunked_report.db_path) == ["K1", "K2", "K3"]
+
+
+def test_chunked_full_sync_deletes_only_when_enabled(chunked_report):
+    chunked_report(chunking={"enabled": True, "start_date": START, "delete_missing": True})
+    out = sync_tasks.run_va_task("ENT-11", "R11", "", mode="full")
+    assert out["ok"], out["text"]
+    assert _keys(chunked_report.db_path) == ["K3"]
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""db_pool: ödünç alma/bırakma, boşta kalan ve kopmuş bağlantıların atılması, reconnecting."""
+
+import pytest
+
+import db_pool
+from db_pool import ConnectionPool, PoolTimeout, reconnecting
+
+
+class _Raw:
+    """Sahte ham bağlantı; fail ile verilen istisnayı cursor().execute'ta fırlatır."""
+
+    def __init__(self):
+        self.autocommit = True
+        self.closed = False
+        self.fail = None
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, *params):
+        if self.fail is not None:
+            raise self.fail
+        return self
+
+    def fetchone(self):
+        return (1,)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def _disconnect():
+    return Exception("08S01", "[08S01] Communication link failure")
+
+
+@pytest.fixture
+def pool():
+    made = []
+
+    def factory():
+        made.append(_Raw())
+        return made[-1]
+
+    p = ConnectionPool(factory, max_size=2, idle_timeout=60, ping_after=30, acquire_timeout=0.1)
+    p.made = made
+    yield p
+    p.close_all()
+
+
+def test_released_connection_is_reused(pool):
+    pool.acquire().close()
+    pool.acquire().close()
+    assert len(pool.made) == 1
+    assert pool.stats == {"idle": 1, "in_use": 0, "max_size": 2}
+
+
+def test_acquire_times_out_when_pool_is_full(pool):
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    for conn in held:
+        conn.close()
+
+
+def test_idle_connection_is_evicted(pool, monkeypatch):
+    pool.acquire().close()
+    old = pool.made[0]
+    now = db_pool.time.monotonic()
+    monkeypatch.setattr(db_pool.time, "monotonic", lambda: now + pool.idle_timeout + 1)
+    pool.acquire().close()
+    assert old.closed
+    assert len(pool.made) == 2
+
+
+def test_disconnected_connection_is_not_returned_to_pool(pool):
+    conn = pool.acquire()
+    pool.made[0].fail = _disconnect()
+    with pytest.raises(Exception):
+        conn.cursor().execute("SELECT 1")
+    conn.close()
+    assert pool.made[0].closed
+    assert pool.stats["idle"] == 0
+
+
+def test_reconnecting_retries_once_after_disconnect(pool):
+    calls = []
+
+    @reconnecting
+    def query():
+        calls.append(1)
+        conn = pool.acquire()
+        try:
+            if len(calls) == 1:
+                pool.made[-1].fail = _disconnect()
+            conn.cursor().execute("SELECT 1")
+            return (True, "")
+        except Exception as e:
+            return (False, str(e))
+        finally:
+            conn.close()
+
+    assert query() == (True, "")
+    assert len(calls) == 2
+
+
+def test_nested_reconnecting_keeps_outer_disconnect():
+    seen = []
+
+    @reconnecting
+    def inner():
+        return (True, "")
+
+    @reconnecting
+    def outer():
+        seen.append(1)
+        if len(seen) == 1:
+            db_pool._local.broken = True      # dış çağrıda bağlantı koptu
+            inner()                           # iç çağrı bunu silmemeli
+            return (False, "koptu")
+        return (True, "")
+
+    assert outer() == (True, "")
+    assert len(seen) == 2
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""http_client.DiaHttpClient: yeniden deneme kuralları (idempotent olan / olmayan çağrılar)."""
+
+import pytest
+import requests
+
+from http_client import DiaHttpClient
+
+
+class _Resp:
+    def __init__(self, status):
+        self.status_code = status
+
+    def close(self):
+        pass
+
+
+def _client(monkeypatch, outcomes):
+    """session.post sırayla outcomes'taki istisnayı fırlatır ya da durum kodlu yanıtı döndürür."""
+    client = DiaHttpClient(retries=2, backoff=0)
+    calls = []
+
+    def post(url, json=None, timeout=None, **kwargs):
+        item = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(item)
+        if isinstance(item, Exception):
+            raise item
+        return _Resp(item)
+
+    monkeypatch.setattr(client.session, "post", post)
+    return client, calls
+
+
+def _refused():
+    from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+    return requests.ConnectionError(MaxRetryError(None, "/", NewConnectionError(None, "refused")))
+
+
+def test_idempotent_call_retries_read_timeout(monkeypatch):
+    client, calls = _client(monkeypatch, [requests.ReadTimeout(), 200])
+    assert client.post_json("http://dia/", {}).status_code == 200
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("outcome", [requests.ReadTimeout(), requests.ConnectionError("reset")])
+def test_non_idempotent_call_does_not_retry_after_send(monkeypatch, outcome):
+    client, calls = _client(monkeypatch, [outcome, 200])
+    with pytest.raises(type(outcome)):
+        client.post_json("http://dia/", {}, idempotent=False)
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("outcome", [requests.ConnectTimeout(), _refused(), 503])
+def test_non_idempotent_call_retries_when_not_processed(monkeypatch, outcome):
+    client, calls = _client(monkeypatch, [outcome, 200])
+    assert client.post_json("http://dia/", {}, idempotent=False).status_code == 200
+    assert len(calls) == 2
+
+
+def test_non_idempotent_call_returns_500_without_retry(monkeypatch):
+    client, calls = _client(monkeypatch, [500, 200])
+    assert client.post_json("http://dia/", {}, idempotent=False).status_code == 500
+    assert len(calls) == 1
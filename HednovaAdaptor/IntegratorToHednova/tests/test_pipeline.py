@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""pipeline.run_pipeline: yazım sırası ve görev sürelerinin ölçümü."""
+
+import json
+import time
+
+import bench_sync
+import pipeline
+from sync_specs import SPECS
+
+CODES = ["ENT-02", "ENT-03", "ENT-04"]
+FETCH_SECONDS = 0.3
+
+
+def test_durations_exclude_time_spent_queued(app_config, monkeypatch):
+    for code in CODES:
+        bench_sync.create_table(app_config.db_path, SPECS[code])
+
+    def report(report_code, raw=False, params=None, **kwargs):
+        time.sleep(FETCH_SECONDS)
+        rows = list(bench_sync.make_rows(SPECS[report_code], 10))
+        return {"code": "200", "msg": "", "payload": json.dumps({"__rows": rows}).encode("utf-8")}
+
+    monkeypatch.setattr(pipeline, "report_result_get", report)
+    done = []
+    results = pipeline.run_pipeline([{"CODE": c, "RESULT2": c, "RESULT3": ""} for c in CODES],
+                                    on_task_done=lambda c, r: done.append(c), mode="full",
+                                    fetch_workers=1, prefetch=len(CODES))
+
+    assert done == CODES
+    assert all(results[c]["ok"] for c in CODES), results
+    # Fetch'ler tek işçide sırayla yapılır; son görev ~0.9 sn sonra başlasa da kendi süresi ~0.3 sn
+    assert max(results[c]["duration_ms"] for c in CODES) < FETCH_SECONDS * 1000 * 1.8
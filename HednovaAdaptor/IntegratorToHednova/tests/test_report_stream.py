@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""report_stream: parça sınırlarından bağımsız base64/UTF-8/JSON akış çözümlemesi."""
+
+import base64
+import json
+
+import pytest
+
+import bench_sync
+from report_stream import JsonWalker, StreamDecodeError, iter_b64decode, iter_rows, iter_utf8, open_report
+
+ROWS = [
+    {"key": "1", "kod": "ÇĞİÖŞÜ çğıöşü", "aciklama": 'tırnak " ve \\ ters bölü', "n": 1.5},
+    {"key": "2", "kod": "€ 😀", "aciklama": "satır\nsonu\tsekme ç", "n": None},
+    {"key": "3", "kod": "", "aciklama": "x" * 5000, "n": [1, {"a": "b"}]},
+]
+
+
+def _split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64, 4096])
+def test_iter_b64decode_any_piece_size(size):
+    raw = "ÇĞİÖŞÜ 😀 ".encode("utf-8") * 37
+    text = base64.b64encode(raw).decode("ascii")
+    assert b"".join(iter_b64decode(_split(text, size))) == raw
+
+
+def test_iter_b64decode_ignores_whitespace_and_missing_padding():
+    raw = b"hednova!!"
+    text = base64.b64encode(raw).decode("ascii").rstrip("=")
+    pieces = [text[:3] + "\r\n", " " + text[3:]]
+    assert b"".join(iter_b64decode(pieces)) == raw
+
+
+@pytest.mark.parametrize("size", [1, 2, 3])
+def test_iter_utf8_keeps_multibyte_characters_split_across_chunks(size):
+    text = "ÇĞİ € 😀"
+    assert "".join(iter_utf8(_split(text.encode("utf-8"), size))) == text
+
+
+@pytest.mark.parametrize("size", [1, 3, 17, 1000])
+def test_json_walker_rows_any_chunk_size(size):
+    doc = json.dumps({"meta": {"a": [1, 2, {"b": "}"}]}, "__rows": ROWS, "after": 1}, ensure_ascii=False)
+    assert list(iter_rows(_split(doc, size))) == ROWS
+
+
+def test_json_walker_without_rows_key():
+    assert list(iter_rows(['{"a": 1, "b": [2, 3]}'])) == []
+
+
+def test_json_walker_string_pieces_unescape():
+    walker = JsonWalker(_split('{"s": "a\\"b\\\\c\\u00e7\\n"}', 2))
+    assert next(walker.keys()) == "s"
+    assert "".join(walker.string_pieces()) == 'a"b\\cç\n'
+
+
+def test_json_walker_rejects_bad_document():
+    with pytest.raises((StreamDecodeError, ValueError)):
+        list(iter_rows(['{"__rows": [1, 2']))
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096])
+def test_open_report_streams_rows(size):
+    body = bench_sync.make_body(iter(ROWS))
+    fields, rows = open_report(_split(body, size))
+    assert fields == {"code": "200", "msg": ""}
+    assert list(rows) == ROWS
+
+
+def test_open_report_error_envelope():
+    fields, rows = open_report([b'{"code": "401", "msg": "invalid session", "result": "x"}'])
+    assert rows is None
+    assert fields["code"] == "401" and fields["result"] == "x"
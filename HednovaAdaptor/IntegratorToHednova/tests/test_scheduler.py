@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""scheduler: bağımlılık sıralaması ve başarısız görevin bağımlılarının atlanması."""
+
+import threading
+
+import pytest
+
+from scheduler import build_deps, run_dag, topo_order
+
+
+def test_build_deps_ignores_missing_and_self():
+    deps = build_deps(["A", "B"], lambda c: {"A": ["A", "X"], "B": ["A"]}[c])
+    assert deps == {"A": set(), "B": {"A"}}
+
+
+def test_topo_order_and_cycle():
+    assert topo_order({"C": {"B"}, "B": {"A"}, "A": set()}) == ["A", "B", "C"]
+    with pytest.raises(ValueError):
+        topo_order({"A": {"B"}, "B": {"A"}})
+
+
+def test_run_dag_respects_dependencies():
+    done = []
+    lock = threading.Lock()
+
+    def task(code):
+        def run():
+            with lock:
+                done.append(code)
+            return code
+        return run
+
+    deps = {"A": set(), "B": {"A"}, "C": {"B"}, "D": set()}
+    results = run_dag({c: task(c) for c in deps}, deps, max_workers=3)
+    assert results == {c: c for c in deps}
+    assert done.index("A") < done.index("B") < done.index("C")
+
+
+def test_run_dag_skips_dependents_of_failed_task():
+    skipped = []
+
+    def boom():
+        raise RuntimeError("hata")
+
+    tasks = {"A": lambda: {"ok": False}, "B": lambda: {"ok": True}, "C": lambda: {"ok": True},
+             "D": lambda: {"ok": True}, "E": boom, "F": lambda: {"ok": True}}
+    deps = {"A": set(), "B": {"A"}, "C": {"B"}, "D": set(), "E": set(), "F": {"E"}}
+    results = run_dag(tasks, deps, max_workers=2, is_success=lambda r: bool(r and r.get("ok")),
+                      on_skip=lambda code, dep: skipped.append((code, dep)))
+
+    assert results["A"] == {"ok": False} and results["D"] == {"ok": True}
+    assert results["B"] is None and results["C"] is None and results["F"] is None
+    assert isinstance(results["E"], RuntimeError)
+    assert sorted(skipped) == [("B", "A"), ("C", "B"), ("F", "E")]   # dolaylı bağımlı, atlanan bağımlısıyla bildirilir
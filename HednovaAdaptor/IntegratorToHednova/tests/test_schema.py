@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""ensure_schema varsayılanda yalnızca uyarır; eski veriyi kırpma isteğe bağlı ve scope ile sınırlıdır."""
+
+import sqlite3
+
+import bench_sync
+import sql_crud
+from sync_specs import SPECS
+
+SPEC = SPECS["ENT-02"]   # scope: EVRAKNO = 'STUNIT'
+
+
+def _seed(db_path):
+    bench_sync.create_table(db_path, SPEC)
+    with sqlite3.connect(db_path) as db:
+        db.executemany(f"INSERT INTO [{SPEC.table}] ([ENT01], [EVRAKNO]) VALUES (?, ?)",
+                       [(" A1", "STUNIT"), ("A2", "STUNIT"), (" B1", "DIGER")])
+
+
+def _rows(db_path):
+    with sqlite3.connect(db_path) as db:
+        indexes = [r[1] for r in db.execute(f"PRAGMA index_list([{SPEC.table}])")]
+        rows = sorted(db.execute(f"SELECT [ENT01], [EVRAKNO] FROM [{SPEC.table}]").fetchall())
+    return rows, indexes
+
+
+def test_default_only_warns_and_leaves_data(app_config):
+    _seed(app_config.db_path)
+    ok, msg, warnings = sql_crud.ensure_schema(SPEC)
+    assert ok, msg
+    assert len(warnings) == 2
+    assert _rows(app_config.db_path) == ([(" A1", "STUNIT"), (" B1", "DIGER"), ("A2", "STUNIT")], [])
+
+
+def test_create_indexes_setting(app_config):
+    app_config(schema={"create_indexes": True})
+    _seed(app_config.db_path)
+    ok, msg, warnings = sql_crud.ensure_schema(SPEC)
+    assert ok, msg
+    assert warnings == []
+    assert len(_rows(app_config.db_path)[1]) == 2
+
+
+def test_trim_key_values_stays_in_scope(app_config):
+    _seed(app_config.db_path)
+    ok, msg = sql_crud.trim_key_values(SPEC)
+    assert ok, msg
+    assert "kırpılan değer: 1" in msg
+    assert _rows(app_config.db_path)[0] == [(" B1", "DIGER"), ("A1", "STUNIT"), ("A2", "STUNIT")]
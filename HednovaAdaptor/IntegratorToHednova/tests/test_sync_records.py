@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""sync_records / sync_rows: SQLite üzerinde istemci ve sunucu tarafı fark hesabı."""
+
+import sqlite3
+
+import pytest
+
+import bench_sync
+import sql_crud
+from sync_specs import SPECS
+
+
+def _seed(db_path, spec, rows):
+    """Tabloyu senkron öncesi haliyle ([ENTHASH]/[ENTKEY] kolonu olmadan) doldurur."""
+    bench_sync.create_table(db_path, spec)
+    cols = spec.columns + list(spec.scope)
+    records = [spec.normalize(r) + tuple(spec.scope.values()) for r in rows]
+    with sqlite3.connect(db_path) as db:
+        db.executemany(f"INSERT INTO [{spec.table}] ({', '.join(f'[{c}]' for c in cols)}) "
+                       f"VALUES ({', '.join('?' for _ in cols)})", records)
+
+
+def _table(db_path, spec):
+    with sqlite3.connect(db_path) as db:
+        count = db.execute(f"SELECT COUNT(*) FROM [{spec.table}]").fetchone()[0]
+        null_hashes = db.execute(f"SELECT COUNT(*) FROM [{spec.table}] WHERE [ENTHASH] IS NULL").fetchone()[0]
+    return count, null_hashes
+
+
+@pytest.fixture(params=["client", "server"])
+def diff_config(request, app_config):
+    app_config(sync={"diff": request.param})
+    return app_config
+
+
+@pytest.mark.parametrize("code", ["ENT-04", "ENT-02", "ENT-09"])
+def test_existing_rows_without_hash_are_updated_not_duplicated(diff_config, code):
+    spec = SPECS[code]
+    rows = list(bench_sync.make_rows(spec, 50))
+    _seed(diff_config.db_path, spec, rows)
+
+    ok, msg, inserted = sql_crud.sync_rows(spec, rows)
+    assert ok, msg
+    assert inserted == 0
+    assert "eklenen 0, güncellenen 50" in msg
+    assert _table(diff_config.db_path, spec) == (50, 0)
+
+    # Özetler yazıldı: ikinci çalışmada hiçbir şey değişmez
+    ok, msg, _ = sql_crud.sync_rows(spec, rows)
+    assert ok, msg
+    assert "eklenen 0, güncellenen 0, değişmeyen 50, silinen 0" in msg
+
+
+@pytest.mark.parametrize("code", ["ENT-04", "ENT-09"])
+def test_insert_update_delete(diff_config, code):
+    spec = SPECS[code]
+    bench_sync.create_table(diff_config.db_path, spec)
+    ok, msg, inserted = sql_crud.sync_rows(spec, bench_sync.make_rows(spec, 100))
+    assert ok, msg
+    assert inserted == 100
+
+    # churn 0.1: 6 satır değişir, 2 satır silinir, 2 satır yeni anahtarla gelir (eskisi de silinir)
+    ok, msg, inserted = sql_crud.sync_rows(spec, bench_sync.make_rows(spec, 100, churn=0.1))
+    assert ok, msg
+    assert inserted == 2
+    assert "güncellenen 6" in msg and "silinen 4" in msg
+    assert _table(diff_config.db_path, spec) == (98, 0)
+
+
+def test_delta_does_not_delete(diff_config):
+    spec = SPECS["ENT-04"]
+    bench_sync.create_table(diff_config.db_path, spec)
+    rows = list(bench_sync.make_rows(spec, 20))
+    assert sql_crud.sync_rows(spec, rows)[0]
+
+    ok, msg, _ = sql_crud.sync_rows(spec, rows[:5], delete_missing=False)
+    assert ok, msg
+    assert "silinen 0" in msg
+    assert _table(diff_config.db_path, spec) == (20, 0)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""tenants: kiracı ayarları ve iş parçacığına özel firma/dönem + bağlantı seçimi."""
+
+import threading
+
+import pytest
+
+import api_requests
+import sql_crud
+import tenants
+
+
+@pytest.fixture
+def two_tenants(app_config, tmp_path):
+    app_config(tenants={"max_parallel": 2, "list": [
+        {"name": "A", "company": "11", "period": "1", "connectionstring": f"sqlite:///{tmp_path / 'a.db'}"},
+        {"company": "12", "period": "2", "connectionstring": f"sqlite:///{tmp_path / 'b.db'}"},
+    ]})
+    return app_config
+
+
+def test_load_tenants(two_tenants):
+    assert [t.name for t in tenants.load_tenants()] == ["A", "12-2"]
+    assert [t.name for t in tenants.load_tenants(["12-2"])] == ["12-2"]
+    with pytest.raises(ValueError):
+        tenants.load_tenants(["X"])
+
+
+def test_load_tenants_rejects_duplicates_and_missing_fields(app_config):
+    app_config(tenants={"list": [{"company": "1", "period": "1", "connectionstring": "sqlite:///x"}] * 2})
+    with pytest.raises(ValueError):
+        tenants.load_tenants()
+    app_config(tenants={"list": [{"company": "1"}]})
+    with pytest.raises(ValueError):
+        tenants.load_tenants()
+
+
+def test_active_tenant_selects_company_and_database(two_tenants):
+    a, b = tenants.load_tenants()
+    assert api_requests._load_integrator_fp() == {"company": "1", "period": "1"}
+    default_conn = sql_crud._load_conn_string()
+
+    with tenants.activate(a):
+        assert api_requests._load_integrator_fp() == {"company": "11", "period": "1"}
+        assert sql_crud._load_conn_string().endswith("a.db")
+        assert tenants.qualify("ENT-02") == "A/ENT-02"
+        assert tenants.on_default_db(sql_crud._load_conn_string)() == default_conn
+
+        # bind: başka iş parçacığında da aynı kiracı etkin olur
+        seen = []
+        t = threading.Thread(target=tenants.bind(lambda: seen.append(tenants.current())))
+        t.start()
+        t.join()
+        assert seen == [a]
+
+        with tenants.activate(b):
+            assert sql_crud._load_conn_string().endswith("b.db")
+        assert tenants.current() is a
+
+    assert tenants.current() is None
+    assert tenants.qualify("ENT-02") == "ENT-02"
@@ -0,0 +1,75 @@
+# va_cache.py
+# -*- coding: utf-8 -*-
+"""
+Son başarılı fetch_va_rows sonucunun yerel kopyası. Entegrasyon penceresi açılışta
+kartları DB'yi beklemeden bu kopyadan çizer; DB'den gelen güncel liste arka planda
+okunup hem pencereye hem bu dosyaya yazılır.
+
+data.json'daki isteğe bağlı "startup": {"va_cache": "va_rows_cache.json"} ayarı
+(yol data.json'ın klasörüne göredir; boş verilirse önbellek kullanılmaz).
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from app_log import get_logger
+from config import CONFIG
+from sql_crud import fetch_va_rows
+
+log = get_logger("startup")
+
+CACHE_VERSION = 1
+
+
+def cache_path() -> Optional[str]:
+    try:
+        opts = CONFIG.data.get("startup") or {}
+    except FileNotFoundError:
+        opts = {}
+    path = str(opts.get("va_cache", "va_rows_cache.json"))
+    if not path:
+        return None
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(CONFIG.path)), path)
+    return path
+
+
+def load_cached_va_rows() -> Optional[List[Dict]]:
+    """Önbellekteki satırlar; dosya yoksa ya da okunamıyorsa None."""
+    path = cache_path()
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CACHE_VERSION:
+            return None
+        return [dict(r) for r in data["rows"]]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        log.warning("VA önbelleği okunamadı: %s", e)
+        return None
+
+
+def save_va_rows_cache(rows: List[Dict]) -> bool:
+    """Satırları önbelleğe yazar (geçici dosya + os.replace; yarım dosya kalmaz)."""
+    path = cache_path()
+    if not path:
+        return False
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "rows": rows}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        return True
+    except OSError as e:
+        log.warning("VA önbelleği yazılamadı: %s", e)
+        return False
+
+
+def refresh_va_rows() -> Tuple[bool, List[Dict], str]:
+    """fetch_va_rows + başarılıysa önbelleği günceller. Dönüş fetch_va_rows ile aynıdır."""
+    ok, rows, msg = fetch_va_rows()
+    if ok:
+        save_va_rows_cache(rows)
+    return ok, rows, msg
@@ -0,0 +1,55 @@
+# workers.py
+# -*- coding: utf-8 -*-
+"""
+Uzun süren işleri (HTTP, base64/JSON çözümleme, DB senkronu) GUI iş parçacığı dışında
+QThreadPool üzerinde çalıştırmak için QRunnable sarmalayıcısı. Sonuç ve hatalar
+sinyallerle GUI iş parçacığına döner.
+"""
+
+from typing import Callable
+
+from PyQt5 import QtCore
+
+from app_log import get_logger
+
+log = get_logger("worker")
+
+
+class WorkerSignals(QtCore.QObject):
+    finished = QtCore.pyqtSignal(object)   # fn'in dönüş değeri
+    failed = QtCore.pyqtSignal(str)        # beklenmeyen istisna metni
+
+
+class Worker(QtCore.QRunnable):
+    """fn(*args, **kwargs) çağrısını havuz iş parçacığında çalıştırır."""
+
+    def __init__(self, fn: Callable, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        # GUI iş parçacığında oluşturulduğu için sinyaller oraya kuyruklanır
+        self.signals = WorkerSignals()
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            log.exception("Arka plan işi başarısız: %s", getattr(self.fn, "__name__", self.fn))
+            self.signals.failed.emit(f"{type(e).__name__}: {e}")
+        else:
+            self.signals.finished.emit(result)
+
+
+class ProgressSignals(QtCore.QObject):
+    """Tek görev çalışırken senkron ilerleme olaylarını GUI iş parçacığına taşır."""
+    progress = QtCore.pyqtSignal(object)         # progress olayı (dict)
+
+
+class DagSignals(QtCore.QObject):
+    """'Tümünü çalıştır' sırasında scheduler geri çağrılarını GUI iş parçacığına taşır."""
+    started = QtCore.pyqtSignal(str)             # kod
+    finished = QtCore.pyqtSignal(str, object)    # kod, sonuç
+    skipped = QtCore.pyqtSignal(str, str)        # kod, başarısız bağımlılık
+    progress = QtCore.pyqtSignal(object)         # progress olayı (dict, "code" içerir)